@@ -24,8 +24,10 @@ pytest_plugins = [
     'pytest_plugins.video_cleanup',
     'pytest_plugins.jira_comments',
     'pytest_plugins.select_random_tests',
+    'pytest_plugins.datafactory_corpus',
     'pytest_plugins.capsule_n-minus',
     'pytest_plugins.upstream_pr',
+    'pytest_plugins.cassettes',
     # Fixtures
     'pytest_fixtures.core.broker',
     'pytest_fixtures.core.sat_cap_factory',
@@ -107,14 +107,7 @@ def module_provisioning_rhel_content(
     content_view.update(['repository'])
 
     # wait for all repo sync tasks to finish
-    for task in tasks:
-        sat.wait_for_tasks(
-            search_query=(f'id = {task["id"]}'),
-            poll_timeout=2500,
-            poll_rate=5 if is_open('SAT-35513') else None,
-        )
-        task_status = sat.api.ForemanTask(id=task['id']).poll()
-        assert task_status['result'] == 'success'
+    sat.wait_for_content_ready(tasks, timeout=2500)
 
     rhel_xy = Version(
         constants.REPOS['kickstart'][f'rhel{rhel_ver}']['version']
@@ -129,13 +122,7 @@ def module_provisioning_rhel_content(
     # return only the first kickstart repo - RHEL X KS or RHEL X BaseOS KS
     ksrepo = rh_repos[0]
 
-    publish = content_view.publish()
-    task_status = sat.wait_for_tasks(
-        search_query=(f'Actions::Katello::ContentView::Publish and id = {publish["id"]}'),
-        search_rate=15,
-        max_tries=10,
-    )
-    assert task_status[0].result == 'success'
+    sat.wait_for_content_ready([content_view.publish(synchronous=False)])
     # create new activation key for provisioning
     cvenv_id = sat.api_factory.get_cvenv_id(content_view, module_lce_library)
     ak = sat.api.ActivationKey(
@@ -78,13 +78,7 @@ def module_sync_kickstart_content(
         rh_repo = module_target_sat.api.Repository(id=rh_kickstart_repo_id).read()
         task = rh_repo.sync(synchronous=False)
         tasks.append(task)
-    for task in tasks:
-        module_target_sat.wait_for_tasks(
-            search_query=(f'id = {task["id"]}'),
-            poll_timeout=2500,
-        )
-        task_status = module_target_sat.api.ForemanTask(id=task['id']).poll()
-        assert task_status['result'] == 'success'
+    module_target_sat.wait_for_content_ready(tasks, timeout=2500)
     rhel_xy = Version(constants.REPOS['kickstart'][repo_name]['version'])
     o_systems = module_target_sat.api.OperatingSystem().search(
         query={'search': f'family=Redhat and major={rhel_xy.major} and minor={rhel_xy.minor}'}
@@ -1,8 +1,8 @@
-from manifester import Manifester
 import pytest
 
 from robottelo.config import settings
 from robottelo.constants import CAPSULE_REGISTRATION_OPTS
+from robottelo.utils.manifest_pool import subscription_manifest
 
 
 def _activation_key_content_payload(module_target_sat_insights, organization):
@@ -58,14 +58,16 @@ def module_target_sat_insights(request, module_target_sat):
 
 
 @pytest.fixture(scope='module')
-def module_els_manifest():
+def module_els_manifest(module_target_sat_insights):
     """Module-scoped ELS manifest
 
     Uses a different manifest (els_rhel_manifest) than module_sca_manifest
     (golden_ticket) so we get a different allocation/export and avoid the Candlepin error
     'This subscription management application has already been imported by another owner'.
     """
-    with Manifester(manifest_category=settings.manifest.els_rhel_manifest) as manifest:
+    with subscription_manifest(
+        settings.manifest.els_rhel_manifest, module_target_sat_insights
+    ) as manifest:
         yield manifest
 
 
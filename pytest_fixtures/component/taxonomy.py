@@ -1,9 +1,16 @@
 # Content Component fixtures
-from manifester import Manifester
 import pytest
 
 from robottelo.config import settings
 from robottelo.constants import DEFAULT_LOC, DEFAULT_ORG
+from robottelo.utils.manifest_pool import subscription_manifest, wait_for_manifest_refills
+
+
+@pytest.fixture(scope='session', autouse=True)
+def manifest_pool_refills():
+    """Wait for the manifest pool refills started by the session before the process exits"""
+    yield
+    wait_for_manifest_refills()
 
 
 @pytest.fixture(scope='session')
@@ -137,83 +144,87 @@ def class_els_sca_manifest_org(class_org, class_sca_els_manifest, class_target_s
 
 
 @pytest.fixture(scope='session')
-def session_sca_manifest():
+def session_sca_manifest(session_target_sat):
     """Yields a manifest in entitlement mode with subscriptions determined by the
     `manifest_category.entitlement` setting in conf/manifest.yaml."""
-    with Manifester(manifest_category=settings.manifest.golden_ticket) as manifest:
+    with subscription_manifest(settings.manifest.golden_ticket, session_target_sat) as manifest:
         yield manifest
 
 
 @pytest.fixture(scope='module')
-def module_extra_rhel_sca_manifest():
+def module_extra_rhel_sca_manifest(module_target_sat):
     """Yields a manifest in sca mode with subscriptions determined by the
     'manifest_category.extra_rhel_entitlement` setting in conf/manifest.yaml."""
-    with Manifester(manifest_category=settings.manifest.extra_rhel_entitlement) as manifest:
+    with subscription_manifest(
+        settings.manifest.extra_rhel_entitlement, module_target_sat
+    ) as manifest:
         yield manifest
 
 
 @pytest.fixture(scope='module')
-def module_sca_manifest():
+def module_sca_manifest(module_target_sat):
     """Yields a manifest in Simple Content Access mode with subscriptions determined by the
     `manifest_category.golden_ticket` setting in conf/manifest.yaml."""
-    with Manifester(manifest_category=settings.manifest.golden_ticket) as manifest:
+    with subscription_manifest(settings.manifest.golden_ticket, module_target_sat) as manifest:
         yield manifest
 
 
 @pytest.fixture(scope='module')
-def module_sca_multiarch_manifest():
+def module_sca_multiarch_manifest(module_target_sat):
     """Yields a manifest in Simple Content Access mode with multiarchitecture subscriptions
     determined by the `manifest_category.arm_testing_manifest` setting in conf/manifest.yaml."""
-    with Manifester(manifest_category=settings.manifest.arm_testing_manifest) as manifest:
+    with subscription_manifest(
+        settings.manifest.arm_testing_manifest, module_target_sat
+    ) as manifest:
         yield manifest
 
 
 @pytest.fixture(scope='class')
-def class_sca_manifest():
+def class_sca_manifest(class_target_sat):
     """Yields a manifest in Simple Content Access mode with subscriptions determined by the
     `manifest_category.golden_ticket` setting in conf/manifest.yaml."""
-    with Manifester(manifest_category=settings.manifest.golden_ticket) as manifest:
+    with subscription_manifest(settings.manifest.golden_ticket, class_target_sat) as manifest:
         yield manifest
 
 
 @pytest.fixture
-def function_sca_manifest():
+def function_sca_manifest(target_sat):
     """Yields a manifest in Simple Content Access mode with subscriptions determined by the
     `manifest_category.golden_ticket` setting in conf/manifest.yaml."""
-    with Manifester(manifest_category=settings.manifest.golden_ticket) as manifest:
+    with subscription_manifest(settings.manifest.golden_ticket, target_sat) as manifest:
         yield manifest
 
 
 @pytest.fixture
-def second_function_sca_manifest():
+def second_function_sca_manifest(target_sat):
     """Yields a manifest in Simple Content Access mode with subscriptions determined by the
     `manifest_category.golden_ticket` setting in conf/manifest.yaml.
     A different one than is used in `function_sca_manifest_org`."""
-    with Manifester(manifest_category=settings.manifest.golden_ticket) as manifest:
+    with subscription_manifest(settings.manifest.golden_ticket, target_sat) as manifest:
         yield manifest
 
 
 @pytest.fixture(scope='module')
-def module_sca_els_manifest():
+def module_sca_els_manifest(module_target_sat):
     """Yields a manifest in Simple Content Access mode with subscriptions determined by the
     `manifest_category.els_rhel_manifest` setting in conf/manifest.yaml."""
-    with Manifester(manifest_category=settings.manifest.els_rhel_manifest) as manifest:
+    with subscription_manifest(settings.manifest.els_rhel_manifest, module_target_sat) as manifest:
         yield manifest
 
 
 @pytest.fixture(scope='class')
-def class_sca_els_manifest():
+def class_sca_els_manifest(class_target_sat):
     """Yields a manifest in Simple Content Access mode with subscriptions determined by the
     `manifest_category.els_rhel_manifest` setting in conf/manifest.yaml."""
-    with Manifester(manifest_category=settings.manifest.els_rhel_manifest) as manifest:
+    with subscription_manifest(settings.manifest.els_rhel_manifest, class_target_sat) as manifest:
         yield manifest
 
 
 @pytest.fixture
-def function_sca_els_manifest():
+def function_sca_els_manifest(target_sat):
     """Yields a manifest in Simple Content Access mode with subscriptions determined by the
     `manifest_category.els_rhel_manifest` setting in conf/manifest.yaml."""
-    with Manifester(manifest_category=settings.manifest.els_rhel_manifest) as manifest:
+    with subscription_manifest(settings.manifest.els_rhel_manifest, target_sat) as manifest:
         yield manifest
 
 
@@ -230,6 +241,8 @@ def upgrade_entitlement_manifest():
     """Returns a manifest in entitlement mode with subscriptions determined by the
     `manifest_category.entitlement` setting in conf/manifest.yaml. used only for
     upgrade scenarios"""
+    from manifester import Manifester
+
     manifester = Manifester(manifest_category=settings.manifest.entitlement)
     return manifester.get_manifest(), manifester
 
@@ -237,12 +250,14 @@ def upgrade_entitlement_manifest():
 @pytest.fixture
 def sca_manifest_for_upgrade():
     """Returns a manifest in sca mode. Used only for upgrade scenarios"""
+    from manifester import Manifester
+
     manifester = Manifester(manifest_category=settings.manifest.golden_ticket)
     return manifester.get_manifest(), manifester
 
 
 @pytest.fixture
-def func_future_dated_subscription_manifest():
+def func_future_dated_subscription_manifest(target_sat):
     """Returns future dated manifest. Used only for future date subscription scenarios."""
-    with Manifester(manifest_category=settings.manifest.future_date_subscription) as manifest:
+    with subscription_manifest(settings.manifest.future_date_subscription, target_sat) as manifest:
         yield manifest
@@ -4,6 +4,7 @@ from robottelo.config import settings
 from robottelo.constants import REPOS
 from robottelo.utils.datafactory import gen_string
 from robottelo.utils.virtwho import (
+    close_sessions,
     deploy_configure_by_command,
     deploy_configure_by_script,
     get_configure_command,
@@ -13,6 +14,13 @@ from robottelo.utils.virtwho import (
 LOGGEDOUT = 'Logged out.'
 
 
+@pytest.fixture(scope='session', autouse=True)
+def virtwho_sessions():
+    """Close the ssh connections cached by the virtwho helpers at the end of the session"""
+    yield
+    close_sessions()
+
+
 @pytest.fixture
 def org_module(request, default_org, module_sca_manifest_org):
     if 'sca' in request.module.__name__.split('.')[-1]:
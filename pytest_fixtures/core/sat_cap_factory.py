@@ -15,6 +15,7 @@ from robottelo.hosts import (
     lru_sat_ready_rhel,
 )
 from robottelo.logging import logger
+from robottelo.utils.manifest_pool import forget_manifest_consumer
 
 
 def resolve_deploy_args(args_dict):
@@ -90,6 +91,8 @@ def satellite_factory():
         sat = wait_for(
             vmb.checkout, timeout=timeout, delay=delay, handle_exception=True, raise_original=True
         )
+        # a new deployment may reuse the hostname of one the manifest pool leased manifests to
+        forget_manifest_consumer(sat.out.hostname)
         return sat.out
 
     return factory
@@ -165,6 +168,27 @@ def module_satellite_mqtt(module_target_sat):
     return module_target_sat
 
 
+@pytest.fixture(scope='module')
+def module_golden_state(request, module_target_sat):
+    """Return a function that restores a named content state on module_target_sat,
+    building and capturing it on first use.
+
+    Restoring replaces the whole Satellite database, so it is only available to destructive
+    modules, which get a Satellite of their own.
+
+    usage:
+        data = module_golden_state('rhst_repo', build=setup_rhst, params={'repo': repo})
+    """
+    if not request.node.get_closest_marker('destructive'):
+        pytest.fail('module_golden_state can only be used in destructive modules')
+
+    def _golden_state(name, build, params=None, **capture_kwargs):
+        return module_target_sat.golden_state(name, build, params=params, **capture_kwargs)
+
+    yield _golden_state
+    module_target_sat.delete_golden_state()
+
+
 @pytest.fixture
 def capsule_host(request, capsule_factory):
     """A fixture that provides a Capsule based on config settings"""
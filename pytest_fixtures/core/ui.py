@@ -4,6 +4,7 @@ from requests.exceptions import HTTPError
 
 from robottelo.hosts import Satellite
 from robottelo.logging import logger
+from robottelo.utils.ui_session_pool import discard_if_failed
 
 
 @pytest.fixture(scope='module')
@@ -59,6 +60,7 @@ def session(target_sat, test_name, ui_user, request):
     """
     with target_sat.ui_session(test_name, ui_user.login, ui_user.password) as session:
         yield session
+        discard_if_failed(session, request.node)
 
 
 @pytest.fixture
@@ -78,6 +80,7 @@ def autosession(target_sat, test_name, ui_user, request):
     """
     with target_sat.ui_session(test_name, ui_user.login, ui_user.password) as started_session:
         yield started_session
+        discard_if_failed(started_session, request.node)
 
 
 @pytest.fixture(autouse=True)
@@ -1,9 +1,27 @@
-"""Plugin enables pytest to notify and update the requirements"""
+"""Plugin logging in to Vault before the settings, which may read secrets from it, are loaded"""
+
+import time
 
 from robottelo.utils.vault import Vault
 
+vault_login = {}
+
 
 def pytest_addoption(parser):
-    """Options to allow user to update the requirements"""
+    """Log in to Vault, when the .env file enables it, before the settings are loaded"""
+    start = time.perf_counter()
     with Vault() as vclient:
         vclient.login()
+    vault_login.update(duration=time.perf_counter() - start, token_source=vclient.token_source)
+
+
+def pytest_report_header(config):
+    """Report the time the Vault login and the settings bootstrap added to the startup"""
+    from robottelo.config import settings_load_time
+
+    token_source = vault_login.get('token_source')
+    return (
+        f'Startup: Vault login {vault_login.get("duration", 0):.2f}s'
+        + (f' (token from {token_source})' if token_source else '')
+        + f', settings {settings_load_time:.2f}s'
+    )
@@ -2,9 +2,12 @@
 # No destructive tests
 # Adjust capsule host and capsule_configured host behavior for n_minus testing
 # Calculate capsule hostname from inventory just as we do in xDist.py
+from pytest_plugins.fixture_index import get_fixture_index, index_fixtures
 from robottelo.config import settings
 from robottelo.hosts import Capsule
 
+N_MINUS_FIXTURES = ('capsule_factory', 'sat_maintain', 'session_puppet_enabled_sat', 'setup_fam')
+
 
 def pytest_addoption(parser):
     """Add options for pytest to collect tests based on fixtures its using"""
@@ -18,27 +21,29 @@ def pytest_addoption(parser):
     parser.addoption("--n-minus", action='store_true', default=False, help=help_text)
 
 
-def pytest_collection_modifyitems(items, config):
+def pytest_configure(config):
+    """Index the fixtures the n-minus selection is based on"""
+    if config.getoption('n_minus', False):
+        index_fixtures(config, N_MINUS_FIXTURES)
+
+
+def pytest_collection_modifyitems(session, items, config):
     if not config.getoption('n_minus', False):
         return
 
+    # Select only non-destructive tests with capsule_factory fixture or sat_maintain fxture with capsule parameter
+    index = get_fixture_index(session, items)
+    candidates = index.with_fixture('capsule_factory') | index.with_param(
+        'capsule', among=index.with_fixture('sat_maintain')
+    )
+    candidates -= index.with_fixture('session_puppet_enabled_sat', 'setup_fam')
     selected = []
     deselected = []
-
     for item in items:
-        # Select only non-destructive tests with capsule_factory fixture or sat_maintain fxture with capsule parameter
-        if not (
-            item.get_closest_marker('destructive')
-            or 'session_puppet_enabled_sat' in item.fixturenames
-            or 'setup_fam' in item.fixturenames
-        ) and (
-            'capsule_factory' in item.fixturenames
-            or 'sat_maintain' in item.fixturenames
-            and 'capsule' in item.callspec.params.values()
-        ):
+        if id(item) in candidates and not item.get_closest_marker('destructive'):
             selected.append(item)
-            continue
-        deselected.append(item)
+        else:
+            deselected.append(item)
 
     config.hook.pytest_deselected(items=deselected)
     items[:] = selected
@@ -0,0 +1,129 @@
+"""Record the hammer commands and API requests of the tests in cassettes, or replay them
+without a Satellite, and report the API requests of each test.
+
+See robottelo.utils.cassettes. In replay mode, the commands and requests a test ran that are
+not in its cassette, and the recordings it did not use, are listed at the end of the session.
+In both modes the random module is seeded from the nodeid of each test, so that the names
+fauxfactory generates during record are generated again during replay. Fixtures of a wider
+scope run in the first test using them, and are recorded in its cassette: their commands are
+only replayed when that test runs first again, like when the same tests are selected.
+With --api-call-report, the tests with the largest cumulative API latency are listed with
+their number of requests and the requests they repeated.
+
+Usage:
+    pytest tests/foreman/cli/test_model.py --cassette-mode record
+    pytest tests/foreman/cli/test_model.py --cassette-mode replay [--cassette-dir cassettes]
+    pytest tests/foreman/api/test_host.py --api-call-report 20
+"""
+
+from contextlib import ExitStack
+
+import pytest
+
+from robottelo.logging import robottelo_root_dir
+from robottelo.utils import cassettes
+from robottelo.utils.datafactory import seeded_random
+
+unmatched_commands = {}
+unused_recordings = {}
+api_calls = {}
+
+
+def pytest_addoption(parser):
+    """Add the --cassette-mode, --cassette-dir and --api-call-report options"""
+    parser.addoption(
+        '--cassette-mode',
+        choices=cassettes.CASSETTE_MODES,
+        help='Record the hammer commands and API requests of each test in a cassette, '
+        'or replay them from it.',
+    )
+    parser.addoption(
+        '--cassette-dir',
+        default=str(robottelo_root_dir.joinpath('.cassettes')),
+        help='Directory of the cassettes, one JSON file per test.',
+    )
+    parser.addoption(
+        '--api-call-report',
+        type=int,
+        metavar='N',
+        help='Report the number and cumulative latency of the API requests of the N tests '
+        'with the largest latency.',
+    )
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    """Record or replay the hammer commands and API requests of the test in its cassette"""
+    mode = item.config.getoption('cassette_mode', None)
+    report_api_calls = item.config.getoption('api_call_report', None)
+    stack = ExitStack()
+    if mode:
+        cassettes.start_cassette(item.config.getoption('cassette_dir'), item.nodeid, mode)
+        # the same random names in record and replay, whichever tests ran before
+        stack.enter_context(seeded_random(item.nodeid, 'cassette'))
+    if report_api_calls:
+        cassettes.start_api_call_stats()
+    try:
+        with stack:
+            yield
+    finally:
+        cassettes.stop_cassette()
+        cassettes.stop_api_call_stats()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """Add the replay results and the API call statistics to the teardown report"""
+    outcome = yield
+    if call.when != 'teardown':
+        return
+    report = outcome.get_result()
+    if (stats := cassettes.api_call_stats) is not None:
+        report.user_properties.append(('api_calls', stats.summary()))
+    cassette = cassettes.active_cassette
+    if cassette is None or cassette.mode != 'replay':
+        return
+    if cassette.unmatched:
+        report.user_properties.append(
+            ('cassette_unmatched', [request['command'] for request in cassette.unmatched])
+        )
+    if cassette.unused:
+        report.user_properties.append(
+            ('cassette_unused', [entry['command'] for entry in cassette.unused])
+        )
+
+
+def pytest_runtest_logreport(report):
+    """Collect the replay results and API call statistics, also from the pytest-xdist workers"""
+    for key, value in report.user_properties:
+        if key == 'cassette_unmatched':
+            unmatched_commands[report.nodeid] = value
+        elif key == 'cassette_unused':
+            unused_recordings[report.nodeid] = value
+        elif key == 'api_calls':
+            api_calls[report.nodeid] = value
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    """List the commands missing from the cassettes, the unused recordings and the tests with
+    the largest API latency
+    """
+    if unmatched_commands or unused_recordings:
+        terminalreporter.section('cassette replay')
+        for title, results in (
+            ('Commands not recorded in the cassette', unmatched_commands),
+            ('Recordings not replayed', unused_recordings),
+        ):
+            for nodeid, commands in results.items():
+                terminalreporter.write_line(f'{title} of {nodeid}:')
+                for command in commands:
+                    terminalreporter.write_line(f'    {command}')
+    if api_calls:
+        terminalreporter.section('API calls')
+        slowest = sorted(api_calls.items(), key=lambda item: -item[1]['latency'])
+        for nodeid, stats in slowest[: config.getoption('api_call_report')]:
+            terminalreporter.write_line(
+                f'{stats["latency"]:9.2f}s {stats["count"]:5} requests  {nodeid}'
+            )
+            for command, count in stats['repeated']:
+                terminalreporter.write_line(f'{"":24}{count:5}x {command}')
@@ -0,0 +1,43 @@
+"""Generate the datafactory datasets used to parametrize tests from a session seed.
+
+The controller picks the seed and shares it with the xdist workers, so that all of them
+collect the same parametrized tests. Datasets are memoized for the collection, test bodies
+still get random data.
+"""
+
+import random
+
+import pytest
+
+from robottelo.logging import logger
+from robottelo.utils import datafactory
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--datafactory-seed',
+        action='store',
+        default=None,
+        help='Seed of the datafactory datasets used to parametrize tests. '
+        'A random one is picked and logged when not provided.',
+    )
+
+
+def pytest_configure(config):
+    if hasattr(config, 'workerinput'):
+        seed = config.workerinput['datafactory_seed']
+    else:
+        seed = config.getoption('datafactory_seed') or str(random.randrange(2**32))
+        logger.info(f'Datafactory seed: {seed}')
+    config.datafactory_seed = seed
+    datafactory.start_corpus(seed)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    """Share the seed of the controller with the xdist workers"""
+    node.workerinput['datafactory_seed'] = node.config.datafactory_seed
+
+
+def pytest_collection_finish(session):
+    datafactory.stop_corpus()
@@ -1,20 +1,25 @@
 from inspect import getmembers, isfunction
 
+from pytest_plugins.fixture_index import get_fixture_index, index_fixtures
+
+
+def factory_fixture_names():
+    """Return the names of the fixtures deploying a fresh satellite or Capsule instance"""
+    from pytest_fixtures.core import sat_cap_factory
+
+    names = {m[0] for m in getmembers(sat_cap_factory, isfunction)}
+    return names - {'satellite_factory', 'capsule_factory'}
+
 
 def pytest_configure(config):
     """Register markers related to testimony tokens"""
     marker = 'factory_instance: Test uses a fresh satellite or Capsule instance deployed by broker'
     config.addinivalue_line("markers", marker)
+    index_fixtures(config, factory_fixture_names())
 
 
 def pytest_collection_modifyitems(session, items, config):
-    from pytest_fixtures.core import sat_cap_factory
-
-    factory_fixture_names = [m[0] for m in getmembers(sat_cap_factory, isfunction)]
+    factory_items = get_fixture_index(session, items).with_fixture(*factory_fixture_names())
     for item in items:
-        itemfixtures = [
-            itm for itm in item.fixturenames if itm not in ('satellite_factory', 'capsule_factory')
-        ]
-        has_factoryfixture = set(itemfixtures).intersection(set(factory_fixture_names))
-        if has_factoryfixture:
+        if id(item) in factory_items:
             item.add_marker('factory_instance')
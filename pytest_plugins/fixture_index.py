@@ -0,0 +1,90 @@
+"""Index of the collected tests by the fixtures they use and their parameter values.
+
+The plugins selecting or marking tests by fixture (--n-minus, the factory_instance and
+content_host markers, sanity) query this index instead of scanning the fixture names of every
+collected item in turn. The plugins register the fixtures they query at configure time, and
+the index of all of them is built in one pass over the items, on the first query of the
+session. It is reused by the following plugins as long as they query a subset of the indexed
+items.
+
+Usage:
+    def pytest_configure(config):
+        index_fixtures(config, ['capsule_factory', 'sat_maintain'])
+
+    def pytest_collection_modifyitems(session, items, config):
+        index = get_fixture_index(session, items)
+        maintain = index.with_fixture('sat_maintain')
+        capsule_tests = index.with_fixture('capsule_factory') | index.with_param('capsule', maintain)
+        selected = [item for item in items if id(item) in capsule_tests]
+"""
+
+from collections import defaultdict
+from types import SimpleNamespace
+
+import pytest
+
+indexed_fixtures_key = pytest.StashKey[set]()
+# the parameters of the items which are not parametrized
+NO_CALLSPEC = SimpleNamespace(params={})
+
+
+class FixtureIndex:
+    """Ids of the collected items by fixture name, queried by fixture and parameter value
+
+    The items are indexed by ``id()``, which hashes faster than their node ids, and the
+    queries return sets of item ids, to be tested with ``id(item) in selection``. Fixtures not
+    indexed up front are indexed the first time they are queried.
+
+    :param items: list of collected test items
+    :param fixturenames: names of the fixtures to index up front
+    """
+
+    def __init__(self, items, fixturenames=()):
+        self.items = {id(item): item for item in items}
+        self.by_fixture = {}
+        self._index_fixtures(fixturenames)
+
+    def _index_fixtures(self, names):
+        """Index the fixtures not indexed yet, in one pass over the items"""
+        names = set(names).difference(self.by_fixture)
+        if not names:
+            return
+        by_fixture = defaultdict(set)
+        for item_id, item in self.items.items():
+            for name in names.intersection(item.fixturenames):
+                by_fixture[name].add(item_id)
+        self.by_fixture.update({name: by_fixture[name] for name in names})
+
+    def with_fixture(self, *names):
+        """Return the ids of the items using any of the fixtures"""
+        self._index_fixtures(names)
+        return set().union(*(self.by_fixture[name] for name in names))
+
+    def with_param(self, value, among=None):
+        """Return the ids of the items having a parameter with the value
+
+        :param value: hashable parameter value
+        :param among: ids of the items to look at, all the items by default
+        """
+        return {
+            item_id
+            for item_id in (self.items if among is None else among)
+            if value in getattr(self.items[item_id], 'callspec', NO_CALLSPEC).params.values()
+        }
+
+
+fixture_index_key = pytest.StashKey[FixtureIndex]()
+
+
+def index_fixtures(config, names):
+    """Index the fixtures in the first pass over the collected items"""
+    config.stash.setdefault(indexed_fixtures_key, set()).update(names)
+
+
+def get_fixture_index(session, items):
+    """Return the fixture index of the items, built once per session"""
+    index = session.stash.get(fixture_index_key, None)
+    if index is None or not index.items.keys() >= set(map(id, items)):
+        index = FixtureIndex(items, session.config.stash.get(indexed_fixtures_key, ()))
+        session.stash[fixture_index_key] = index
+    return index
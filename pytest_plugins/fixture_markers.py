@@ -3,6 +3,7 @@ import re
 
 import pytest
 
+from pytest_plugins.fixture_index import get_fixture_index, index_fixtures
 from robottelo.config import settings
 from robottelo.enums import NetworkType
 
@@ -154,11 +155,17 @@ def pytest_configure(config):
     """Register markers related to testimony tokens"""
     for marker in ['content_host: Test uses a content host deployed by broker']:
         config.addinivalue_line("markers", marker)
+    index_fixtures(config, content_host_fixture_names())
 
 
-def pytest_collection_modifyitems(session, items, config):
+def content_host_fixture_names():
+    """Return the names of the fixtures deploying content hosts"""
     from pytest_fixtures.core import contenthosts
 
+    return [m[0] for m in getmembers(contenthosts, isfunction)]
+
+
+def pytest_collection_modifyitems(session, items, config):
     def chost_rhelver(params):
         """Helper to retrieve the rhel_version of a client from test params"""
         for param in params:
@@ -166,9 +173,11 @@ def pytest_collection_modifyitems(session, items, config):
                 return params[param].get('rhel_version')
         return None
 
-    content_host_fixture_names = [m[0] for m in getmembers(contenthosts, isfunction)]
+    content_host_items = get_fixture_index(session, items).with_fixture(
+        *content_host_fixture_names()
+    )
     for item in items:
-        if set(item.fixturenames).intersection(set(content_host_fixture_names)):
+        if id(item) in content_host_items:
             # TODO check param for indirect version parametrization
             if hasattr(item, 'callspec'):
                 client_property = ('ClientOS', str(chost_rhelver(item.callspec.params)))
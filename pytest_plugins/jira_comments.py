@@ -1,5 +1,10 @@
 from collections import defaultdict
+import hashlib
+import json
 import os
+from pathlib import Path
+import threading
+import time
 
 import pytest
 
@@ -7,7 +12,11 @@ from robottelo.config import settings
 from robottelo.constants import JIRA_TESTS_FAILED_LABEL, JIRA_TESTS_PASSED_LABEL
 from robottelo.logging import logger
 from robottelo.utils import parse_comma_separated_list
-from robottelo.utils.issue_handlers.jira import add_comment_on_jira, get_single_jira
+from robottelo.utils.issue_handlers.jira import (
+    add_comments_on_jira,
+    get_current_jira,
+    get_default_jira,
+)
 
 
 def pytest_addoption(parser):
@@ -89,51 +98,151 @@ def escape_special_characters(text):
     return text
 
 
+def comment_id(issue, comment, labels):
+    """Return the id of a comment in the journal"""
+    content = json.dumps([issue, comment, labels])
+    return hashlib.sha256(content.encode()).hexdigest()[:16]
+
+
+class CommentJournal:
+    """Journal of the Jira comments of the session, one JSON record per line.
+
+    Each comment is written to the journal before it is posted and marked done once Jira
+    added it, so the comments of a session interrupted while posting are posted by the next
+    session, and none twice. The journal is removed once all its comments are posted.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.planned = {}
+        self.done = set()
+        self._lock = threading.Lock()
+        if self.path.exists():
+            for line in self.path.read_text().splitlines():
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # the last line of an interrupted session may be incomplete
+                    continue
+                if record.get('done'):
+                    self.done.add(record['id'])
+                else:
+                    self.planned[record['id']] = record
+
+    def _append(self, record):
+        with self._lock, self.path.open('a') as journal:
+            journal.write(f'{json.dumps(record)}\n')
+
+    def plan(self, issue, comment, labels):
+        """Add a comment to post, unless it is already planned or posted"""
+        record = {
+            'id': comment_id(issue, comment, labels),
+            'issue': issue,
+            'comment': comment,
+            'labels': labels,
+        }
+        if record['id'] not in self.planned and record['id'] not in self.done:
+            self.planned[record['id']] = record
+            self._append(record)
+
+    @property
+    def pending(self):
+        """The comments not posted yet"""
+        return [record for id_, record in self.planned.items() if id_ not in self.done]
+
+    def mark_done(self, record):
+        self.done.add(record['id'])
+        self._append({'id': record['id'], 'done': True})
+
+    def close(self):
+        """Remove the journal when all its comments are posted"""
+        if not self.pending:
+            self.path.unlink(missing_ok=True)
+
+
+def journal_path():
+    """Return the path of the comment journal, one per pytest-xdist worker"""
+    path = Path(settings.jira.comment_journal)
+    if worker := os.environ.get('PYTEST_XDIST_WORKER'):
+        path = path.with_stem(f'{path.stem}-{worker}')
+    return path
+
+
+def issue_comment(issue, results):
+    """Return the comment with the test results of an issue, and whether all tests passed"""
+    user = os.environ.get('USER')
+    build_url = os.environ.get('BUILD_URL')
+    # Sort test result based on the outcome.
+    results.sort(key=lambda x: x['outcome'])
+    all_tests_passed = True
+    comment_body = (
+        f'This is an automated comment from job/user: {build_url if build_url else user} for a Robottelo test run.\n'
+        f'Satellite/Capsule: {settings.server.version.release} Snap: {settings.server.version.snap} \n'
+        f'Result for tests linked with issue: {issue} \n'
+    )
+    for item in results:
+        color_code = '{color:green}'
+        if item['outcome'] == 'failed':
+            all_tests_passed = False
+            color_code = '{color:red}'
+        # Color code test outcome
+        color_coded_result = f'{color_code}{item["outcome"]}{{color}}'
+        # Escape special characters in the node_id.
+        escaped_node_id = escape_special_characters(item['nodeid'])
+        comment_body += f'{escaped_node_id} : {color_coded_result} \n'
+    return comment_body, all_tests_passed
+
+
 def pytest_sessionfinish(session, exitstatus):
-    """Add test result comment to related Jira issues."""
-    if hasattr(session.config, 'issue_to_tests_map'):
-        user = os.environ.get('USER')
-        build_url = os.environ.get('BUILD_URL')
-        for issue in session.config.issue_to_tests_map:
-            # Sort test result based on the outcome.
-            session.config.issue_to_tests_map[issue].sort(key=lambda x: x['outcome'])
-            all_tests_passed = True
-            comment_body = (
-                f'This is an automated comment from job/user: {build_url if build_url else user} for a Robottelo test run.\n'
-                f'Satellite/Capsule: {settings.server.version.release} Snap: {settings.server.version.snap} \n'
-                f'Result for tests linked with issue: {issue} \n'
+    """Add test result comments to related Jira issues.
+
+    The status and labels of all the issues are fetched with bulk queries, then the comments
+    are posted concurrently through the comment journal, with the comments an interrupted
+    session did not post.
+    """
+    if not (settings.jira.enable_comment and session.config.getoption('jira_comments')):
+        return
+    issue_to_tests_map = getattr(session.config, 'issue_to_tests_map', {})
+    journal = CommentJournal(journal_path())
+    if issue_to_tests_map:
+        try:
+            issues_data = get_current_jira([issue.strip() for issue in issue_to_tests_map])
+        except Exception as e:
+            logger.warning(f'Failed to get Jira issues {list(issue_to_tests_map)}: {e}')
+            issues_data = {}
+        for issue, results in issue_to_tests_map.items():
+            comment_body, all_tests_passed = issue_comment(issue, results)
+            labels = (
+                [{'add': JIRA_TESTS_PASSED_LABEL}, {'remove': JIRA_TESTS_FAILED_LABEL}]
+                if all_tests_passed
+                else [{'add': JIRA_TESTS_FAILED_LABEL}, {'remove': JIRA_TESTS_PASSED_LABEL}]
             )
-            for item in session.config.issue_to_tests_map[issue]:
-                color_code = '{color:green}'
-                if item['outcome'] == 'failed':
-                    all_tests_passed = False
-                    color_code = '{color:red}'
-                # Color code test outcome
-                color_coded_result = f'{color_code}{item["outcome"]}{{color}}'
-                # Escape special characters in the node_id.
-                escaped_node_id = escape_special_characters(item['nodeid'])
-                comment_body += f'{escaped_node_id} : {color_coded_result} \n'
-            try:
-                labels = (
-                    [{'add': JIRA_TESTS_PASSED_LABEL}, {'remove': JIRA_TESTS_FAILED_LABEL}]
-                    if all_tests_passed
-                    else [{'add': JIRA_TESTS_FAILED_LABEL}, {'remove': JIRA_TESTS_PASSED_LABEL}]
+            data = issues_data.get(issue.strip()) or get_default_jira(issue.strip())
+            # Initially set a Pass/Fail label based on the test result
+            # If the state changes add a comment
+            # If the state is already failing, and test is failing, still add a comment
+            # If the state is already passing, and the test passes, don’t add a comment
+            if (data['status'] in settings.jira.issue_status) and (
+                not all_tests_passed or JIRA_TESTS_PASSED_LABEL not in data.get('labels', [])
+            ):
+                journal.plan(issue.strip(), comment_body, labels)
+            else:
+                logger.warning(
+                    f'Jira comments are currently disabled for {issue} issue. '
+                    f'It could be because jira is in {data["status"]} state or that there are no failing tests. \n'
+                    'Please update issue_status in jira.conf to override this behaviour.'
                 )
-                data = get_single_jira(issue)
-                # Initially set a Pass/Fail label based on the test result
-                # If the state changes add a comment
-                # If the state is already failing, and test is failing, still add a comment
-                # If the state is already passing, and the test passes, don’t add a comment
-                if (data['status'] in settings.jira.issue_status) and (
-                    not all_tests_passed or JIRA_TESTS_PASSED_LABEL not in data['labels']
-                ):
-                    add_comment_on_jira(issue, comment_body, labels=labels)
-                else:
-                    logger.warning(
-                        f'Jira comments are currently disabled for {issue} issue. '
-                        f'It could be because jira is in {data["status"]} state or that there are no failing tests. \n'
-                        'Please update issue_status in jira.conf to override this behaviour.'
-                    )
-            except Exception as e:
-                # Handle any errors in adding comments to Jira
-                logger.warning(f'Failed to add comment to Jira issue {issue}: {e}')
+    if pending := journal.pending:
+        start = time.monotonic()
+        failed = add_comments_on_jira(
+            pending,
+            workers=settings.jira.comment_workers,
+            retries=settings.jira.comment_retries,
+            backoff=settings.jira.comment_backoff,
+            on_added=journal.mark_done,
+        )
+        logger.info(
+            f'Added {len(pending) - len(failed)} of {len(pending)} Jira comments '
+            f'in {time.monotonic() - start:.1f}s'
+        )
+    journal.close()
@@ -1,5 +1,6 @@
 import contextlib
 import logging
+import time
 
 import logzero
 import pytest
@@ -7,15 +8,33 @@ from xdist import is_xdist_worker
 
 from robottelo.logging import (
     DEFAULT_DATE_FORMAT,
+    log_pipeline,
     logger,
+    operation_context,
+    operations_pipeline,
+    record_operation,
     robottelo_log_dir,
-    robottelo_log_file,
 )
 
 with contextlib.suppress(ImportError):
     from pytest_reportportal import RPLogger, RPLogHandler
 
 
+@pytest.hookimpl(tryfirst=True)
+def pytest_sessionstart(session):
+    """Start the operation records of the run in empty files, before the xdist workers start
+
+    The records of the previous runs are removed, so that scripts/log_query.py indexes one run.
+    """
+    if is_xdist_worker(session):
+        return
+    for path in robottelo_log_dir.glob('operations*.jsonl*'):
+        path.unlink(missing_ok=True)
+    operations_pipeline.set_file(
+        robottelo_log_dir.joinpath('operations.jsonl'), operations_pipeline.file_handler.formatter
+    )
+
+
 @pytest.fixture(autouse=True, scope='session')
 def configure_logging(request, worker_id):
     """Handle xdist and ReportPortal logging configuration at session start
@@ -34,25 +53,13 @@ def configure_logging(request, worker_id):
     if use_rp_logger:
         logging.setLoggerClass(RPLogger)
 
-    if is_xdist_worker(request) and f'{worker_id}' not in [h.get_name() for h in logger.handlers]:
-        # Track the core logger's file handler level, set it in case core logger wasn't set
-        worker_log_level = 'INFO'
-        handlers_to_remove = [
-            h
-            for h in logger.handlers
-            if isinstance(h, logging.FileHandler)
-            and getattr(h, 'baseFilename', None) == str(robottelo_log_file)
-        ]
-        for handler in handlers_to_remove:
-            logger.removeHandler(handler)
-            worker_log_level = handler.level
-        worker_handler = logging.FileHandler(
-            robottelo_log_dir.joinpath(f'robottelo_{worker_id}.log')
+    worker_log_file = robottelo_log_dir.joinpath(f'robottelo_{worker_id}.log')
+    if is_xdist_worker(request) and log_pipeline.file_handler.baseFilename != str(worker_log_file):
+        log_pipeline.set_file(worker_log_file, worker_formatter)
+        operations_pipeline.set_file(
+            robottelo_log_dir.joinpath(f'operations_{worker_id}.jsonl'),
+            operations_pipeline.file_handler.formatter,
         )
-        worker_handler.set_name(f'{worker_id}')
-        worker_handler.setFormatter(worker_formatter)
-        worker_handler.setLevel(worker_log_level)
-        logger.addHandler(worker_handler)
 
         if use_rp_logger:
             rp_handler = RPLogHandler(request.node.config.py_test_service)
@@ -60,8 +67,38 @@ def configure_logging(request, worker_id):
             # logger.addHandler(rp_handler)
 
 
+@pytest.hookimpl(trylast=True)
+def pytest_unconfigure(config):
+    """Write the queued log records before the process, possibly an xdist worker, exits"""
+    log_pipeline.stop()
+    operations_pipeline.stop()
+
+
 def pytest_runtest_logstart(nodeid, location):
     logger.info(f'Started Test: {nodeid}')
+    operation_context['nodeid'] = nodeid
+
+
+def pytest_runtest_logfinish(nodeid, location):
+    operation_context['nodeid'] = None
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_fixture_setup(fixturedef, request):
+    """Record the setup time of the fixtures, the operations they run are attributed to them"""
+    parent = operation_context['fixture']
+    operation_context['fixture'] = fixturedef.argname
+    start = time.perf_counter()
+    outcome = yield
+    operation_context['fixture'] = parent
+    record_operation(
+        'fixture',
+        fixturedef.argname,
+        time.perf_counter() - start,
+        'failed' if outcome.excinfo else 'passed',
+        fixture=parent,
+        scope=fixturedef.scope,
+    )
 
 
 def pytest_runtest_logreport(report):
@@ -72,3 +109,8 @@ def pytest_runtest_logreport(report):
         logger.error('Test phase \'%s\' failed for test: %s', report.when, report.nodeid)
         logger.error('Exception thrown:\n%s', report.longrepr)
     logger.info('Finished %s for test: %s, result: %s', report.when, report.nodeid, report.outcome)
+    # the xdist controller gets the reports of the workers, which record them already
+    if not hasattr(report, 'node'):
+        record_operation(
+            'test', report.when, report.duration, report.outcome, nodeid=report.nodeid, fixture=None
+        )
@@ -1,9 +1,12 @@
+import time
+
 import pytest
 
 from robottelo.config import settings
 from robottelo.hosts import get_sat_version
 from robottelo.logging import logger
 from robottelo.utils.report_portal.portal import ReportPortal
+from robottelo.utils.report_portal.rerun_index import read_rerun_index, rerun_key, select_tests
 
 
 class LaunchError(Exception):
@@ -64,6 +67,14 @@ def pytest_addoption(parser):
         Value: report_portal_launch_uuid
     '''
     parser.addoption("--rp-reference-launch-uuid", nargs='?', help=help_text)
+    help_text = '''
+        Reads the tests of the reference launch from a rerun index exported with
+        scripts/rerun_index.py, instead of Report Portal. To be used with
+        --only-failed or --only-skipped, the index has no test owners for --user
+
+        Usage: --rp-rerun-index [path]
+    '''
+    parser.addoption("--rp-rerun-index", nargs='?', help=help_text)
 
 
 @pytest.hookimpl(tryfirst=True)
@@ -84,39 +95,8 @@ def pytest_collection_modifyitems(items, config):
     ref_launch_uuid = config.getoption('rp_reference_launch_uuid', None) or config.getoption(
         'rp_rerun_of', None
     )
-    tests = []
     if not any([fail_args, skip_arg, user_arg]):
         return
-    rp = ReportPortal(rp_url=rp_url, rp_api_key=rp_api_key, rp_project=rp_project)
-
-    if ref_launch_uuid:
-        logger.info(f'Fetching A reference Report Portal launch {ref_launch_uuid}')
-        ref_launches = rp.get_launches(uuid=ref_launch_uuid)
-        if not ref_launches:
-            raise LaunchError(
-                f'Provided reference launch {ref_launch_uuid} was not found or is not finished'
-            )
-    else:
-        sat_release = get_sat_version().base_version
-        sat_snap = settings.server.version.get('snap', '')
-        if not all([sat_release, sat_snap, (len(sat_release.split('.')) == 3)]):
-            raise pytest.UsageError(
-                '--failed|skipped-only requires a reference launch id or'
-                ' a full satellite version (x.y.z-a.b) to be provided.'
-                f' sat_release: {sat_release}, sat_snap: {sat_snap} were provided instead'
-            )
-        sat_version = f'{sat_release}-{sat_snap}'
-        logger.info(
-            f'Fetching A reference Report Portal launch by Satellite version: {sat_version}'
-        )
-
-        ref_launches = rp.get_launches(name=rp_launch_name, sat_version=sat_version)
-        if not ref_launches:
-            raise LaunchError(
-                f'No suitable Report portal launches for name: {rp_launch_name}'
-                f' and version: {sat_version} found'
-            )
-
     test_args = {}
     test_args.setdefault('status', list())
     if skip_arg:
@@ -125,7 +105,7 @@ def pytest_collection_modifyitems(items, config):
         test_args['status'].append('FAILED')
         if fail_args != 'all':
             defect_types = fail_args.split(',')
-            allowed_args = [*rp.defect_types.keys()]
+            allowed_args = [*ReportPortal.defect_types.keys()]
             if not set(defect_types).issubset(set(allowed_args)):
                 raise pytest.UsageError(
                     'Incorrect values to pytest option \'--only-failed\' are provided as '
@@ -134,21 +114,64 @@ def pytest_collection_modifyitems(items, config):
             test_args['defect_types'] = defect_types
     if user_arg:
         test_args['user'] = user_arg
-    test_args['paths'] = config.args
-    for ref_launch in ref_launches:
-        _validate_launch(ref_launch)
-        tests.extend(rp.get_tests(launch=ref_launch, **test_args))
+    rerun_index_path = config.getoption('rp_rerun_index', None)
+    if rerun_index_path and user_arg:
+        raise pytest.UsageError(
+            'The rerun index has no test owners, --user can not be used with --rp-rerun-index'
+        )
+    start = time.perf_counter()
+    if rerun_index_path:
+        logger.info(f'Reading the reference launch tests from the rerun index {rerun_index_path}')
+        index = read_rerun_index(rerun_index_path)
+        _validate_launch(index['launch'])
+        test_names = select_tests(index, test_args['status'], test_args.get('defect_types'))
+    else:
+        rp = ReportPortal(rp_url=rp_url, rp_api_key=rp_api_key, rp_project=rp_project)
+
+        if ref_launch_uuid:
+            logger.info(f'Fetching A reference Report Portal launch {ref_launch_uuid}')
+            ref_launches = rp.get_launches(uuid=ref_launch_uuid)
+            if not ref_launches:
+                raise LaunchError(
+                    f'Provided reference launch {ref_launch_uuid} was not found or is not finished'
+                )
+        else:
+            sat_release = get_sat_version().base_version
+            sat_snap = settings.server.version.get('snap', '')
+            if not all([sat_release, sat_snap, (len(sat_release.split('.')) == 3)]):
+                raise pytest.UsageError(
+                    '--failed|skipped-only requires a reference launch id or'
+                    ' a full satellite version (x.y.z-a.b) to be provided.'
+                    f' sat_release: {sat_release}, sat_snap: {sat_snap} were provided instead'
+                )
+            sat_version = f'{sat_release}-{sat_snap}'
+            logger.info(
+                f'Fetching A reference Report Portal launch by Satellite version: {sat_version}'
+            )
+
+            ref_launches = rp.get_launches(name=rp_launch_name, sat_version=sat_version)
+            if not ref_launches:
+                raise LaunchError(
+                    f'No suitable Report portal launches for name: {rp_launch_name}'
+                    f' and version: {sat_version} found'
+                )
+
+        test_args['paths'] = config.args
+        tests = []
+        for ref_launch in ref_launches:
+            _validate_launch(ref_launch)
+            tests.extend(rp.get_tests(launch=ref_launch, **test_args))
+        test_names = {rerun_key(t['name']) for t in tests}
     # remove inapplicable tests from the current test collection
-    deselected = [
-        i
-        for i in items
-        if f'{i.location[0]}.{i.location[2]}'.replace('::', '.')
-        not in [t['name'].replace('::', '.') for t in tests]
-    ]
-    selected = list(set(items) - set(deselected))
+    selected, deselected = [], []
+    for i in items:
+        if rerun_key(f'{i.location[0]}.{i.location[2]}') in test_names:
+            selected.append(i)
+        else:
+            deselected.append(i)
     logger.debug(
         f'Selected {len(selected)} and deselected {len(deselected)} tests based on latest/given-/ '
-        'launch test results.'
+        f'launch test results in {time.perf_counter() - start:.2f}s.'
     )
     config.hook.pytest_deselected(items=deselected)
     items[:] = selected
@@ -4,6 +4,8 @@
 should run after that
 """
 
+from pytest_plugins.fixture_index import get_fixture_index, index_fixtures
+
 
 class ConfigurationException(Exception):
     """Raised when pytest configuration is missed"""
@@ -16,6 +18,8 @@ def pytest_configure(config):
     config.addinivalue_line(
         "markers", "first_sanity: An installer test to run first in sanity testing"
     )
+    if 'sanity' in config.option.markexpr:
+        index_fixtures(config, ['session_puppet_enabled_sat', 'sat_maintain'])
 
 
 def pytest_collection_modifyitems(session, items, config):
@@ -25,6 +29,9 @@ def pytest_collection_modifyitems(session, items, config):
     selected = []
     deselected = []
     installer_test = None
+    index = get_fixture_index(session, items)
+    puppet_items = index.with_fixture('session_puppet_enabled_sat')
+    sat_maintain_items = index.with_fixture('sat_maintain')
 
     for item in items:
         if item.get_closest_marker('build_sanity'):
@@ -35,11 +42,11 @@ def pytest_collection_modifyitems(session, items, config):
                 continue
             # Test parameterization disablement for sanity
             # Remove Puppet based tests
-            if 'session_puppet_enabled_sat' in item.fixturenames and 'puppet' in item.name:
+            if id(item) in puppet_items and 'puppet' in item.name:
                 deselected.append(item)
                 continue
             # Remove capsule tests
-            if 'sat_maintain' in item.fixturenames and 'capsule' in item.name:
+            if id(item) in sat_maintain_items and 'capsule' in item.name:
                 deselected.append(item)
                 continue
             # Remove parametrization from organization test
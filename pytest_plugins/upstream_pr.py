@@ -8,15 +8,24 @@ Usage:
 
 Configuration:
     Requires settings.github_repos configuration with repository mappings and file-to-component rules.
+
+The file lists of the PRs are cached in settings.github_repos.cache_dir, keyed by the head
+commit of the PR, so that the workers and the following runs only fetch the PR itself.
 """
 
+from collections import defaultdict
+import json
+import os
+from pathlib import Path
 import re
+import tempfile
 
-from github import Auth, Github
-from github.GithubException import GithubException
+import pytest
 
 from robottelo.config import settings
-from robottelo.logging import collection_logger as logger
+from robottelo.logging import collection_logger as logger, robottelo_root_dir
+
+component_index_key = pytest.StashKey[dict]()
 
 
 def match_file_to_rule(filename, rule):
@@ -38,6 +47,138 @@ def match_file_to_rule(filename, rule):
         return False
 
 
+class RuleMatcher:
+    """Rules of a repository compiled into a single pattern.
+
+    Like matching each rule in turn, a filename is mapped to the first rule matching it. The
+    combined pattern is searched once per filename, the empty group following the rule that
+    matched tells which one it is. It matched at the leftmost position, so only the rules
+    listed before it are then searched one at a time.
+
+    Args:
+        rules: Rule objects with 'path' and 'component' attributes
+    """
+
+    # backreferences and conditionals refer to groups renumbered in the combined pattern
+    GROUP_REFERENCE = re.compile(r'\\[1-9]|\(\?P=|\(\?\(')
+
+    def __init__(self, rules):
+        self.rules = []
+        self.patterns = []
+        for rule in rules:
+            if not hasattr(rule, 'path') or not hasattr(rule, 'component'):
+                logger.warning("Invalid rule: missing 'path' or 'component' attribute")
+                continue
+            try:
+                self.patterns.append(re.compile(rule.path, flags=re.IGNORECASE))
+            except re.error as e:
+                logger.error(f"Invalid regex pattern '{rule.path}': {e}")
+                continue
+            self.rules.append(rule)
+        self.pattern = None
+        if not any(self.GROUP_REFERENCE.search(rule.path) for rule in self.rules):
+            alternatives = '|'.join(
+                f'(?:{rule.path})(?P<_rule{index}>)' for index, rule in enumerate(self.rules)
+            )
+            try:
+                self.pattern = re.compile(alternatives, flags=re.IGNORECASE)
+            except re.error:
+                # e.g. named groups repeated across rules
+                logger.debug('Rules can not be combined, matching them one at a time')
+
+    def match(self, filename):
+        """Return the first rule matching the filename, or None"""
+        if self.pattern is None:
+            candidates = range(len(self.rules))
+        elif match := self.pattern.search(filename):
+            candidates = range(int(match.lastgroup.removeprefix('_rule')) + 1)
+        else:
+            return None
+        return next(
+            (self.rules[index] for index in candidates if self.patterns[index].search(filename)),
+            None,
+        )
+
+    def map_files(self, filenames):
+        """Return the filenames matched by each rule and the filenames no rule matched"""
+        matched = defaultdict(set)
+        unmatched = set()
+        for filename in filenames:
+            if rule := self.match(filename):
+                matched[rule.path, rule.component].add(filename)
+            else:
+                unmatched.add(filename)
+        return matched, unmatched
+
+
+def get_pr_filenames(github_repo, pr, cache_dir=None):
+    """Return the filenames modified by the PR, from the cache for an already seen head commit
+
+    Args:
+        github_repo: PyGithub repository of the PR
+        pr: PyGithub pull request
+        cache_dir: directory of the cached file lists, the cache is disabled when empty
+
+    Returns:
+        set: The filenames modified by the PR
+    """
+    cache_file = None
+    if cache_dir:
+        cache_file = Path(cache_dir, f'{github_repo.full_name}/{pr.head.sha}.json'.lower())
+        if cache_file.exists():
+            logger.debug(f'Reading the files of PR {pr.number} from {cache_file}')
+            return set(json.loads(cache_file.read_text()))
+    filenames = {file.filename for file in pr.get_files()}
+    if cache_file:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=cache_file.parent, suffix='.tmp')
+        with os.fdopen(fd, 'w') as tmp_file:
+            json.dump(sorted(filenames), tmp_file)
+        Path(tmp_name).replace(cache_file)
+    return filenames
+
+
+def build_component_index(items, base_marker):
+    """Return the positions of the items by component marker argument.
+
+    Items without the `base_marker`, when it is set, are left out of the index. The markers of
+    each item are read once, so that selecting the items of any set of components is a lookup.
+
+    Args:
+        items: list of collected test items
+        base_marker: optional base marker that must be present
+
+    Returns:
+        dict: component name -> list of positions in `items`
+    """
+    index = defaultdict(list)
+    for position, item in enumerate(items):
+        markers = list(item.iter_markers())
+        if base_marker and not any(base_marker == marker.name for marker in markers):
+            continue
+        components = {
+            component
+            for marker in markers
+            if marker.name == 'component'
+            for component in marker.args
+        }
+        for component in components:
+            index[component].append(position)
+    return index
+
+
+def get_component_index(session, items, base_marker):
+    """Return the component index of the items, built once per session"""
+    cached = session.stash.get(component_index_key, None)
+    if cached is None or cached['items'] != [id(item) for item in items]:
+        cached = {
+            'items': [id(item) for item in items],
+            'index': build_component_index(items, base_marker),
+        }
+        session.stash[component_index_key] = cached
+    return cached['index']
+
+
 def component_match(item, components, base_marker):
     """Return True if the test (`item`) has a marker matching one of the `components`.
 
@@ -113,8 +254,12 @@ def pytest_collection_modifyitems(session, items, config):
     if not upstream_prs:
         return
 
+    from github import Auth, Github
+    from github.GithubException import GithubException
+
     components = set()
     gh_settings = settings.github_repos
+    cache_dir = gh_settings.cache_dir and robottelo_root_dir.joinpath(gh_settings.cache_dir)
 
     auth = None
     if token := gh_settings.get('token'):
@@ -150,7 +295,7 @@ def pytest_collection_modifyitems(session, items, config):
             try:
                 github_repo = github_client.get_repo(repo_full_name)
                 pr = github_repo.get_pull(pr_id)
-                pr_filenames = {file.filename for file in pr.get_files()}
+                pr_filenames = get_pr_filenames(github_repo, pr, cache_dir)
 
                 # Add validation for PR state
                 if pr.state != 'open':
@@ -171,7 +316,6 @@ def pytest_collection_modifyitems(session, items, config):
                 raise
 
             # Map modified files to components using configured rules
-            unprocessed_filenames = pr_filenames.copy()
             logger.debug(f'Upstream PR {repo_key}/{pr_id} modified files: {sorted(pr_filenames)}')
             if not repo_config.rules:
                 logger.warning(
@@ -179,25 +323,13 @@ def pytest_collection_modifyitems(session, items, config):
                 )
                 continue
 
-            for rule in repo_config.rules:
-                if not hasattr(rule, 'path') or not hasattr(rule, 'component'):
-                    logger.warning(
-                        f"Invalid rule in {repo_key}: missing 'path' or 'component' attribute"
-                    )
-                    continue
-
-                matched_filenames = {
-                    filename
-                    for filename in unprocessed_filenames
-                    if match_file_to_rule(filename, rule)
-                }
-                if matched_filenames:
-                    components.add(rule.component.lower())
-                    unprocessed_filenames.difference_update(matched_filenames)
-                    logger.debug(
-                        f"Rule '{rule.path}' matched {len(matched_filenames)} files, "
-                        f"mapped to component '{rule.component}'"
-                    )
+            matched, unprocessed_filenames = RuleMatcher(repo_config.rules).map_files(pr_filenames)
+            for (path, component), matched_filenames in matched.items():
+                components.add(component.lower())
+                logger.debug(
+                    f"Rule '{path}' matched {len(matched_filenames)} files, "
+                    f"mapped to component '{component}'"
+                )
             if unprocessed_filenames:
                 logger.debug(
                     f"Unmatched files in {repo_key}/{pr_id}: {sorted(unprocessed_filenames)}"
@@ -211,18 +343,19 @@ def pytest_collection_modifyitems(session, items, config):
     if not components:
         logger.warning("No components matched from upstream PRs, all tests will be deselected")
 
-    selected = []
-    deselected = []
     base_marker = settings.github_repos.base_marker
     logger.info(f"Filtering tests based on components: {sorted(components)}")
 
-    for item in items:
-        if components and component_match(item, components, base_marker):
-            logger.debug(f'Selected test {item.nodeid} (matches components: {components})')
+    index = get_component_index(session, items, base_marker)
+    positions = {position for component in components for position in index.get(component, ())}
+    selected = []
+    deselected = []
+    for position, item in enumerate(items):
+        if position in positions:
             selected.append(item)
         else:
-            logger.debug(f'Deselected test {item.nodeid} (no component match)')
             deselected.append(item)
+    logger.debug(f'Selected tests (match components {components}): {[i.nodeid for i in selected]}')
 
     logger.info(f"Test filtering complete: {len(selected)} selected, {len(deselected)} deselected")
 
@@ -1,7 +1,6 @@
 from urllib.parse import urlparse
 
 from box import Box
-from broker.hosts import Host
 import pytest
 
 from robottelo.config import settings
@@ -21,6 +20,8 @@ def _clean_video(session_id, test):
         logger.info(f"cleaning up video files for session: {session_id} and test: {test}")
 
         if settings.ui.grid_url and session_id:
+            from broker.hosts import Host
+
             grid = urlparse(url=settings.ui.grid_url)
             infra_grid = Host(hostname=grid.hostname)
             infra_grid.execute(command=f'rm -rf /var/www/html/videos/{session_id}')
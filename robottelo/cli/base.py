@@ -1,6 +1,8 @@
 """Generic base class for cli hammer commands."""
 
 import re
+import threading
+import weakref
 
 from wait_for import wait_for
 
@@ -8,11 +10,34 @@ from robottelo import ssh
 from robottelo.cli import hammer
 from robottelo.config import settings
 from robottelo.exceptions import CLIDataBaseError, CLIError, CLIReturnCodeError
-from robottelo.logging import logger
+from robottelo.logging import log_operation, logger
+from robottelo.utils import cassettes
 from robottelo.utils.ssh import get_client
 
 
-class Base:
+class _ThreadCommandSub(type):
+    """Keep the ``command_sub`` of the hammer classes per thread
+
+    The classmethods set ``cls.command_sub`` before building their command, so hammer
+    commands of the same class running in several threads would otherwise overwrite each
+    other's subcommand. Subclasses still see the subcommand set on their parents.
+    """
+
+    _local = threading.local()
+
+    @property
+    def command_sub(cls):
+        subs = getattr(_ThreadCommandSub._local, 'subs', {})
+        return next((subs[klass] for klass in cls.__mro__ if klass in subs), None)
+
+    @command_sub.setter
+    def command_sub(cls, value):
+        if not hasattr(_ThreadCommandSub._local, 'subs'):
+            _ThreadCommandSub._local.subs = weakref.WeakKeyDictionary()
+        _ThreadCommandSub._local.subs[cls] = value
+
+
+class Base(metaclass=_ThreadCommandSub):
     """Base class for hammer CLI interaction
 
     See Subcommands section in `hammer --help` output on your Satellite.
@@ -20,7 +45,7 @@ class Base:
 
     omitting_credentials = False
     command_base = None  # each inherited instance should define this
-    command_sub = None  # specific to instance, like: create, update, etc.
+    # command_sub, specific to instance, like: create, update, etc. is kept per thread
     command_end = None  # extending commands like for directory to pass
     command_requires_org = False  # True when command requires organization-id
     hostname = None  # Now used for Satellite class hammer execution
@@ -200,12 +225,21 @@ class Base:
             f'--output={output_format}' if output_format else "",
             command,
         )
-        response = ssh.command(
-            cmd,
-            hostname=hostname or cls.hostname or settings.server.hostname,
-            output_format=output_format,
-            timeout=timeout,
-        )
+        hostname = hostname or cls.hostname or settings.server.hostname
+        # with a cassette, the command is recorded or replayed by the client
+        client_kwargs = {}
+        if cassettes.active_cassette is not None:
+            client_kwargs['client'] = cassettes.active_cassette.hammer_client(
+                command, cls.command_sub, output_format, hostname
+            )
+        with log_operation('hammer', f'{cls.command_base} {cls.command_sub}'):
+            response = ssh.command(
+                cmd,
+                hostname=hostname,
+                output_format=output_format,
+                timeout=timeout,
+                **client_kwargs,
+            )
         if return_raw_response:
             return response
         return cls._handle_response(response, ignore_stderr=ignore_stderr)
@@ -1,28 +1,117 @@
 import builtins
+import hashlib
+from importlib.metadata import version
 import logging
 import os
 from pathlib import Path
+import pickle
+import tempfile
+import time
 from urllib.parse import urlunsplit
 
 from dynaconf import LazySettings
 from dynaconf.validator import ValidationError
-from nailgun.config import ServerConfig
 
+from robottelo.config import validators
 from robottelo.config.validators import VALIDATORS
 from robottelo.logging import logger, robottelo_root_dir
+from robottelo.utils.lazy_import import configure_on_import
 
 if not os.getenv('ROBOTTELO_DIR'):
     # dynaconf robottelo file uses ROBOTELLO_DIR for screenshots
     os.environ['ROBOTTELO_DIR'] = str(robottelo_root_dir)
 
+SETTINGS_SNAPSHOT_DIR = robottelo_root_dir.joinpath('.settings_snapshots')
+# files and environment variables the settings are built from
+SETTINGS_INPUT_FILES = (
+    'settings.yaml',
+    'conf/*.yaml',
+    'conf/dynaconf_hooks.py',
+    'conf/migrations.py',
+    'settings.local.yaml',
+    '.secrets.yaml',
+    '.secrets_*.yaml',
+    '.env',
+    # the ohsnap data cached by conf/dynaconf_hooks.py without robottelo.settings.get_fresh
+    'settings_cache-*.json',
+)
+SETTINGS_INPUT_ENVVARS = ('ROBOTTELO_', 'VAULT_', 'DYNACONF_')
+
+
+def settings_snapshot_key():
+    """Return a hash of everything the settings are built from"""
+    digest = hashlib.sha256(version('dynaconf').encode())
+    paths = {path for pattern in SETTINGS_INPUT_FILES for path in robottelo_root_dir.glob(pattern)}
+    for path in [*sorted(paths), Path(validators.__file__)]:
+        digest.update(str(path).encode())
+        digest.update(path.read_bytes())
+    for name in sorted(os.environ):
+        if name.startswith(SETTINGS_INPUT_ENVVARS):
+            digest.update(f'{name}={os.environ[name]}'.encode())
+    return digest.hexdigest()
+
+
+def _snapshot_settings(data):
+    """Return a settings object holding already validated data"""
+    settings = LazySettings(core_loaders=[], loaders=[], envless_mode=True, lowercase_read=True)
+    settings.update(data, loader_identifier='settings_snapshot')
+    settings.validators.register(**VALIDATORS)
+    return settings
+
+
+def load_settings_snapshot(key):
+    """Return settings from the snapshot stored under key, None if there is no valid one
+
+    The snapshot may contain data fetched by the dynaconf hooks (ohsnap) or from Vault,
+    it expires after ``robottelo.settings.snapshot_ttl`` seconds to keep that data fresh.
+    A snapshot of settings with ``robottelo.settings.get_fresh`` enabled is never used, the
+    hooks have to fetch that data again.
+    """
+    path = SETTINGS_SNAPSHOT_DIR.joinpath(f'{key}.pickle')
+    try:
+        snapshot = pickle.loads(path.read_bytes())
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+    if time.time() - snapshot['created'] > snapshot['ttl']:
+        return None
+    settings = _snapshot_settings(snapshot['data'])
+    if settings.robottelo.settings.get('get_fresh', True):
+        return None
+    return settings
+
+
+def write_settings_snapshot(key, settings):
+    """Store the validated settings under key, readable by the current user only
+
+    Nothing is stored when the snapshot is disabled or ``robottelo.settings.get_fresh``
+    asks for the ohsnap data to be fetched on every start.
+    """
+    ttl = settings.robottelo.settings.get('snapshot_ttl', 0)
+    if not ttl or settings.robottelo.settings.get('get_fresh', True):
+        return
+    SETTINGS_SNAPSHOT_DIR.mkdir(mode=0o700, exist_ok=True)
+    for old in SETTINGS_SNAPSHOT_DIR.glob('*.pickle'):
+        old.unlink(missing_ok=True)
+    snapshot = {'created': time.time(), 'ttl': ttl, 'data': settings.as_dict()}
+    # written to a temporary file first, other processes may be reading the snapshot
+    with tempfile.NamedTemporaryFile(dir=SETTINGS_SNAPSHOT_DIR, delete=False) as f:
+        f.write(pickle.dumps(snapshot))
+    os.replace(f.name, SETTINGS_SNAPSHOT_DIR.joinpath(f'{key}.pickle'))
+
 
 def get_settings():
     """Return Lazy settings object after validating
 
+    Validated settings are stored as a snapshot, later starts load the snapshot instead of
+    building and validating the settings again until any of their inputs change.
+
     :return: A validated Lazy settings object
     """
     if getattr(builtins, "__sphinx_build__", False):
         return None
+    key = settings_snapshot_key()
+    if (settings := load_settings_snapshot(key)) is not None:
+        return settings
     settings = LazySettings(
         envvar_prefix="ROBOTTELO",
         core_loaders=["YAML"],
@@ -42,10 +131,14 @@ def get_settings():
             logger.warning(f'Dynaconf validation failed with\n{err}')
         else:
             raise err
+    write_settings_snapshot(key, settings)
     return settings
 
 
+settings_start = time.perf_counter()
 settings = get_settings()
+# seconds the settings bootstrap added to the startup, reported in the pytest header
+settings_load_time = time.perf_counter() - settings_start
 robottelo_tmp_dir = Path(settings.robottelo.tmp_dir)
 robottelo_tmp_dir.mkdir(parents=True, exist_ok=True)
 
@@ -94,6 +187,8 @@ def admin_nailgun_config():
     :return: ``nailgun.config.ServerConfig`` object, populated from admin user credentials.
 
     """
+    from nailgun.config import ServerConfig
+
     return ServerConfig(get_url(), get_credentials(), verify=settings.server.verify_ca)
 
 
@@ -107,6 +202,8 @@ def user_nailgun_config(username=None, password=None):
         with values from ``robottelo.config.settings``
 
     """
+    from nailgun.config import ServerConfig
+
     creds = (username, password)
     return ServerConfig(get_url(), creds, verify=settings.server.verify_ca)
 
@@ -166,9 +263,6 @@ def configure_nailgun():
     entities.GPGKey.__init__ = patched_gpgkey_init
 
 
-configure_nailgun()
-
-
 def configure_airgun():
     """Pass required settings to AirGun"""
     import airgun
@@ -195,4 +289,6 @@ def configure_airgun():
     )
 
 
-configure_airgun()
+# NailGun and AirGun are configured when first imported, not every process needs them
+configure_on_import('nailgun.entities', configure_nailgun)
+configure_on_import('airgun', configure_airgun)
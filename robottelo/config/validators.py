@@ -219,6 +219,7 @@ VALIDATORS = dict(
             'github_repos.base_marker', default='', is_type_of=str, apply_default_on_none=True
         ),
         Validator('github_repos.token', default='', is_type_of=str, apply_default_on_none=True),
+        Validator('github_repos.cache_dir', default='.upstream_pr_cache'),
     ],
     http_proxy=[
         Validator(
@@ -266,6 +267,10 @@ VALIDATORS = dict(
         Validator('jira.issue_status', default=["Testing", "Release Pending"]),
         Validator('jira.cache_file', default='jira_status_cache.json'),
         Validator('jira.cache_ttl_days', default=7, is_type_of=int),
+        Validator('jira.comment_workers', default=8, is_type_of=int),
+        Validator('jira.comment_retries', default=3, is_type_of=int),
+        Validator('jira.comment_backoff', default=2),
+        Validator('jira.comment_journal', default='jira_comments_journal.jsonl'),
     ],
     ldap=[
         Validator(
@@ -281,6 +286,13 @@ VALIDATORS = dict(
             must_exist=True,
         ),
     ],
+    manifest=[
+        Validator('manifest.pool.enabled', default=False, is_type_of=bool),
+        Validator('manifest.pool.offline', default=False, is_type_of=bool),
+        Validator('manifest.pool.directory', default=''),
+        Validator('manifest.pool.expiry', default=86400, cast=int),
+        Validator('manifest.pool.size', default=2, cast=int),
+    ],
     mcp=[
         Validator(
             'foreman_mcp.username',
@@ -344,6 +356,9 @@ VALIDATORS = dict(
             must_exist=True,
         ),
         Validator('report_portal.fail_threshold', default=20),
+        Validator('report_portal.page_size', default=300),
+        Validator('report_portal.workers', default=8),
+        Validator('report_portal.cache_dir', default='.report_portal_cache'),
     ],
     rh_cloud=[
         Validator('rh_cloud.token', required=True),
@@ -432,6 +447,7 @@ VALIDATORS = dict(
         Validator('robottelo.stage_docs_url', default='https://docs.redhat.com'),
         Validator('robottelo.custom_docs_url', default=''),
         Validator('robottelo.settings.ignore_validation_errors', is_type_of=bool, default=False),
+        Validator('robottelo.settings.snapshot_ttl', default=3600, cast=int),
         Validator('robottelo.rhel_source', default='ga', is_in=['ga', 'internal']),
         Validator(
             'robottelo.sat_non_ga_versions',
@@ -453,6 +469,10 @@ VALIDATORS = dict(
         Validator('shared_function.call_retries', default=2),
         Validator('shared_function.redis_password', default=None),
     ],
+    ui=[
+        Validator('ui.session_pool.enabled', default=False, is_type_of=bool),
+        Validator('ui.session_pool.size', default=2, cast=int),
+    ],
     upgrade=[
         Validator('upgrade.capsule_ak', must_exist=True),
     ],
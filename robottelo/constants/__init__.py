@@ -3,7 +3,6 @@
 from pathlib import Path
 
 from box import Box
-from nailgun import entities
 
 # This should be updated after each version branch
 SATELLITE_VERSION = "6.21"
@@ -174,8 +173,6 @@ AZURERM_FILE_URI = (
     'https://raw.githubusercontent.com/SatelliteQE/robottelo/master/tests/foreman/data/uri.sh'
 )
 
-OPERATING_SYSTEMS = entities._OPERATING_SYSTEMS
-
 TEMPLATE_TYPES = [
     'finish',
     'iPXE',
@@ -1078,6 +1075,7 @@ CUSTOM_PUPPET_MODULE_REPOS_VERSION = '-0.2.0.tar.gz'
 PULP_ARTIFACT_DIR = '/var/lib/pulp/media/artifact/'
 PULP_EXPORT_DIR = '/var/lib/pulp/exports/'
 PULP_IMPORT_DIR = '/var/lib/pulp/imports/'
+GOLDEN_STATE_DIR = '/var/lib/robottelo/golden-states'
 EXPORT_LIBRARY_NAME = 'Export-Library'
 SUPPORTED_REPO_CHECKSUMS = ['sha256', 'sha384', 'sha512']
 SUPPORTED_MIRRORING_POLICIES = {
@@ -2090,13 +2088,13 @@ BOOKMARK_ENTITIES_SELECTION = [
     {
         'name': 'UserGroup',
         'controller': 'usergroups',
-        'setup': entities.UserGroup,
+        'setup': 'UserGroup',
         'session_name': 'usergroup',
     },
     {
         'name': 'PartitionTable',
         'controller': 'ptables',
-        'setup': entities.PartitionTable,
+        'setup': 'PartitionTable',
         'session_name': 'partitiontable',
     },
     {
@@ -2646,3 +2644,12 @@ class DataFile(Box):
     EXPIRED_MANIFEST_FILE = DATA_DIR.joinpath(EXPIRED_MANIFEST)
     USAGE_REPORT_ITEMS = DATA_DIR.joinpath('usage_report.yml')
     USAGE_REPORT_ITEMS_CONDENSED = DATA_DIR.joinpath('usage_report_condensed.yml')
+
+
+def __getattr__(name):
+    """Provide the constants that need nailgun.entities, which is expensive to import"""
+    if name == 'OPERATING_SYSTEMS':
+        from nailgun import entities
+
+        return entities._OPERATING_SYSTEMS
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -136,3 +136,15 @@ class CLIDataBaseError(CLIBaseError):
 
 class NoManifestProvidedError(Exception):
     """Raised when a manifest is not provided to a helper function that expects one"""
+
+
+class FileTransferError(Exception):
+    """Indicates a failed file transfer between the test runner and a host."""
+
+
+class ContentNotReadyError(Exception):
+    """Raised when a task the content of a fixture waits for failed or timed out"""
+
+
+class CassetteMismatchError(Exception):
+    """Raised when a replayed command is not recorded in the cassette of the test"""
@@ -1,6 +1,7 @@
 from robottelo.host_helpers.capsule_mixins import CapsuleInfo, EnablePluginsCapsule
 from robottelo.host_helpers.contenthost_mixins import (
     HostInfo,
+    HostStateCache,
     SystemFacts,
     VersionedContent,
 )
@@ -8,6 +9,7 @@ from robottelo.host_helpers.satellite_mixins import (
     ContentInfo,
     EnablePluginsSatellite,
     Factories,
+    GoldenState,
     InstallationVerification,
     IoPSetup,
     ProvisioningSetup,
@@ -15,7 +17,7 @@ from robottelo.host_helpers.satellite_mixins import (
 )
 
 
-class ContentHostMixins(HostInfo, SystemFacts, VersionedContent):
+class ContentHostMixins(HostInfo, HostStateCache, SystemFacts, VersionedContent):
     pass
 
 
@@ -26,6 +28,7 @@ class CapsuleMixins(CapsuleInfo, EnablePluginsCapsule):
 class SatelliteMixins(
     ContentInfo,
     Factories,
+    GoldenState,
     SystemInfo,
     EnablePluginsSatellite,
     ProvisioningSetup,
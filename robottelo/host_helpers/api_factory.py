@@ -23,6 +23,7 @@ from robottelo.constants import (
     REPOSET,
 )
 from robottelo.exceptions import APIResponseError
+from robottelo.host_helpers.bulk import bulk_overrides, run_bulk
 from robottelo.host_helpers.repository_mixins import initiate_repo_helpers
 from robottelo.utils.ohsnap import dogfood_repository
 
@@ -53,6 +54,21 @@ class APIFactory:
             )
         return result['results'][0]['id']
 
+    def make_many(self, entity, count=None, overrides=None, max_workers=10):
+        """Create many nailgun entities of one kind concurrently
+
+        The entities are all instantiated with their fields before any of them is created.
+
+        :param str entity: nailgun entity class name, like 'HostCollection'
+        :param int count: number of entities, optional when overrides is a list
+        :param overrides: fields of every entity, or a list with the fields of each entity
+        :param int max_workers: maximum number of API requests running at the same time
+        :return: BulkResult with the created entities in order, and the errors by index
+        """
+        entity_cls = getattr(self._satellite.api, entity)
+        entities = [entity_cls(**item) for item in bulk_overrides(count, overrides)]
+        return run_bulk([item.create for item in entities], max_workers=max_workers)
+
     def make_http_proxy(self, org, http_proxy_type, use_ip=False):
         """
         Creates HTTP proxy.
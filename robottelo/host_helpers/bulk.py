@@ -0,0 +1,69 @@
+"""Concurrent creation of many entities of one kind, used by the ``make_many`` methods of
+the CLI and API factories.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from robottelo.logging import logger
+
+
+class BulkResult(list):
+    """Results of the calls in their order, ``None`` for the calls that failed
+
+    The errors of the failed calls are in ``errors``, by index.
+    """
+
+    def __init__(self, results, errors):
+        super().__init__(results)
+        self.errors = errors
+
+    @property
+    def created(self):
+        """Results of the calls that succeeded"""
+        return [result for index, result in enumerate(self) if index not in self.errors]
+
+    def raise_errors(self):
+        """Raise an ExceptionGroup of the errors, if any call failed"""
+        if not self.errors:
+            return
+        for index, error in self.errors.items():
+            error.add_note(f'item {index}')
+        raise ExceptionGroup(
+            f'{len(self.errors)} of {len(self)} items failed', list(self.errors.values())
+        )
+
+
+def bulk_overrides(count=None, overrides=None):
+    """Return the options of each item to create
+
+    :param int count: number of items, optional when overrides is a list
+    :param overrides: options common to every item, or a list with the options of each item
+    :return: list of dicts, one per item
+    """
+    if isinstance(overrides, list | tuple):
+        if count is not None and count != len(overrides):
+            raise ValueError(f'count {count} does not match the {len(overrides)} overrides')
+        return [dict(item) for item in overrides]
+    if count is None:
+        raise ValueError('count is required unless overrides has the options of each item')
+    return [dict(overrides or {}) for _ in range(count)]
+
+
+def run_bulk(calls, max_workers=10):
+    """Run the calls concurrently, at most max_workers at the same time
+
+    :return: BulkResult
+    """
+    results, errors = [None] * len(calls), {}
+    if not calls:
+        return BulkResult(results, errors)
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(calls))) as executor:
+        futures = [executor.submit(call) for call in calls]
+    for index, future in enumerate(futures):
+        if (error := future.exception()) is not None:
+            errors[index] = error
+        else:
+            results[index] = future.result()
+    if errors:
+        logger.warning(f'{len(errors)} of {len(calls)} items failed to be created')
+    return BulkResult(results, errors)
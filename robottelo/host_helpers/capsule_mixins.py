@@ -12,6 +12,7 @@ from robottelo.constants import (
     PUPPET_COMMON_INSTALLER_OPTS,
 )
 from robottelo.enums import NetworkType
+from robottelo.exceptions import ContentNotReadyError
 from robottelo.logging import logger
 from robottelo.utils.installer import InstallerCommand
 
@@ -70,6 +71,53 @@ class CapsuleInfo:
             raise AssertionError(f"No task was found using query '{search_query}'")
         return tasks
 
+    def wait_for_content_ready(self, tasks, timeout=2500, poll_rate=5):
+        """Wait for a set of in-flight tasks, like repository syncs and content view
+        publishes or promotions, to finish.
+
+        All the tasks are watched in one polling loop, with one search for the pending tasks
+        per poll, so the wait lasts as long as the slowest task rather than the sum of them.
+
+        :param tasks: tasks as returned by the asynchronous API calls, or their ids
+        :param timeout: maximum number of seconds to wait for all the tasks
+        :param poll_rate: delay between two polls
+        :return: dict of the seconds each task took to be seen finished, by task id
+        :raises robottelo.exceptions.ContentNotReadyError: as soon as a task did not succeed,
+            with its details, or if the tasks did not finish before the timeout
+        """
+        pending = {
+            task['id'] if isinstance(task, dict) else getattr(task, 'id', task) for task in tasks
+        }
+        durations = {}
+        start = time.monotonic()
+        while pending:
+            found = self.satellite.api.ForemanTask().search(
+                query={
+                    'search': ' or '.join(f'id = {task_id}' for task_id in sorted(pending)),
+                    'per_page': len(pending),
+                }
+            )
+            elapsed = time.monotonic() - start
+            for task in found:
+                if task.id not in pending or task.state not in ('stopped', 'paused'):
+                    continue
+                pending.discard(task.id)
+                durations[task.id] = elapsed
+                logger.info(f'Task {task.label} {task.id} finished in {elapsed:.0f}s')
+                if task.result != 'success':
+                    errors = (getattr(task, 'humanized', None) or {}).get('errors')
+                    raise ContentNotReadyError(
+                        f'Task {task.label} {task.id} finished with result {task.result} '
+                        f'after {elapsed:.0f}s: {errors or task.state}'
+                    )
+            if pending and elapsed > timeout:
+                raise ContentNotReadyError(
+                    f'Tasks {", ".join(sorted(pending))} did not finish in {timeout}s'
+                )
+            if pending:
+                time.sleep(poll_rate)
+        return durations
+
     def wait_for_sync(self, start_time=None, timeout=600):
         """Wait for capsule sync to finish and assert success.
         Assert that a task to sync lifecycle environment to the
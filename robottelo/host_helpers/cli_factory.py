@@ -30,6 +30,7 @@ from robottelo import constants
 from robottelo.cli.proxy import CapsuleTunnelError
 from robottelo.config import settings
 from robottelo.exceptions import CLIFactoryError, CLIReturnCodeError
+from robottelo.host_helpers.bulk import bulk_overrides, run_bulk
 from robottelo.host_helpers.repository_mixins import initiate_repo_helpers
 
 
@@ -109,7 +110,7 @@ ENTITY_FIELDS = {
     'partition_table': {
         'file': lambda: f'/tmp/{gen_alphanumeric()}',
         'name': gen_alphanumeric,
-        'os-family': partial(gen_choice, constants.OPERATING_SYSTEMS),
+        'os-family': lambda: gen_choice(constants.OPERATING_SYSTEMS),
     },
     'product': {'_redirect': 'product_with_credentials'},
     'product_with_credentials': {
@@ -296,6 +297,26 @@ class CLIFactory:
             }
         return None
 
+    def make_many(self, entity, count=None, overrides=None, max_workers=10):
+        """Create many entities of one kind with concurrent hammer commands
+
+        The default values of every entity are generated before any of them is created.
+        Fake hosts share their prerequisites (domain, medium, ...), which are created once.
+
+        :param str entity: entity name, like in make_<entity>
+        :param int count: number of entities, optional when overrides is a list
+        :param overrides: options of every entity, or a list with the options of each entity
+        :param int max_workers: maximum number of hammer commands running at the same time
+        :return: BulkResult with the entities in order, and the errors by index
+        """
+        items = bulk_overrides(count, overrides)
+        if entity == 'fake_host':
+            shared = self._fake_host_options(dict(overrides) if isinstance(overrides, dict) else {})
+            items = [shared | item for item in items]
+            entity = 'host'
+        calls = [partial(getattr(self, f'make_{entity}'), item) for item in items]
+        return run_bulk(calls, max_workers=max_workers)
+
     @lru_cache
     def _find_entity_class(self, entity_name):
         entity_name = entity_name.replace('_', '').lower()
@@ -407,9 +428,10 @@ class CLIFactory:
         """Wrapper function for make_host to pass all required options for creation
         of a fake host
         """
-        if options is None:
-            options = {}
+        return self.make_host(self._fake_host_options({} if options is None else options))
 
+    def _fake_host_options(self, options):
+        """Fill the options of a fake host with its prerequisites"""
         # Try to use default Satellite entities, otherwise create them if they were
         # not passed or defined previously
         if not options.get('organization') and not options.get('organization-id'):
@@ -487,8 +509,7 @@ class CLIFactory:
                     'organizations': options.get('organization'),
                 }
             )['id']
-
-        return self.make_host(options)
+        return options
 
     def make_proxy(self, options=None):
         """Creates a Proxy
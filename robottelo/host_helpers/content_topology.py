@@ -0,0 +1,480 @@
+"""Declarative content topology builder.
+
+A topology describes the content of an organization: products and their repositories,
+content views built from those repositories, a lifecycle environment path and activation
+keys. The builder turns the description into a graph of steps and runs it as a DAG, so that
+independent branches (creating and synchronizing several repositories, publishing several
+content views) run concurrently. Repository syncs are started asynchronously and their
+tasks are watched until they finish.
+
+It is not meant to be used directly, but as part of a robottelo.hosts.Satellite instance
+example:
+
+    topology = TopologySpec(
+        lifecycle_environments=['dev', 'qa'],
+        products=[ProductSpec(repos=[RepoSpec(name='zoo', url=settings.repos.yum_1.url)])],
+        content_views=[ContentViewSpec(name='cv', repos=['zoo'])],
+        activation_keys=[ActivationKeySpec(name='ak', content_view='cv')],
+    )
+    result = my_satellite.build_content_topology(topology, backend='cli')
+    result.activation_keys['ak'].id
+"""
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+import threading
+import time
+from typing import Any
+
+from box import Box
+from fauxfactory import gen_alpha
+
+from robottelo.config import settings
+from robottelo.constants import DEFAULT_ARCHITECTURE
+from robottelo.logging import logger
+
+
+@dataclass
+class RepoSpec:
+    """A repository, either custom (``url``) or Red Hat (``rh``)
+
+    ``rh`` is a repository definition like the entries of ``robottelo.constants.REPOS``,
+    with ``product``, ``reposet``, ``name`` and optional ``releasever`` and ``basearch`` keys.
+    """
+
+    name: str = field(default_factory=gen_alpha)
+    url: str | None = None
+    content_type: str = 'yum'
+    rh: dict | None = None
+    sync: bool = True
+    options: dict = field(default_factory=dict)
+
+
+@dataclass
+class ProductSpec:
+    """A custom product and its repositories"""
+
+    name: str = field(default_factory=gen_alpha)
+    repos: list[RepoSpec] = field(default_factory=list)
+
+
+@dataclass
+class ContentViewSpec:
+    """A content view made of the repositories with the given names"""
+
+    name: str = field(default_factory=gen_alpha)
+    repos: list[str] = field(default_factory=list)
+    publish: bool = True
+    promote: bool = True
+
+
+@dataclass
+class ActivationKeySpec:
+    """An activation key for a content view in a lifecycle environment
+
+    The last environment of the topology path is used when ``lifecycle_environment``
+    is not set, or Library when the path is empty. The content view must be published.
+    """
+
+    name: str = field(default_factory=gen_alpha)
+    content_view: str | None = None
+    lifecycle_environment: str | None = None
+    enable_repos: bool = True
+
+
+@dataclass
+class TopologySpec:
+    """The whole content topology of an organization, ``org`` is created when not set"""
+
+    org: Any = None
+    lifecycle_environments: list[str] = field(default_factory=list)
+    products: list[ProductSpec] = field(default_factory=list)
+    rh_repos: list[RepoSpec] = field(default_factory=list)
+    content_views: list[ContentViewSpec] = field(default_factory=list)
+    activation_keys: list[ActivationKeySpec] = field(default_factory=list)
+
+
+@dataclass
+class TopologyResult:
+    """Entities created for a topology, keyed by their spec name
+
+    Values are nailgun entities for the API backend and Box objects for the CLI backend,
+    both give access to ``.id``.
+    """
+
+    org: Any = None
+    lifecycle_environments: dict = field(default_factory=dict)
+    products: dict = field(default_factory=dict)
+    repositories: dict = field(default_factory=dict)
+    content_views: dict = field(default_factory=dict)
+    content_view_versions: dict = field(default_factory=dict)
+    activation_keys: dict = field(default_factory=dict)
+    durations: dict = field(default_factory=dict)
+
+
+def run_dag(steps, max_workers=8):
+    """Run steps as soon as all of their dependencies are done.
+
+    :param dict steps: {key: (dependency keys, callable)}
+    :param int max_workers: maximum number of steps running at the same time
+    :return: dict of {key: duration in seconds}
+    :raises ValueError: if a dependency is unknown or the graph has a cycle
+    :raises: the exception of the first failing step, no new step is started after it
+    """
+    for key, (deps, _) in steps.items():
+        if unknown := set(deps) - set(steps):
+            raise ValueError(f'Step {key} depends on unknown steps {unknown}')
+
+    def _timed(func):
+        start = time.monotonic()
+        func()
+        return time.monotonic() - start
+
+    pending, running, durations = dict(steps), {}, {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            for key, (deps, func) in list(pending.items()):
+                if all(dep in durations for dep in deps):
+                    running[executor.submit(_timed, func)] = key
+                    del pending[key]
+            if not running:
+                raise ValueError(f'Steps {list(pending)} have cyclic dependencies')
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                key = running.pop(future)
+                if error := future.exception():
+                    error.add_note(f'content topology step "{key}" failed')
+                    raise error
+                durations[key] = future.result()
+                logger.debug(f'content topology step "{key}" done in {durations[key]:.1f}s')
+    return durations
+
+
+class _APIBackend:
+    def __init__(self, satellite):
+        self.sat = satellite
+
+    def org(self, org):
+        if org is None:
+            return self.sat.api.Organization().create()
+        return self.sat.api.Organization(id=getattr(org, 'id', org)).read()
+
+    def lce(self, org, name, prior):
+        kwargs = {'prior': prior} if prior else {}
+        return self.sat.api.LifecycleEnvironment(organization=org, name=name, **kwargs).create()
+
+    def product(self, org, spec):
+        return self.sat.api.Product(organization=org, name=spec.name).create()
+
+    def repo(self, org, product, spec):
+        return self.sat.api.Repository(
+            product=product,
+            name=spec.name,
+            url=spec.url or settings.repos.yum_1.url,
+            content_type=spec.content_type,
+            **spec.options,
+        ).create()
+
+    def rh_repo(self, org, spec):
+        repo_id = self.sat.api_factory.enable_rhrepo_and_fetchid(
+            basearch=spec.rh.get('basearch', DEFAULT_ARCHITECTURE),
+            org_id=org.id,
+            product=spec.rh['product'],
+            repo=spec.rh['name'],
+            reposet=spec.rh['reposet'],
+            releasever=spec.rh.get('releasever'),
+        )
+        return self.sat.api.Repository(id=repo_id).read()
+
+    def start_sync(self, repo):
+        return self.sat.api.Repository(id=repo.id).sync(synchronous=False)['id']
+
+    def content_view(self, org, spec, repos):
+        return self.sat.api.ContentView(organization=org, name=spec.name, repository=repos).create()
+
+    def publish(self, content_view):
+        content_view.publish()
+        versions = content_view.read().version
+        return max(versions, key=lambda version: version.id).read()
+
+    def promote(self, version, lce):
+        version.promote(data={'environment_ids': lce.id})
+
+    def activation_key(self, org, spec, cvenv_id):
+        return self.sat.api.ActivationKey(
+            organization=org, name=spec.name, content_view_environment_ids=[cvenv_id]
+        ).create()
+
+    def enable_repo(self, ak, repo):
+        label = self.sat.api.Repository(id=repo.id).read_json()['content_label']
+        ak.content_override(data={'content_overrides': [{'content_label': label, 'value': '1'}]})
+
+
+class _CLIBackend:
+    """hammer commands are not thread safe (the CLI classes keep the subcommand as a class
+    attribute), so they are serialized, only the waiting for sync tasks runs concurrently."""
+
+    def __init__(self, satellite):
+        self.sat = satellite
+        self.lock = threading.Lock()
+
+    def org(self, org):
+        with self.lock:
+            if org is None:
+                return self.sat.cli_factory.make_org()
+            return Box(self.sat.cli.Org.info({'id': getattr(org, 'id', org)}))
+
+    def lce(self, org, name, prior):
+        with self.lock:
+            return self.sat.cli_factory.make_lifecycle_environment(
+                {
+                    'organization-id': org.id,
+                    'name': name,
+                    'prior': prior.name if prior else 'Library',
+                }
+            )
+
+    def product(self, org, spec):
+        with self.lock:
+            return self.sat.cli_factory.make_product({'organization-id': org.id, 'name': spec.name})
+
+    def repo(self, org, product, spec):
+        with self.lock:
+            return self.sat.cli_factory.make_repository(
+                {
+                    'organization-id': org.id,
+                    'product-id': product.id,
+                    'name': spec.name,
+                    'url': spec.url or settings.repos.yum_1.url,
+                    'content-type': spec.content_type,
+                    **spec.options,
+                }
+            )
+
+    def rh_repo(self, org, spec):
+        with self.lock:
+            self.sat.cli.RepositorySet.enable(
+                {
+                    'basearch': spec.rh.get('basearch', DEFAULT_ARCHITECTURE),
+                    'name': spec.rh['reposet'],
+                    'organization-id': org.id,
+                    'product': spec.rh['product'],
+                    'releasever': spec.rh.get('releasever'),
+                }
+            )
+            return Box(
+                self.sat.cli.Repository.info(
+                    {
+                        'name': spec.rh['name'],
+                        'organization-id': org.id,
+                        'product': spec.rh['product'],
+                    }
+                )
+            )
+
+    def start_sync(self, repo):
+        with self.lock:
+            return self.sat.cli.Repository.synchronize({'id': repo.id, 'async': True})[0]['id']
+
+    def content_view(self, org, spec, repos):
+        with self.lock:
+            content_view = self.sat.cli_factory.make_content_view(
+                {'organization-id': org.id, 'name': spec.name}
+            )
+            for repo in repos:
+                self.sat.cli.ContentView.add_repository(
+                    {'id': content_view.id, 'organization-id': org.id, 'repository-id': repo.id}
+                )
+            return content_view
+
+    def publish(self, content_view):
+        with self.lock:
+            self.sat.cli.ContentView.publish({'id': content_view.id})
+            return Box(self.sat.cli.ContentView.info({'id': content_view.id})['versions'][-1])
+
+    def promote(self, version, lce):
+        with self.lock:
+            self.sat.cli.ContentView.version_promote(
+                {'id': version.id, 'to-lifecycle-environment-id': lce.id}
+            )
+
+    def activation_key(self, org, spec, cvenv_id):
+        with self.lock:
+            return self.sat.cli_factory.make_activation_key(
+                {
+                    'organization-id': org.id,
+                    'name': spec.name,
+                    'content-view-environment-ids': cvenv_id,
+                }
+            )
+
+    def enable_repo(self, ak, repo):
+        with self.lock:
+            label = self.sat.cli.Repository.info({'id': repo.id})['content-label']
+            self.sat.cli.ActivationKey.content_override(
+                {'id': ak.id, 'content-label': label, 'value': 'true'}
+            )
+
+
+BACKENDS = {'api': _APIBackend, 'cli': _CLIBackend}
+
+
+class ContentTopologyBuilder:
+    """Build a :class:`TopologySpec` on a Satellite with the API or the CLI backend
+
+    :param satellite: Satellite object
+    :param str backend: 'api' or 'cli'
+    :param int max_workers: maximum number of steps running at the same time
+    :param int sync_timeout: maximum number of seconds to wait for each repository sync
+    """
+
+    def __init__(self, satellite, backend='api', max_workers=8, sync_timeout=3600):
+        self._satellite = satellite
+        self.backend = BACKENDS[backend](satellite)
+        self.max_workers = max_workers
+        self.sync_timeout = sync_timeout
+
+    def _wait_for_task(self, task_id):
+        self._satellite.api.ForemanTask(id=task_id).poll(
+            timeout=self.sync_timeout, must_succeed=True
+        )
+
+    def plan(self, spec, result):
+        """Return the steps of the topology for :func:`run_dag`, filling result when run"""
+        backend = self.backend
+        steps = {}
+        repo_specs = {}
+
+        def step(key, deps, func):
+            steps[key] = (tuple(deps), func)
+
+        step('org', [], lambda: setattr(result, 'org', backend.org(spec.org)))
+
+        prior = None
+        for name in spec.lifecycle_environments:
+
+            def create_lce(name=name, prior=prior):
+                prior_lce = result.lifecycle_environments[prior] if prior else None
+                result.lifecycle_environments[name] = backend.lce(result.org, name, prior_lce)
+
+            step(f'lce:{name}', ['org'] + ([f'lce:{prior}'] if prior else []), create_lce)
+            prior = name
+
+        def add_repo_steps(repo_spec, create_deps, create):
+            repo_specs[repo_spec.name] = repo_spec
+
+            def create_repo():
+                result.repositories[repo_spec.name] = create()
+
+            step(f'repo:{repo_spec.name}', create_deps, create_repo)
+            if repo_spec.sync:
+
+                def sync_repo():
+                    repo = result.repositories[repo_spec.name]
+                    self._wait_for_task(backend.start_sync(repo))
+
+                step(f'sync:{repo_spec.name}', [f'repo:{repo_spec.name}'], sync_repo)
+
+        for product_spec in spec.products:
+
+            def create_product(product_spec=product_spec):
+                result.products[product_spec.name] = backend.product(result.org, product_spec)
+
+            step(f'product:{product_spec.name}', ['org'], create_product)
+            for repo_spec in product_spec.repos:
+                add_repo_steps(
+                    repo_spec,
+                    [f'product:{product_spec.name}'],
+                    lambda product_spec=product_spec, repo_spec=repo_spec: backend.repo(
+                        result.org, result.products[product_spec.name], repo_spec
+                    ),
+                )
+        for repo_spec in spec.rh_repos:
+            add_repo_steps(
+                repo_spec,
+                ['org'],
+                lambda repo_spec=repo_spec: backend.rh_repo(result.org, repo_spec),
+            )
+
+        for cv_spec in spec.content_views:
+            if unknown := set(cv_spec.repos) - set(repo_specs):
+                raise ValueError(f'Content view {cv_spec.name} uses unknown repos {unknown}')
+
+            def create_cv(cv_spec=cv_spec):
+                repos = [result.repositories[name] for name in cv_spec.repos]
+                result.content_views[cv_spec.name] = backend.content_view(
+                    result.org, cv_spec, repos
+                )
+
+            step(f'cv:{cv_spec.name}', ['org'] + [f'repo:{r}' for r in cv_spec.repos], create_cv)
+            if not cv_spec.publish:
+                continue
+
+            def publish_cv(cv_spec=cv_spec):
+                result.content_view_versions[cv_spec.name] = backend.publish(
+                    result.content_views[cv_spec.name]
+                )
+
+            syncs = [f'sync:{r}' for r in cv_spec.repos if repo_specs[r].sync]
+            step(f'publish:{cv_spec.name}', [f'cv:{cv_spec.name}', *syncs], publish_cv)
+            if cv_spec.promote and spec.lifecycle_environments:
+
+                def promote_cv(cv_spec=cv_spec):
+                    for name in spec.lifecycle_environments:
+                        backend.promote(
+                            result.content_view_versions[cv_spec.name],
+                            result.lifecycle_environments[name],
+                        )
+
+                step(
+                    f'promote:{cv_spec.name}',
+                    [f'publish:{cv_spec.name}', f'lce:{spec.lifecycle_environments[-1]}'],
+                    promote_cv,
+                )
+
+        cv_specs = {cv_spec.name: cv_spec for cv_spec in spec.content_views}
+        for ak_spec in spec.activation_keys:
+            if ak_spec.content_view not in cv_specs:
+                raise ValueError(
+                    f'Activation key {ak_spec.name} uses unknown content view {ak_spec.content_view}'
+                )
+            lce_name = ak_spec.lifecycle_environment or (
+                spec.lifecycle_environments[-1] if spec.lifecycle_environments else None
+            )
+            cv_spec = cv_specs[ak_spec.content_view]
+            if not cv_spec.publish:
+                raise ValueError(
+                    f'Activation key {ak_spec.name} uses content view {cv_spec.name} '
+                    'which is not published'
+                )
+            cv_step = (
+                f'promote:{cv_spec.name}'
+                if cv_spec.promote and spec.lifecycle_environments
+                else f'publish:{cv_spec.name}'
+            )
+            deps = [cv_step] + ([f'lce:{lce_name}'] if lce_name else [])
+
+            def create_ak(ak_spec=ak_spec, cv_spec=cv_spec, lce_name=lce_name):
+                lce = (
+                    result.lifecycle_environments[lce_name]
+                    if lce_name
+                    else self._satellite.api.LifecycleEnvironment(
+                        organization=result.org.id
+                    ).search(query={'search': 'name=Library'})[0]
+                )
+                content_view = result.content_views[cv_spec.name]
+                cvenv_id = self._satellite.api_factory.get_cvenv_id(content_view.id, lce.id)
+                ak = backend.activation_key(result.org, ak_spec, cvenv_id)
+                if ak_spec.enable_repos:
+                    for name in cv_spec.repos:
+                        backend.enable_repo(ak, result.repositories[name])
+                result.activation_keys[ak_spec.name] = ak
+
+            step(f'ak:{ak_spec.name}', deps, create_ak)
+        return steps
+
+    def build(self, spec):
+        """Build the topology and return a :class:`TopologyResult`"""
+        result = TopologyResult()
+        result.durations = run_dag(self.plan(spec, result), max_workers=self.max_workers)
+        return result
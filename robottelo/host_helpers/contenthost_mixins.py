@@ -2,7 +2,9 @@
 
 from functools import cached_property
 import json
+import re
 from tempfile import NamedTemporaryFile
+import time
 
 from robottelo import constants
 from robottelo.config import robottelo_tmp_dir, settings
@@ -164,6 +166,61 @@ class HostInfo:
         return self.nailgun_host.read().content_facet_attributes['applicable_package_count']
 
 
+class HostStateCache:
+    """Helpers mixin that caches state read from a host, like facts or rhsm identity
+
+    Cached values are kept until they are invalidated by a helper changing the state
+    (``set_facts``, ``register``, ``unregister``, ``reset_rhsm``...) or by a command run through
+    ``execute`` which may change it. ``host_state_ttl`` maps state keys to a maximum age
+    in seconds, values without a TTL never expire.
+    """
+
+    host_state_ttl = {}
+    # commands reading the cached state, they never invalidate it
+    host_state_read_cmds = (
+        'subscription-manager identity',
+        'subscription-manager facts',
+        'cat /etc/rhsm/rhsm.conf',
+        'hostname -I',
+    )
+    # commands which may change registration, facts or network configuration of the host
+    host_state_changing_cmd = re.compile(
+        r'subscription-manager|rhsm|regist|rhc\b|hostname|nmcli|\bip\s+(addr|link)|/etc/hosts'
+    )
+
+    @property
+    def _host_state(self):
+        return self.__dict__.setdefault('_host_state_cache', {})
+
+    def cached_state(self, key, getter):
+        """Return the cached value of the key, calling getter when missing or expired"""
+        ttl = self.host_state_ttl.get(key)
+        if key in self._host_state:
+            value, timestamp = self._host_state[key]
+            if ttl is None or time.monotonic() - timestamp < ttl:
+                return value
+        value = getter()
+        self._host_state[key] = (value, time.monotonic())
+        return value
+
+    def invalidate_state(self, *keys):
+        """Drop the cached values of the keys, or of all of them when no key is given"""
+        if not keys:
+            self._host_state.clear()
+        for key in keys:
+            self._host_state.pop(key, None)
+
+    def invalidate_state_for(self, command):
+        """Drop all the cached values if the command may change the host state"""
+        if (
+            self._host_state
+            and command.strip() not in self.host_state_read_cmds
+            and self.host_state_changing_cmd.search(command)
+        ):
+            logger.debug(f'Invalidating cached state of {self.hostname} after: {command}')
+            self.invalidate_state()
+
+
 class SystemFacts:
     """Helpers mixin that enables getting/setting subscription-manager facts on a host"""
 
@@ -186,8 +243,17 @@ class SystemFacts:
                 return {filename: json.loads(result.stdout)}
         return {}
 
-    def get_facts(self):
-        """Get a dictionary representation of all subscription-manager facts"""
+    def get_facts(self, refresh=False):
+        """Get a dictionary representation of all subscription-manager facts
+
+        The facts are cached until they are changed through this host object,
+        use ``refresh`` to read them again from the host.
+        """
+        if refresh:
+            self.invalidate_state('facts')
+        return dict(self.cached_state('facts', self._read_facts))
+
+    def _read_facts(self):
         result = self.execute('subscription-manager facts')
         fact_dict, last_key = {}, None
         if result.status == 0:
@@ -217,3 +283,4 @@ class SystemFacts:
                 json.dump(facts, tf)
                 tf.flush()
                 self.put(tf.name, f'/etc/rhsm/facts/{filename}')
+        self.invalidate_state('facts')
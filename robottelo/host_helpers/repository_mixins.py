@@ -3,8 +3,10 @@ All the Repository classes in this module are supposed to use from sat_object.cl
 The direct import of the repo classes in this module is prohibited !!!!!
 """
 
+from concurrent.futures import ThreadPoolExecutor
 import inspect
 import sys
+import time
 
 from robottelo import constants
 from robottelo.config import settings
@@ -16,6 +18,10 @@ from robottelo.exceptions import (
     RepositoryAlreadyDefinedError,
     RepositoryDataNotFound,
 )
+from robottelo.logging import logger
+
+# maximum number of seconds to wait for a repository sync
+REPOSITORY_SYNC_TIMEOUT = 4800
 
 
 def initiate_repo_helpers(satellite):
@@ -103,9 +109,20 @@ class BaseRepository:
             self.synchronize()
         return repo_info
 
-    def synchronize(self):
-        """Synchronize the repository"""
-        self.satellite.cli.Repository.synchronize({'id': self.repo_info['id']}, timeout=4800000)
+    def synchronize(self, synchronous=True):
+        """Synchronize the repository
+
+        :param bool synchronous: wait for the sync to finish, when False the sync task is only
+            started and its id is returned
+        """
+        if not synchronous:
+            return self.satellite.cli.Repository.synchronize(
+                {'id': self.repo_info['id'], 'async': True}
+            )[0]['id']
+        self.satellite.cli.Repository.synchronize(
+            {'id': self.repo_info['id']}, timeout=REPOSITORY_SYNC_TIMEOUT * 1000
+        )
+        return None
 
     def add_to_content_view(self, organization_id, content_view_id):
         """Associate repository content to content-view"""
@@ -437,7 +454,12 @@ class GenericRHRepository(BaseRepository):
             if synchronize:
                 self.synchronize()
         else:
-            repo_info = super().create(organization_id, product_id, download_policy=download_policy)
+            repo_info = super().create(
+                organization_id,
+                product_id,
+                download_policy=download_policy,
+                synchronize=synchronize,
+            )
         return repo_info
 
 
@@ -521,10 +543,12 @@ class RepositoryCollection:
     _custom_product_info = None
     _os_repo = None
     _setup_content_data = None
+    _sync_durations = None
     satellite = None
 
     def __init__(self, distro=None, repositories=None):
         self._items = []
+        self._sync_durations = {}
 
         if distro is not None and distro not in constants.DISTROS_SUPPORTED:
             raise DistroNotSupportedError(f'distro "{distro}" not supported')
@@ -587,6 +611,11 @@ class RepositoryCollection:
     def setup_content_data(self):
         return self._setup_content_data
 
+    @property
+    def sync_durations(self):
+        """Seconds each repository sync took, by repository name"""
+        return self._sync_durations
+
     @property
     def need_subscription(self):
         return bool(self.rh_repos)
@@ -640,16 +669,19 @@ class RepositoryCollection:
                 {'organization-id': org_id}
             )
         custom_product_id = custom_product['id'] if custom_product else None
+        # create all the repositories first, then sync them all at once
         for repo in self:
             repo_info = repo.create(
                 org_id,
                 custom_product_id,
                 download_policy=download_policy,
-                synchronize=synchronize,
+                synchronize=False,
             )
             repos_info.append(repo_info)
         self._custom_product_info = custom_product
         self._repos_info = repos_info
+        if synchronize:
+            self.synchronize()
         # Wait for metadata generation for repository creation for specific org
         task_query = f'Metadata generate "{custom_product.organization}"'
         self.satellite.wait_for_tasks(
@@ -659,6 +691,37 @@ class RepositoryCollection:
         )
         return custom_product, repos_info
 
+    def synchronize(self, timeout=REPOSITORY_SYNC_TIMEOUT):
+        """Start the sync of all the created repositories and wait for them together.
+
+        The time each sync took is kept in ``sync_durations``, so that slow upstream mirrors
+        can be spotted. If any of the syncs fails, the error of the first failed repository is
+        raised once all of them finished.
+
+        :param int timeout: maximum number of seconds to wait for each sync
+        """
+        if not self._repos_info:
+            raise ReposContentSetupWasNotPerformed('Repositories were not created yet')
+        started = {}
+        for repo in self:
+            started[repo.repo_info['name']] = (repo.synchronize(synchronous=False), time.time())
+
+        def wait_for_sync(name, task_id, start):
+            self.satellite.api.ForemanTask(id=task_id).poll(timeout=timeout, must_succeed=True)
+            self._sync_durations[name] = time.time() - start
+            logger.info(f'Repository {name} synced in {self._sync_durations[name]:.1f}s')
+
+        with ThreadPoolExecutor(max_workers=len(started)) as executor:
+            futures = {
+                name: executor.submit(wait_for_sync, name, task_id, start)
+                for name, (task_id, start) in started.items()
+            }
+        for name, future in futures.items():
+            if (error := future.exception()) is not None:
+                error.add_note(f'sync of repository "{name}" failed')
+                raise error
+        return self._sync_durations
+
     def setup_content_view(self, org_id, lce_id=None):
         """Setup organization content view by adding all the repositories, publishing and promoting
         to lce if needed.
@@ -1,5 +1,6 @@
 import contextlib
 from functools import lru_cache
+import hashlib
 import json
 import os
 import random
@@ -16,6 +17,7 @@ import yaml
 from robottelo.cli.proxy import CapsuleTunnelError
 from robottelo.config import robottelo_tmp_dir, settings
 from robottelo.constants import (
+    GOLDEN_STATE_DIR,
     PULP_EXPORT_DIR,
     PULP_IMPORT_DIR,
     PUPPET_COMMON_INSTALLER_OPTS,
@@ -25,8 +27,10 @@ from robottelo.enums import NetworkType
 from robottelo.exceptions import CLIReturnCodeError, NoManifestProvidedError, SatelliteHostError
 from robottelo.host_helpers.api_factory import APIFactory
 from robottelo.host_helpers.cli_factory import CLIFactory
+from robottelo.host_helpers.content_topology import ContentTopologyBuilder
 from robottelo.host_helpers.ui_factory import UIFactory
 from robottelo.logging import logger
+from robottelo.utils import transfer
 from robottelo.utils.installer import InstallerCommand
 
 
@@ -193,9 +197,8 @@ class ContentInfo:
         sets ownership, returns import path
         """
         if target and isinstance(target, Host) and target.hostname != self.hostname:
-            self.execute(
-                f'sshpass -p "{settings.server.ssh_password}" rsync -e "ssh -o StrictHostKeyChecking=no" -aPz '
-                f'{PULP_EXPORT_DIR}{org.name} root@{target.hostname}:{PULP_IMPORT_DIR}'
+            transfer.copy_tree(
+                self, f'{PULP_EXPORT_DIR}{org.name}', target, f'{PULP_IMPORT_DIR}{org.name}'
             )
             self.execute(f'rm -rf {PULP_EXPORT_DIR}{org.name}')
             target.execute(f'chown -R pulp:pulp {PULP_IMPORT_DIR}')
@@ -446,6 +449,98 @@ class Factories:
     def ui_factory(self, session):
         return UIFactory(self, session=session)
 
+    def build_content_topology(self, spec, backend='api', max_workers=8, sync_timeout=3600):
+        """Build a content topology, see robottelo.host_helpers.content_topology
+
+        :param spec: TopologySpec describing the organization content
+        :param str backend: 'api' (nailgun) or 'cli' (hammer)
+        :return: TopologyResult with the created entities and the duration of each step
+        """
+        return ContentTopologyBuilder(
+            self, backend=backend, max_workers=max_workers, sync_timeout=sync_timeout
+        ).build(spec)
+
+
+class GoldenState:
+    """Capture a named content state once and restore it instead of rebuilding it.
+
+    States are satellite-maintain backups kept on the Satellite itself, together with the
+    data returned by the code that built them (ids, names, ...), so they can only be restored
+    on the Satellite they were captured on. Restoring replaces the whole Satellite database,
+    only use it on a Satellite that is not shared with other tests running at the same time.
+    """
+
+    golden_state_data_file = 'robottelo-state.json'
+
+    def golden_state_key(self, name, params=None):
+        """Return the cache key of a state, params are anything the state depends on"""
+        blob = json.dumps([name, params, str(self.version)], sort_keys=True, default=str)
+        return f'{name}-{hashlib.sha256(blob.encode()).hexdigest()[:12]}'
+
+    def golden_state_path(self, key):
+        return f'{GOLDEN_STATE_DIR}/{key}'
+
+    def has_golden_state(self, key):
+        path = f'{self.golden_state_path(key)}/{self.golden_state_data_file}'
+        return self.execute(f'test -f {path}').status == 0
+
+    def capture_golden_state(self, key, data=None, backup_type='offline', skip_pulp_content=False):
+        """Back up the current state of the Satellite under key
+
+        :param key: cache key, see golden_state_key
+        :param data: JSON serializable data returned on restore
+        :param backup_type: 'offline' is consistent, 'online' keeps the services running
+        :param skip_pulp_content: only back up the databases and configuration, much faster
+            but only valid as long as Pulp artifacts are not removed in the meantime
+        """
+        path = self.golden_state_path(key)
+        self.execute(f'rm -rf {path} && mkdir -p {path} && chown postgres:postgres {path}')
+        options = {'assumeyes': True, 'plaintext': True, 'preserve-directory': True}
+        if skip_pulp_content:
+            options['skip-pulp-content'] = True
+        result = self.cli.Backup.run_backup(
+            backup_dir=path, backup_type=backup_type, options=options, timeout='2h'
+        )
+        if result.status != 0:
+            self.execute(f'rm -rf {path}')
+            raise SatelliteHostError(f'Failed to capture golden state {key}: {result.stdout}')
+        # written last, it marks the state as complete
+        self.put(json.dumps(data), f'{path}/{self.golden_state_data_file}', temp_file=True)
+        logger.info(f'Captured golden state {key} on {self.hostname}')
+
+    def restore_golden_state(self, key):
+        """Restore the state captured under key and return its data"""
+        path = self.golden_state_path(key)
+        result = self.cli.Restore.run(
+            backup_dir=path, options={'assumeyes': True, 'plaintext': True}, timeout='2h'
+        )
+        if result.status != 0:
+            raise SatelliteHostError(f'Failed to restore golden state {key}: {result.stdout}')
+        self.clean_cached_properties()
+        logger.info(f'Restored golden state {key} on {self.hostname}')
+        return json.loads(
+            self.execute(f'cat {path}/{self.golden_state_data_file}').stdout or 'null'
+        )
+
+    def delete_golden_state(self, key=None):
+        """Delete the state captured under key, or all of them"""
+        self.execute(f'rm -rf {self.golden_state_path(key) if key else GOLDEN_STATE_DIR}')
+
+    def golden_state(self, name, build, params=None, **capture_kwargs):
+        """Restore the named state if it was captured before, build and capture it otherwise
+
+        :param name: name of the state
+        :param build: callable building the state and returning JSON serializable data
+        :param params: anything the state depends on, part of the cache key
+        :return: the data returned by build
+        """
+        key = self.golden_state_key(name, params)
+        if self.has_golden_state(key):
+            return self.restore_golden_state(key)
+        data = build()
+        self.capture_golden_state(key, data, **capture_kwargs)
+        return data
+
 
 class IoPSetup:
     """Helper for configuring on prem Insights Advisor engine."""
@@ -12,24 +12,19 @@ import random
 import re
 import subprocess
 import sys
-from tempfile import NamedTemporaryFile
 import time
 from urllib.parse import urljoin, urlparse, urlsplit, urlunsplit
 
-import apypie
 from box import Box
 from broker import Broker
 from broker.helpers import FileLock
 from broker.hosts import Host
 from dynaconf.vendor.box.exceptions import BoxKeyError
 from fauxfactory import gen_alpha, gen_string
-from nailgun import entities
 from packaging.version import Version
 import pytest
 import requests
-from ssh2.exceptions import AuthenticationError
 from wait_for import TimedOutError, wait_for
-from wrapanapi.entities.vm import VmState
 import yaml
 
 from robottelo import constants
@@ -73,18 +68,17 @@ from robottelo.host_helpers import (
     ContentHostMixins,
     SatelliteMixins,
 )
-from robottelo.logging import logger
-from robottelo.utils import validate_ssh_pub_key
+from robottelo.logging import log_operation, logger, ssh_operation_name
+from robottelo.utils import transfer, validate_ssh_pub_key
 from robottelo.utils.datafactory import valid_emails_list
 from robottelo.utils.installer import InstallerCommand
 from robottelo.utils.issue_handlers import is_open
-
-POWER_OPERATIONS = {
-    VmState.RUNNING: 'running',
-    VmState.STOPPED: 'stopped',
-    'reboot': 'reboot',
-    # TODO paused, suspended, shelved?
-}
+from robottelo.utils.manifest_pool import forget_manifest_consumer
+from robottelo.utils.ui_session_pool import (
+    UISessionKey,
+    get_ui_session_pool,
+    select_ui_context,
+)
 
 
 @lru_cache
@@ -96,12 +90,15 @@ def lru_sat_ready_rhel(rhel_ver):
         'deploy_flavor': settings.flavors.default,
         'workflow': settings.server.deploy_workflows.os,
     }
-    return Broker(**deploy_args, host_class=Satellite).checkout()
+    sat = Broker(**deploy_args, host_class=Satellite).checkout()
+    forget_manifest_consumer(sat.hostname)
+    return sat
 
 
 def get_sat_version():
     """Try to read sat_version from envvar SATELLITE_VERSION
     if not available fallback to ssh connection to get it."""
+    from ssh2.exceptions import AuthenticationError
 
     try:
         sat_version = Satellite().version
@@ -117,6 +114,7 @@ def get_sat_version():
 def get_sat_rhel_version():
     """Try to read rhel_version from Satellite host
     if not available fallback to robottelo configuration."""
+    from ssh2.exceptions import AuthenticationError
 
     try:
         return Satellite().os_version
@@ -130,7 +128,6 @@ def get_sat_rhel_version():
 
 
 class ContentHost(Host, ContentHostMixins):
-    run = Host.execute
     default_timeout = settings.server.ssh_client.command_timeout
     # Extend the keep_keys tuple from the parent class
     keep_keys = (*Host.keep_keys, 'net_type', 'blank')
@@ -156,6 +153,14 @@ class ContentHost(Host, ContentHostMixins):
         self.blank = kwargs.get('blank', False)
         super().__init__(hostname=hostname, **kwargs)
 
+    def execute(self, command, timeout=None):
+        """Execute a command on the host, dropping the cached host state it may change"""
+        self.invalidate_state_for(command)
+        with log_operation('ssh', ssh_operation_name(command)):
+            return super().execute(command, timeout=timeout)
+
+    run = execute
+
     @property
     def network_type(self):
         if not hasattr(self, '_net_type'):
@@ -220,10 +225,14 @@ class ContentHost(Host, ContentHostMixins):
         logger.warning(f'Host {self.hostname} not registered to {self.satellite.hostname}')
         return None
 
+    @property
+    def _identity_result(self):
+        return self.cached_state('identity', lambda: self.execute('subscription-manager identity'))
+
     @property
     def subscribed(self):
         """Returns True if host is registered, False otherwise"""
-        result_status = self.execute('subscription-manager identity').status
+        result_status = self._identity_result.status
         if result_status not in [0, 1]:
             raise ValueError(
                 'Unexpected output from subscription-manager identity, anything else than RC:0 or RC:1 is unexpected!'
@@ -233,7 +242,7 @@ class ContentHost(Host, ContentHostMixins):
     @property
     def identity(self):
         """A Dictionary containing RHSM identity attributes of the host"""
-        id_output = self.execute('subscription-manager identity').stdout
+        id_output = self._identity_result.stdout
         id_dict = {}
         if id_output:
             id_dict = {
@@ -247,7 +256,9 @@ class ContentHost(Host, ContentHostMixins):
 
     @property
     def ip_addr(self):
-        ipv4, *ipv6 = self.execute('hostname -I').stdout.split()
+        ipv4, *ipv6 = self.cached_state(
+            'ip_addr', lambda: self.execute('hostname -I').stdout
+        ).split()
         return ipv4
 
     @cached_property
@@ -357,6 +368,7 @@ class ContentHost(Host, ContentHostMixins):
         for name in self.list_cached_properties():
             with contextlib.suppress(KeyError):  # ignore if property is not cached
                 del self.__dict__[name]
+        self.invalidate_state()
 
     def setup(self):
         logger.debug('START: setting up host %s', self)
@@ -381,11 +393,11 @@ class ContentHost(Host, ContentHostMixins):
 
         logger.debug('END: tearing down host %s', self)
 
-    def power_control(self, state=VmState.RUNNING, ensure=True):
+    def power_control(self, state=None, ensure=True):
         """Lookup the host workflow for power on and execute
 
         Args:
-            state: A VmState from wrapanapi.entities.vm or 'reboot'
+            state: A VmState from wrapanapi.entities.vm or 'reboot', VmState.RUNNING by default
             ensure: boolean indicating whether to try and connect to ensure power state
 
         Raises:
@@ -393,10 +405,19 @@ class ContentHost(Host, ContentHostMixins):
             BrokerError: various error types to do with broker execution
             ContentHostError: if the workflow status isn't successful and broker didn't raise
         """
+        from wrapanapi.entities.vm import VmState
+
+        power_operations = {
+            VmState.RUNNING: 'running',
+            VmState.STOPPED: 'stopped',
+            'reboot': 'reboot',
+            # TODO paused, suspended, shelved?
+        }
+        state = state or VmState.RUNNING
         if getattr(self, '_cont_inst', None):
             raise NotImplementedError('Power control not supported for container instances')
         try:
-            vm_operation = POWER_OPERATIONS.get(state)
+            vm_operation = power_operations.get(state)
             workflow_name = settings.broker.host_workflows.power_control
         except (AttributeError, KeyError) as err:
             raise NotImplementedError(
@@ -535,7 +556,9 @@ class ContentHost(Host, ContentHostMixins):
     @property
     def subscription_config(self):
         "Returns subscription config for the host as ConfigParser object"
-        config = self.execute('cat /etc/rhsm/rhsm.conf').stdout
+        config = self.cached_state(
+            'subscription_config', lambda: self.execute('cat /etc/rhsm/rhsm.conf').stdout
+        )
         cp = ConfigParser()
         cp.read_file(io.StringIO(config))
         return cp
@@ -598,6 +621,7 @@ class ContentHost(Host, ContentHostMixins):
         """
         self.execute(r'\cp -f /etc/rhsm/rhsm.conf{.bak,}')
         self.execute('subscription-manager clean')
+        self.invalidate_state()
         self._satellite = None
 
     def install_cockpit(self):
@@ -723,7 +747,9 @@ class ContentHost(Host, ContentHostMixins):
                 raise CLIFactoryError(f'User {auth_username} doesn\'t exist')
         else:
             cmd = target.satellite.cli.HostRegistration.generate_command(options)
-        return self.execute(cmd.strip('\n'))
+        result = self.execute(cmd.strip('\n'))
+        self.invalidate_state()
+        return result
 
     def api_register(self, target, **kwargs):
         """Register a content host using global registration through API.
@@ -736,7 +762,9 @@ class ContentHost(Host, ContentHostMixins):
         kwargs['setup_insights'] = kwargs.get('setup_insights', False)
         self._satellite = target.satellite
         command = target.satellite.api.RegistrationCommand(**kwargs).create()
-        return self.execute(command.strip('\n'))
+        result = self.execute(command.strip('\n'))
+        self.invalidate_state()
+        return result
 
     def register_contenthost(
         self,
@@ -807,7 +835,9 @@ class ContentHost(Host, ContentHostMixins):
         if baseurl:
             cmd += f' --baseurl {baseurl}'
 
-        return self.execute(cmd)
+        result = self.execute(cmd)
+        self.invalidate_state()
+        return result
 
     def unregister(self):
         """Run subscription-manager unregister.
@@ -816,7 +846,9 @@ class ContentHost(Host, ContentHostMixins):
             unregistration.
 
         """
-        return self.execute('subscription-manager unregister')
+        result = self.execute('subscription-manager unregister')
+        self.invalidate_state()
+        return result
 
     def configure_podman_cert_auth(self, sat):
         """Configure podman cert-based authentication.
@@ -842,26 +874,27 @@ class ContentHost(Host, ContentHostMixins):
         self.execute(f'rm -rf {CONTAINER_CERTS_PATH}{trail}')
 
     def get(self, remote_path, local_path=None):
-        """Get a remote file from the broker virtual machine."""
-        self.session.sftp_read(source=remote_path, destination=local_path)
+        """Get a remote file from the broker virtual machine.
+        Big files are downloaded in compressed, resumable chunks.
+        """
+        if local_path is None:
+            self.session.sftp_read(source=remote_path, destination=local_path)
+        else:
+            transfer.download(self, remote_path, local_path)
 
     def put(self, local_path, remote_path=None, temp_file=False):
         """Put a local file to the broker virtual machine.
-        If local_path is a manifest object, write its contents to a temporary file
-        then continue with the upload.
+        If local_path is a manifest object, upload its contents.
+        If temp_file is True, local_path is the content to upload.
+        Big files are uploaded in compressed, resumable chunks.
         """
         if temp_file:
-            with NamedTemporaryFile(dir=robottelo_tmp_dir) as content_file:
-                content_file.write(str.encode(local_path))
-                content_file.flush()
-                self.session.sftp_write(source=content_file.name, destination=remote_path)
+            source = str.encode(local_path)
         elif 'utils.manifest' in str(local_path):
-            with NamedTemporaryFile(dir=robottelo_tmp_dir) as content_file:
-                content_file.write(local_path.content.read())
-                content_file.flush()
-                self.session.sftp_write(source=content_file.name, destination=remote_path)
+            source = local_path.content.read()
         else:
-            self.session.sftp_write(source=str(local_path), destination=str(remote_path))
+            source = Path(local_path)
+        transfer.upload(self, source, remote_path)
 
     def put_ssh_key(self, source_key_path, destination_key_name):
         """Copy ssh key to virtual machine ssh path and ensure proper permission is set
@@ -1434,7 +1467,7 @@ class ContentHost(Host, ContentHostMixins):
         # like "virt-who-{hypervisor_hostname}-{organization_id}"
         virt_who_hypervisor_hostname = f'virt-who-{hypervisor_hostname}-{org["id"]}'
         # find the registered virt-who hypervisor host
-        org_hosts = entities.Host().search(
+        org_hosts = satellite.api.Host().search(
             query={'search': f'organization_id={org["id"]} and name={virt_who_hypervisor_hostname}'}
         )
         # Note: if one shot command was executed the report is immediately
@@ -1447,7 +1480,7 @@ class ContentHost(Host, ContentHostMixins):
             max_time = time.time() + 60
             while time.time() <= max_time:
                 time.sleep(5)
-                org_hosts = entities.Host().search(
+                org_hosts = satellite.api.Host().search(
                     query={
                         'search': f'organization_id={org["id"]}'
                         f' and name={virt_who_hypervisor_hostname}'
@@ -2408,6 +2441,26 @@ class Capsule(ContentHost, CapsuleMixins):
 
         return result
 
+    def _psql_command(self, db='foreman', db_user='foreman'):
+        """Return the psql command line for the database of the install method"""
+        if settings.server.install_method == InstallMethod.FOREMANCTL:
+            return f'podman exec -i postgresql psql -U {db_user} -d {db}'
+        return f'sudo -u postgres psql -d {db}'
+
+    def _execute_db_query(self, cmd):
+        result = self.execute(cmd)
+        if result.status != 0:
+            raise CLIReturnCodeError(result.status, result.stderr, f'"{cmd}" failed')
+        return result
+
+    def _psql_script_command(self, script, db, db_user, psql_args=''):
+        """Return a command feeding the script to psql on stdin, avoiding any shell quoting"""
+        script_b64 = base64.b64encode(script.encode('utf-8')).decode('ascii')
+        return (
+            f"echo '{script_b64}' | base64 -d | "
+            f'{self._psql_command(db, db_user)} -X -v ON_ERROR_STOP=1 {psql_args}'
+        )
+
     def query_db(self, query, db='foreman', output_format='json', db_user='foreman'):
         """Execute a PostgreSQL query and return the result.
 
@@ -2423,25 +2476,104 @@ class Capsule(ContentHost, CapsuleMixins):
         Raises:
             CLIReturnCodeError: If the database query fails
         """
-
-        def _execute_db_query(cmd):
-            result = self.execute(cmd)
-            if result.status != 0:
-                raise CLIReturnCodeError(result.status, result.stderr, f'"{cmd}" failed')
-            return result
-
-        if settings.server.install_method == InstallMethod.FOREMANCTL:
-            base_cmd = f'podman exec postgresql psql -U {db_user} -d {db}'
-        else:
-            base_cmd = f'sudo -u postgres psql -d {db}'
-
+        base_cmd = self._psql_command(db, db_user)
         if output_format == 'json':
             cmd = f'{base_cmd} -A -t -c "SELECT json_agg(row_to_json(t)) FROM ({query}) t"'
-            result = _execute_db_query(cmd)
+            result = self._execute_db_query(cmd)
             return json.loads(result.stdout) if result.stdout.strip() else []
 
         cmd = f'{base_cmd} -c "{query}"'
-        return _execute_db_query(cmd).stdout
+        return self._execute_db_query(cmd).stdout
+
+    def query_db_batch(self, queries, db='foreman', output_format='json', db_user='foreman'):
+        """Execute several PostgreSQL queries in a single psql session.
+
+        Args:
+            queries: list of SQL queries to execute, in order
+            db: Database name (default: 'foreman')
+            output_format: Output format - 'json' for JSON arrays, raw output otherwise
+            db_user: Database user (default: 'foreman')
+
+        Returns:
+            list with the result of each query, as returned by ``query_db``
+
+        Raises:
+            CLIReturnCodeError: If any of the queries fails, the following ones are not run
+        """
+        if not queries:
+            return []
+        marker = f'ROBOTTELO-QUERY-{gen_string("alphanumeric", 16)}'
+        script = []
+        for index, query in enumerate(queries):
+            query = query.strip().rstrip(';')
+            script.append(f'\\echo {marker} {index}')
+            if output_format == 'json':
+                script.append(f'SELECT json_agg(row_to_json(t)) FROM ({query}) t;')
+            else:
+                script.append(f'{query};')
+        psql_args = '-A -t -q' if output_format == 'json' else ''
+        stdout = self._execute_db_query(
+            self._psql_script_command('\n'.join(script), db, db_user, psql_args)
+        ).stdout
+        outputs = re.split(rf'^{marker} \d+\n?', stdout, flags=re.MULTILINE)[1:]
+        if output_format == 'json':
+            return [json.loads(output) if output.strip() else [] for output in outputs]
+        return outputs
+
+    def query_db_stream(
+        self, query, db='foreman', db_user='foreman', fetch_size=1000, limit=None, chunk_rows=None
+    ):
+        """Execute a PostgreSQL query and yield the resulting rows one by one.
+
+        psql fetches the rows through a cursor, ``fetch_size`` rows at a time (``FETCH_COUNT``),
+        and writes them as NDJSON to a temporary file on the host. The file is then read and
+        parsed in chunks of ``chunk_rows`` lines, each read starting at the byte offset where
+        the previous one stopped, so neither the database nor the test runner holds the whole
+        result set in memory.
+
+        Args:
+            query: SQL query to execute
+            db: Database name (default: 'foreman')
+            db_user: Database user (default: 'foreman')
+            fetch_size: Number of rows fetched from the cursor at a time
+            limit: Maximum number of rows to return, all of them when not set
+            chunk_rows: Number of rows transferred per read, ``fetch_size`` when not set
+
+        Yields:
+            dict for each row of the result
+
+        Raises:
+            CLIReturnCodeError: If the database query fails
+        """
+        query = query.strip().rstrip(';')
+        limit_clause = f' LIMIT {int(limit)}' if limit is not None else ''
+        script = (
+            f'\\set FETCH_COUNT {int(fetch_size)}\n'
+            f'SELECT row_to_json(t) FROM ({query}) t{limit_clause};'
+        )
+        chunk_rows = chunk_rows or fetch_size
+        remote_file = f'/tmp/robottelo_query_{gen_string("alphanumeric", 12)}.ndjson'
+        try:
+            self._execute_db_query(
+                f'{self._psql_script_command(script, db, db_user, "-A -t -q")} > {remote_file}'
+            )
+            offset = 0
+            while True:
+                chunk = self._execute_db_query(
+                    f'tail -c +{offset + 1} {remote_file} | head -n {chunk_rows}'
+                )
+                # not splitlines, JSON strings may contain unescaped unicode line separators
+                lines = chunk.stdout.split('\n')
+                if not lines[-1]:
+                    lines.pop()
+                for line in lines:
+                    if line.strip():
+                        yield json.loads(line)
+                if len(lines) < chunk_rows:
+                    break
+                offset += sum(len(line.encode('utf-8')) + 1 for line in lines)
+        finally:
+            self.execute(f'rm -f {remote_file}')
 
     def load_remote_yaml_file(self, file_path):
         """Load a remote yaml file and return a Box object"""
@@ -2557,6 +2689,8 @@ class Satellite(Capsule, SatelliteMixins):
     def apidoc(self):
         """Provide Satellite's apidoc via apypie"""
         if not self._apidoc:
+            import apypie
+
             self._apidoc = apypie.Api(
                 uri=self.url,
                 username=settings.server.admin_username,
@@ -2620,29 +2754,78 @@ class Satellite(Capsule, SatelliteMixins):
                         if Base in obj.mro():
                             getattr(self._cli, name).omitting_credentials = False
 
+    def ui_default_context(self, user):
+        """Return the names of the default organization and location of the user, None when
+        the user has none and the UI shows Any organization or Any location
+        """
+        users = self.api.User().search(query={'search': f'login="{user}"'})
+        if not users:
+            return None, None
+        user = users[0].read()
+        return (
+            user.default_organization.read().name if user.default_organization else None,
+            user.default_location.read().name if user.default_location else None,
+        )
+
     @contextmanager
-    def ui_session(self, testname=None, user=None, password=None, url=None, login=True):
-        """Initialize an airgun Session object and store it as self.ui_session"""
+    def ui_session(
+        self,
+        testname=None,
+        user=None,
+        password=None,
+        url=None,
+        login=True,
+        organization=None,
+        location=None,
+    ):
+        """Initialize an airgun Session object and store it as self.ui_session
+
+        With ``ui.session_pool.enabled``, a logged in session is leased from the session pool
+        of the process, see :mod:`robottelo.utils.ui_session_pool`.
+
+        :param organization: name of the organization to select once logged in
+        :param location: name of the location to select once logged in
+        """
 
         from airgun.session import Session
 
         def get_caller():
-            import inspect
-
-            for frame in inspect.stack():
-                if frame.function.startswith('test_'):
-                    return frame.function
+            # walk the frames rather than inspect.stack(), which reads the source of each one
+            frame = sys._getframe(1)
+            while frame is not None:
+                if frame.f_code.co_name.startswith('test_'):
+                    return frame.f_code.co_name
+                frame = frame.f_back
             return None
 
+        user = user or settings.server.admin_username
+        password = password or settings.server.admin_password
+        if (
+            settings.ui.session_pool.enabled
+            and not settings.ui.record_video
+            and login
+            and url is None
+        ):
+            if organization is None or location is None:
+                # a new session starts in the default context of the user, a reused one is
+                # brought back to it
+                default_organization, default_location = self.ui_default_context(user)
+                organization = organization or default_organization
+                location = location or default_location
+            key = UISessionKey(self.hostname, user, organization, location)
+            with get_ui_session_pool().session(key, password, testname or get_caller()) as session:
+                yield session
+            return
         try:
             with Session(
                 session_name=testname or get_caller(),
-                user=user or settings.server.admin_username,
-                password=password or settings.server.admin_password,
+                user=user,
+                password=password,
                 url=url,
                 hostname=self.hostname,
                 login=login,
             ) as ui_session:
+                select_ui_context(ui_session, organization, location)
                 yield ui_session
         finally:
             if self.record_property is not None and settings.ui.record_video:
@@ -1,17 +1,22 @@
+import atexit
+from contextlib import contextmanager
+import gzip
+import json
 import logging
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import os
 from pathlib import Path
+import queue
+import re
+import shutil
+import threading
+import time
 
 from box import Box
 import logzero
-from manifester.logger import setup_logzero as manifester_log_setup
 import yaml
 
-try:
-    from broker.logging import RedactingFilter
-    # Importing broker.logging registers the TRACE level automatically
-except ImportError:
-    RedactingFilter = None
+from robottelo.utils.lazy_import import configure_on_import
 
 robottelo_root_dir = Path(os.environ.get('ROBOTTELO_DIR', Path(__file__).resolve().parent.parent))
 robottelo_log_dir = robottelo_root_dir.joinpath('logs')
@@ -27,15 +32,228 @@ defaultFormatter = logzero.LogFormatter(
     fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s', datefmt=DEFAULT_DATE_FORMAT
 )
 
+
+def _gzip_rotator(source, dest):
+    with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+
+class BatchFileHandler(RotatingFileHandler):
+    """Rotating file handler only flushing its stream when the listener finished a batch
+
+    Rotated files are compressed with gzip when compress is set.
+    """
+
+    def __init__(self, filename, max_bytes, backup_count, compress=False):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count)
+        if compress:
+            self.namer = lambda name: f'{name}.gz'
+            self.rotator = _gzip_rotator
+
+    def flush(self):
+        """Called by emit after each record, the listener calls flush_batch instead"""
+
+    def flush_batch(self):
+        super().flush()
+
+
+class _FlushRequest:
+    def __init__(self):
+        self.done = threading.Event()
+
+
+# the sentinel of QueueListener is None, this one tells that the queue is empty
+_QUEUE_EMPTY = object()
+
+
+class BatchQueueListener(QueueListener):
+    """Write the queued records from a thread, flushing the handlers once per batch
+
+    A batch ends when the queue is empty or batch_size records were written, so records
+    are flushed right away when the logging is quiet and in batches when it is busy.
+    """
+
+    def __init__(self, log_queue, *handlers, batch_size=500):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.batch_size = batch_size
+
+    def flush_handlers(self):
+        for handler in self.handlers:
+            handler.flush_batch()
+
+    def _dequeue_nowait(self):
+        try:
+            return self.dequeue(False)
+        except queue.Empty:
+            return _QUEUE_EMPTY
+
+    def _monitor(self):
+        while True:
+            record = self.dequeue(True)
+            handled = 0
+            while isinstance(record, logging.LogRecord):
+                self.handle(record)
+                handled += 1
+                if handled == self.batch_size:
+                    self.flush_handlers()
+                    handled = 0
+                record = self._dequeue_nowait()
+            if handled:
+                self.flush_handlers()
+            if isinstance(record, _FlushRequest):
+                record.done.set()
+            elif record is self._sentinel:
+                return
+
+
+class LogPipeline:
+    """Log records are put in a queue by the loggers and written to the log file by a
+    listener thread, so that the test thread does not wait for the file I/O.
+
+    Loggers listed in rate_limits are limited to that many records per second in the log
+    file, the records above the limit are dropped and counted.
+    """
+
+    def __init__(self, path, formatter, batch_size=500, compress=False, rate_limits=None):
+        self.queue = queue.SimpleQueue()
+        # 100MB
+        self.file_handler = BatchFileHandler(path, max_bytes=1e8, backup_count=3, compress=compress)
+        self.file_handler.setFormatter(formatter)
+        self.listener = BatchQueueListener(self.queue, self.file_handler, batch_size=batch_size)
+        self.rate_limits = {name: limit for name, limit in (rate_limits or {}).items() if limit}
+        self._windows = {}
+        self._rate_lock = threading.Lock()
+        self.running = False
+
+    def start(self):
+        self.listener.start()
+        self.running = True
+
+    def stop(self):
+        """Write all the queued records and stop the listener, records logged afterwards
+        are written synchronously
+        """
+        if self.running:
+            self.running = False
+            self.listener.stop()
+            self.file_handler.flush_batch()
+
+    def flush(self, timeout=None):
+        """Wait until all the records queued so far are written to the log file"""
+        if not self.running:
+            return True
+        request = _FlushRequest()
+        self.queue.put(request)
+        return request.done.wait(timeout)
+
+    def set_file(self, path, formatter=None):
+        """Write the log to another file, like the log file of an xdist worker"""
+        running = self.running
+        self.stop()
+        self.file_handler.close()
+        self.file_handler = BatchFileHandler(
+            path,
+            max_bytes=self.file_handler.maxBytes,
+            backup_count=self.file_handler.backupCount,
+            compress=self.file_handler.rotator is _gzip_rotator,
+        )
+        self.file_handler.setFormatter(formatter or defaultFormatter)
+        self.listener.handlers = (self.file_handler,)
+        if running:
+            self.start()
+
+    def _rate_limit(self, name):
+        return next(
+            (
+                (prefix, limit)
+                for prefix, limit in self.rate_limits.items()
+                if name == prefix or name.startswith(f'{prefix}.')
+            ),
+            (None, None),
+        )
+
+    def allow(self, record):
+        """Count the record against the rate limit of its logger, if it has one"""
+        prefix, limit = self._rate_limit(record.name)
+        if prefix is None:
+            return True
+        now = int(time.monotonic())
+        with self._rate_lock:
+            window, count, dropped = self._windows.get(prefix, (now, 0, 0))
+            if window != now:
+                if dropped:
+                    self.emit(
+                        logging.makeLogRecord(
+                            {
+                                'name': prefix,
+                                'levelno': logging.WARNING,
+                                'levelname': 'WARNING',
+                                'msg': f'{dropped} records dropped by the rate limit of '
+                                f'{limit} records per second',
+                            }
+                        )
+                    )
+                window, count, dropped = now, 0, 0
+            allowed = count < limit
+            self._windows[prefix] = (window, count + allowed, dropped + (not allowed))
+        return allowed
+
+    def emit(self, record):
+        if self.running:
+            self.queue.put(record)
+        else:
+            self.file_handler.handle(record)
+            self.file_handler.flush_batch()
+
+    def _after_fork(self):
+        """The listener thread does not survive a fork, start a new one in the child"""
+        self.queue = queue.SimpleQueue()
+        self.listener = BatchQueueListener(
+            self.queue, self.file_handler, batch_size=self.listener.batch_size
+        )
+        if self.running:
+            self.listener.start()
+
+    def handler(self, level):
+        """Return a handler sending the records of a logger to the pipeline"""
+        handler = _PipelineHandler(self)
+        handler.setLevel(level)
+        return handler
+
+
+class _PipelineHandler(QueueHandler):
+    def __init__(self, pipeline):
+        super().__init__(pipeline.queue)
+        self.pipeline = pipeline
+
+    def emit(self, record):
+        try:
+            if self.pipeline.allow(record):
+                self.pipeline.emit(self.prepare(record))
+        except Exception:  # noqa: BLE001 - as logging.Handler.emit
+            self.handleError(record)
+
+
+pipeline_config = logging_yaml.get('pipeline') or Box()
+log_pipeline = LogPipeline(
+    robottelo_log_file,
+    defaultFormatter,
+    batch_size=pipeline_config.get('batch_size', 500),
+    compress=pipeline_config.get('compress', False),
+    rate_limits=pipeline_config.get('rate_limits'),
+)
+log_pipeline.start()
+atexit.register(log_pipeline.stop)
+os.register_at_fork(after_in_child=log_pipeline._after_fork)
+
 logger = logzero.setup_logger(
     level=logging_yaml.robottelo.level,
-    logfile=str(robottelo_log_file),
     fileLoglevel=logging_yaml.robottelo.fileLevel,
     isRootLogger=True,
     formatter=defaultFormatter,
-    maxBytes=1e8,  # 100MB
-    backupCount=3,
 )
+logger.addHandler(log_pipeline.handler(logging_yaml.robottelo.fileLevel))
 # if name is passed during setup, then imported uses of this root logger won't have name set
 logger.name = 'robottelo'
 
@@ -63,26 +281,155 @@ def configure_third_party_logging():
 
 configure_third_party_logging()
 
-if RedactingFilter:
+
+def configure_broker_logging():
+    """Redact sensitive values from broker's logs"""
+    try:
+        from broker.logging import RedactingFilter
+        # Importing broker.logging registers the TRACE level automatically
+    except ImportError:
+        return
     sensitive = ["password", "pword", "token", "host_password"]
     logging.getLogger('broker').addFilter(RedactingFilter(sensitive))
 
-manifester_log_setup(logging_yaml.robottelo.fileLevel, str(robottelo_log_file))
+
+configure_on_import('broker', configure_broker_logging)
+
+
+def configure_manifester_logging():
+    """Send manifester's logs to the robottelo log file"""
+    from manifester.logger import setup_logzero
+
+    setup_logzero(logging_yaml.robottelo.fileLevel, str(robottelo_log_file))
+
+
+configure_on_import('manifester.logger', configure_manifester_logging)
 
 
 collection_logger = logzero.setup_logger(
     name='robottelo.collection',
     level=logging_yaml.collection.level,
-    logfile=str(robottelo_log_file),
     fileLoglevel=logging_yaml.collection.fileLevel,
     formatter=defaultFormatter,
 )
+collection_logger.addHandler(log_pipeline.handler(logging_yaml.collection.fileLevel))
 
 
 config_logger = logzero.setup_logger(
     name='robottelo.config',
     level=logging_yaml.config.level,
-    logfile=robottelo_log_file,
     fileLoglevel=logging_yaml.config.fileLevel,
     formatter=defaultFormatter,
 )
+config_logger.addHandler(log_pipeline.handler(logging_yaml.config.fileLevel))
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Format the operation records as JSON lines"""
+
+    def format(self, record):
+        return json.dumps({'ts': round(record.created, 3)} | record.operation)
+
+
+# The timed operations of the tests, see log_operation and the logging_hooks plugin
+operation_context = {'nodeid': None, 'fixture': None}
+_operation_state = threading.local()
+operations_pipeline = LogPipeline(
+    robottelo_log_dir.joinpath('operations.jsonl'),
+    JsonLinesFormatter(),
+    batch_size=pipeline_config.get('batch_size', 500),
+)
+operations_pipeline.start()
+atexit.register(operations_pipeline.stop)
+os.register_at_fork(after_in_child=operations_pipeline._after_fork)
+operations_logger = logging.getLogger('robottelo.operations')
+operations_logger.propagate = False
+operations_logger.setLevel(logging.INFO)
+operations_logger.disabled = not (logging_yaml.get('operations') or Box()).get('enabled', True)
+operations_logger.addHandler(operations_pipeline.handler(logging.INFO))
+
+
+def record_operation(op_type, name, duration, outcome='passed', **fields):
+    """Write a structured record of an operation to the operations log"""
+    operations_logger.info(
+        name,
+        extra={
+            'operation': {
+                'worker': os.environ.get('PYTEST_XDIST_WORKER', 'master'),
+                'nodeid': operation_context['nodeid'],
+                'fixture': operation_context['fixture'],
+                'type': op_type,
+                'name': name,
+                'duration': round(duration, 6),
+                'outcome': outcome,
+            }
+            | fields
+        },
+    )
+
+
+@contextmanager
+def log_operation(op_type, name):
+    """Time the block and record it as an operation of the current test
+
+    Operations do not nest, an operation run inside another one, like the ssh command of a
+    hammer command, is part of the outer one and is not recorded.
+    """
+    if getattr(_operation_state, 'active', False) or operations_logger.disabled:
+        yield
+        return
+    _operation_state.active = True
+    outcome = 'failed'
+    start = time.perf_counter()
+    try:
+        yield
+        outcome = 'passed'
+    finally:
+        _operation_state.active = False
+        record_operation(op_type, name, time.perf_counter() - start, outcome)
+
+
+def _api_operation_name(method, url):
+    """Return the method and path of a request, with the ids replaced to group them"""
+    path = re.sub(r'^\w+://[^/]+', '', url).split('?')[0]
+    path = re.sub(r'/\d+(?=/|$)', '/:id', path)
+    return f'{method.upper()} {path}'
+
+
+def ssh_operation_name(command):
+    """Return the program run by a command, its arguments and environment may have credentials"""
+    for token in command.split():
+        if not re.match(r'^\w+=', token):
+            return token
+    return ''
+
+
+def configure_nailgun_operations():
+    """Record the requests made by nailgun as api operations"""
+    from functools import wraps
+
+    from nailgun import client
+
+    def timed(method, function):
+        @wraps(function)
+        def wrapper(url, *args, **kwargs):
+            with log_operation('api', _api_operation_name(method, url)):
+                return function(url, *args, **kwargs)
+
+        return wrapper
+
+    def timed_request(function):
+        @wraps(function)
+        def wrapper(method, url, **kwargs):
+            with log_operation('api', _api_operation_name(method, url)):
+                return function(method, url, **kwargs)
+
+        return wrapper
+
+    client.request = timed_request(client.request)
+    for method in ('head', 'get', 'post', 'put', 'patch', 'delete'):
+        if function := getattr(client, method, None):
+            setattr(client, method, timed(method, function))
+
+
+configure_on_import('nailgun.client', configure_nailgun_operations)
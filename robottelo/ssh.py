@@ -37,6 +37,7 @@ def command(
     timeout=None,
     port=22,
     net_type=None,
+    client=None,
 ):
     """Executes SSH command(s) on remote hostname.
 
@@ -46,8 +47,10 @@ def command(
     :param str output_format: json, csv or None
     :param int timeout: Time to wait for the ssh command to finish.
     :param connection_timeout: Time to wait for establishing the connection.
+    :param client: An existing host object to run the command with, a new one is created
+        from the connection kwargs when not provided.
     """
-    client = get_client(
+    client = client or get_client(
         hostname=hostname,
         username=username,
         password=password,
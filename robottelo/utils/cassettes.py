@@ -0,0 +1,338 @@
+"""Record and replay of the hammer commands and API requests run by the tests.
+
+With ``--cassette-mode record``, every hammer command run by ``Base.execute`` and every
+request sent by ``nailgun.client`` during a test is stored in the cassette of the test, a JSON
+file in ``--cassette-dir``. Hammer commands are stored with their stdout, stderr, exit status
+and duration, API requests with their method, path, a hash of their payload, the response and
+its latency.
+
+With ``--cassette-mode replay``, ``Base.execute`` serves the commands from the cassette instead
+of running them over ssh, and nailgun gets ``requests.Response`` objects built from the
+recorded responses instead of sending the requests. The output still goes through the hammer
+output parsers and the nailgun response handling, so the parsing and the assertions of the
+tests can be worked on, benchmarked and regression tested without a Satellite.
+
+Commands and requests are matched strictly: a hammer command on its command and output format,
+a request on its method, path and payload hash. One missing from the cassette raises
+CassetteMismatchError and is reported as unmatched. One run several times is served its
+recordings in order. The credentials and the hostname are not part of the recordings.
+The cassettes plugin seeds the random module from the nodeid of each test, so the generated
+names match. A module or session scoped fixture is recorded in the cassette of the first test
+using it, a test replayed on its own or in another order misses those recordings.
+
+With ``--api-call-report``, the number of API requests of each test and their cumulative
+latency are reported at the end of the session, with the requests the test repeated.
+
+Example:
+
+    pytest tests/foreman/cli/test_model.py --cassette-mode record
+    pytest tests/foreman/cli/test_model.py --cassette-mode replay
+"""
+
+import base64
+from collections import Counter, defaultdict, deque
+from functools import wraps
+import hashlib
+import json
+from pathlib import Path
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+
+from robottelo.exceptions import CassetteMismatchError
+from robottelo.logging import logger
+from robottelo.utils.lazy_import import configure_on_import
+
+CASSETTE_MODES = ('record', 'replay')
+UNSAFE_FILENAME_CHARACTERS = re.compile(r'[^\w.-]+')
+# request arguments holding credentials or connection settings, not part of the payload
+CONNECTION_KWARGS = ('auth', 'verify', 'headers', 'timeout', 'cert', 'proxies')
+# the cassette and the API call statistics of the running test, set by the cassettes plugin
+active_cassette = None
+api_call_stats = None
+
+
+def cassette_path(directory, nodeid):
+    """Return the path of the cassette of the test nodeid"""
+    module, _, name = nodeid.partition('::')
+    name = UNSAFE_FILENAME_CHARACTERS.sub('_', name)
+    return Path(directory, module.removesuffix('.py'), f'{name}.json')
+
+
+def _text(value):
+    """Return the stdout or stderr of a result as text"""
+    if isinstance(value, tuple):
+        value = value[1]
+    if isinstance(value, bytes):
+        value = value.decode()
+    return value
+
+
+class Cassette:
+    """The recorded hammer commands and API requests of a test
+
+    :param path: path of the cassette file
+    :param str mode: ``record`` or ``replay``
+    """
+
+    def __init__(self, path, mode):
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f'Unknown cassette mode {mode}, use one of {CASSETTE_MODES}')
+        self.path = Path(path)
+        self.mode = mode
+        self.entries = []
+        self.unmatched = []
+        self._pending = defaultdict(deque)
+        self._lock = threading.Lock()
+        if mode == 'replay' and self.path.exists():
+            self.entries = json.loads(self.path.read_text())['entries']
+            for entry in self.entries:
+                self._pending[self.key(entry)].append(entry)
+
+    @staticmethod
+    def key(entry):
+        """Return the key a recorded command or request is matched on"""
+        return (
+            entry['kind'],
+            ' '.join(entry['command'].split()),
+            entry.get('output_format'),
+            entry.get('payload_sha256'),
+        )
+
+    def record(self, **entry):
+        with self._lock:
+            self.entries.append(entry)
+
+    def play(self, **request):
+        """Return the next recording of the request, raise CassetteMismatchError without one"""
+        key = self.key(request)
+        with self._lock:
+            if self._pending[key]:
+                return self._pending[key].popleft()
+            self.unmatched.append(request)
+        details = (
+            f'payload {request["payload_sha256"][:12]}'
+            if request['kind'] == 'api'
+            else f'output format {request.get("output_format")}'
+        )
+        raise CassetteMismatchError(
+            f'{request["kind"]} command {request["command"]!r} ({details}) '
+            f'is not recorded in {self.path}'
+        )
+
+    @property
+    def unused(self):
+        """The recordings not served during the replay"""
+        return [entry for entries in self._pending.values() for entry in entries]
+
+    def save(self):
+        """Write the recordings to the cassette file"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps({'entries': self.entries}, indent=1))
+
+    def hammer_client(self, command, command_sub, output_format, hostname):
+        """Return the client ``Base.execute`` runs the hammer command with"""
+        if self.mode == 'replay':
+            return ReplayClient(self, command, output_format)
+        from robottelo import ssh
+
+        return RecordingClient(
+            self, ssh.get_client(hostname=hostname), command, command_sub, output_format
+        )
+
+
+class RecordingClient:
+    """Host client storing the result of the command it runs in the cassette"""
+
+    def __init__(self, cassette, client, command, command_sub, output_format):
+        self.cassette = cassette
+        self.client = client
+        self.entry = {
+            'kind': 'hammer',
+            'command': command,
+            'command_sub': command_sub,
+            'output_format': output_format,
+        }
+
+    def execute(self, cmd, **kwargs):
+        start = time.monotonic()
+        result = self.client.execute(cmd, **kwargs)
+        self.cassette.record(
+            **self.entry,
+            stdout=_text(result.stdout),
+            stderr=_text(result.stderr),
+            status=result.status,
+            duration=round(time.monotonic() - start, 3),
+        )
+        return result
+
+
+class ReplayClient:
+    """Host client serving the command from the cassette"""
+
+    def __init__(self, cassette, command, output_format):
+        self.cassette = cassette
+        self.request = {'kind': 'hammer', 'command': command, 'output_format': output_format}
+
+    def execute(self, cmd, **kwargs):
+        from broker.helpers import Result
+
+        entry = self.cassette.play(**self.request)
+        return Result(stdout=entry['stdout'], stderr=entry['stderr'], status=entry['status'])
+
+
+class ApiCallStats:
+    """Number and cumulative latency of the API requests of a test"""
+
+    def __init__(self):
+        self.count = 0
+        self.latency = 0.0
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, command, latency):
+        with self._lock:
+            self.count += 1
+            self.latency += latency
+            self.calls[command] += 1
+
+    def summary(self, repeated=5):
+        """Return the count, the latency and the most repeated requests, as a dict"""
+        return {
+            'count': self.count,
+            'latency': round(self.latency, 3),
+            'repeated': [
+                (call, count) for call, count in self.calls.most_common(repeated) if count > 1
+            ],
+        }
+
+
+def payload_hash(args, kwargs):
+    """Return the hash of the payload of a request: its data, json and params"""
+    payload = {
+        'args': args,
+        'kwargs': {key: value for key, value in kwargs.items() if key not in CONNECTION_KWARGS},
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _request_command(method, url):
+    parts = urlsplit(url)
+    return f'{method.upper()} {parts.path}' + (f'?{parts.query}' if parts.query else '')
+
+
+def _response_entry(response):
+    try:
+        body = {'body': response.content.decode()}
+    except UnicodeDecodeError:
+        body = {'body_base64': base64.b64encode(response.content).decode()}
+    headers = {key: value for key, value in response.headers.items() if key.lower() != 'set-cookie'}
+    return {
+        'status_code': response.status_code,
+        'reason': response.reason,
+        'headers': headers,
+    } | body
+
+
+def replay_response(entry, method, url):
+    """Return a requests.Response built from a recorded API request"""
+    import requests
+    from requests.structures import CaseInsensitiveDict
+
+    response = requests.Response()
+    response.status_code = entry['status_code']
+    response.reason = entry['reason']
+    response.headers = CaseInsensitiveDict(entry['headers'])
+    if 'body_base64' in entry:
+        response._content = base64.b64decode(entry['body_base64'])
+    else:
+        response._content = entry['body'].encode()
+    response.encoding = 'utf-8'
+    response.url = url
+    response.request = requests.Request(method.upper(), url).prepare()
+    return response
+
+
+def api_request(method, url, args, kwargs, send):
+    """Send a nailgun request with ``send``, or replay it, recording it in the active cassette"""
+    cassette, stats = active_cassette, api_call_stats
+    if cassette is None and stats is None:
+        return send()
+    request = {
+        'kind': 'api',
+        'command': _request_command(method, url),
+        'payload_sha256': payload_hash(args, kwargs),
+    }
+    if cassette is not None and cassette.mode == 'replay':
+        entry = cassette.play(**request)
+        response = replay_response(entry, method, url)
+        # the recorded latency, to profile the test offline
+        latency = entry['duration']
+    else:
+        start = time.monotonic()
+        response = send()
+        latency = time.monotonic() - start
+        if cassette is not None:
+            cassette.record(**request, **_response_entry(response), duration=round(latency, 3))
+    if stats is not None:
+        stats.add(request['command'], latency)
+    return response
+
+
+def configure_nailgun_cassettes():
+    """Send the requests of nailgun.client through api_request"""
+    from nailgun import client
+
+    def replayable(method, function):
+        @wraps(function)
+        def wrapper(url, *args, **kwargs):
+            return api_request(method, url, args, kwargs, lambda: function(url, *args, **kwargs))
+
+        return wrapper
+
+    def replayable_request(function):
+        @wraps(function)
+        def wrapper(method, url, **kwargs):
+            return api_request(method, url, (), kwargs, lambda: function(method, url, **kwargs))
+
+        return wrapper
+
+    client.request = replayable_request(client.request)
+    for method in ('head', 'get', 'post', 'put', 'patch', 'delete'):
+        if function := getattr(client, method, None):
+            setattr(client, method, replayable(method, function))
+
+
+configure_on_import('nailgun.client', configure_nailgun_cassettes)
+
+
+def start_cassette(directory, nodeid, mode):
+    """Make the cassette of the test the active one"""
+    global active_cassette
+    active_cassette = Cassette(cassette_path(directory, nodeid), mode)
+    return active_cassette
+
+
+def stop_cassette():
+    """Save the active cassette when recording, return it"""
+    global active_cassette
+    cassette, active_cassette = active_cassette, None
+    if cassette is not None and cassette.mode == 'record' and cassette.entries:
+        cassette.save()
+        logger.debug(f'Recorded {len(cassette.entries)} commands in {cassette.path}')
+    return cassette
+
+
+def start_api_call_stats():
+    """Count the API requests of the test"""
+    global api_call_stats
+    api_call_stats = ApiCallStats()
+    return api_call_stats
+
+
+def stop_api_call_stats():
+    """Stop counting the API requests, return the statistics of the test"""
+    global api_call_stats
+    stats, api_call_stats = api_call_stats, None
+    return stats
@@ -1,5 +1,7 @@
 """Data Factory for all entities"""
 
+from contextlib import contextmanager
+import copy
 from functools import wraps
 import random
 import string
@@ -16,6 +18,68 @@ class InvalidArgumentError(Exception):
     """Indicates an error when an invalid argument is received."""
 
 
+# seed and memoized datasets of the corpus, while it is started
+_corpus = None
+
+
+def start_corpus(seed):
+    """Generate the datasets deterministically from the seed and memoize them per generator
+    and arguments, until stop_corpus is called.
+
+    This is done while pytest collects the tests, so that every xdist worker parametrizes
+    its tests with the same values, from the seed of the controller.
+    """
+    global _corpus
+    _corpus = {'seed': seed, 'datasets': {}}
+
+
+def stop_corpus():
+    """Go back to random datasets, generated on every call"""
+    global _corpus
+    _corpus = None
+
+
+@contextmanager
+def seeded_random(key, seed):
+    """Seed the random module used by fauxfactory from the seed and the key, so that the same
+    key generates the same values, and restore its state on exit
+
+    :param str key: what the values are generated for, like a dataset or a test nodeid
+    :param seed: seed shared by the keys, like the corpus seed
+    """
+    state = random.getstate()
+    random.seed(f'{seed}:{key}')
+    try:
+        yield
+    finally:
+        random.setstate(state)
+
+
+def seeded_corpus(func):
+    """Generate the dataset of func from the corpus seed and memoize it, when the corpus
+    is started
+    """
+
+    @wraps(func)
+    def func_wrapper(*args, **kwargs):
+        if _corpus is None:
+            return func(*args, **kwargs)
+        key = repr(
+            (
+                func.__qualname__,
+                args,
+                sorted(kwargs.items()),
+                settings.robottelo.run_one_datapoint,
+            )
+        )
+        if key not in _corpus['datasets']:
+            with seeded_random(key, _corpus['seed']):
+                _corpus['datasets'][key] = func(*args, **kwargs)
+        return copy.deepcopy(_corpus['datasets'][key])
+
+    return func_wrapper
+
+
 def filtered_datapoint(func):
     """Overrides the data creator functions in this class to return 1 value and
     transforms data dictionary to pytest's parametrize acceptable format for
@@ -51,7 +115,7 @@ def filtered_datapoint(func):
                 dataset = [random.choice(dataset)]
         return dataset
 
-    return func_wrapper
+    return seeded_corpus(func_wrapper)
 
 
 def parametrized(data):
@@ -164,29 +228,6 @@ def invalid_boolean_strings(list_len=10):
     return [gen_alpha(validator=not_boolean_str, default='notboolean') for _ in range(list_len)]
 
 
-def xdist_adapter(argvalues):
-    """Adapter to avoid error when running tests on xdist
-    Check https://github.com/pytest-dev/pytest-xdist/issues/149
-
-    It returns a dict with lst as argvalues and range(len(lst)) as ids
-
-    Since every run has the same number of values, ids is going to be the same
-    on different workers.
-
-    .. code-block:: python
-
-        dct = xdist_adapter(invalid_boolean_strings())
-
-        @pytest.mark.parametrize('value', **dct)
-        def test_something(value):
-        #some code here
-
-    :param argvalues: to be passed to parametrize
-    :return: dict
-    """
-    return {'argvalues': argvalues, 'ids': [str(index) for index in range(len(argvalues))]}
-
-
 @filtered_datapoint
 def invalid_id_list():
     """Generates a list of invalid IDs."""
@@ -480,6 +521,7 @@ def invalid_interfaces_list():
     ]
 
 
+@seeded_corpus
 def valid_http_credentials(url_encoded=False):
     """Returns a list of valid credentials for HTTP authentication
     The credentials dictionary contains the following keys:
@@ -552,6 +594,7 @@ def valid_http_credentials(url_encoded=False):
     return credentials
 
 
+@seeded_corpus
 def invalid_http_credentials(url_encoded=False):
     """Returns a list of invalid credentials for HTTP authentication
 
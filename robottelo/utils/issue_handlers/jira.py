@@ -1,10 +1,10 @@
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import json
 from pathlib import Path
+import threading
 import time
 
-from jira import JIRA
-from jira.exceptions import JIRAError
 import pytest
 from wait_for import TimedOutError, wait_for
 
@@ -180,13 +180,18 @@ def try_from_cache(issue_id):
 
 # cannot use lru_cache in functions that has unhashable args
 CACHED_RESPONSES = defaultdict(dict)
+# Jira responses worth retrying a request on, after a delay
+JIRA_RETRY_STATUS_CODES = (429, 502, 503, 504)
 
 
-def _jira_client():
+def _jira_client(**options):
     """Create a JIRA client with basic auth (email and api_key)."""
+    from jira import JIRA
+
     return JIRA(
         server=settings.jira.url,
         basic_auth=(settings.jira.email, settings.jira.api_key),
+        **options,
     )
 
 
@@ -207,6 +212,8 @@ def get_jira(issue_ids, fields=None, expand='renderedFields', max_results=100):
     fields_str = ','.join(fields) if fields else None
 
     def _make_request():
+        from jira.exceptions import JIRAError
+
         try:
             jira = _jira_client()
             all_issues = []
@@ -236,6 +243,22 @@ def get_jira(issue_ids, fields=None, expand='renderedFields', max_results=100):
         raise
 
 
+def get_current_jira(issue_ids, fields=('key', 'status', 'labels')):
+    """Query the current fields of the Jira issues in bulk, bypassing the caches.
+
+    :param issue_ids: Jira issue ids to get data for
+    :type issue_ids: list
+    :param fields: Fields of the issues to retrieve
+    :type fields: tuple
+    :returns: Flat issue dicts by issue key, without the issues Jira did not return
+    :rtype: dict
+    """
+    if not issue_ids:
+        return {}
+    issues = get_jira(list(issue_ids), list(fields), expand=None)
+    return {issue.key: _issue_to_flat_dict(issue, fields) for issue in issues if issue is not None}
+
+
 def get_data_jira(issue_ids, cached_data=None, jira_fields=None):  # pragma: no cover
     """Get a list of marked Jira data and query Jira REST API.
 
@@ -381,6 +404,7 @@ def add_comment_on_jira(
     comment_type=settings.jira.comment_type,
     comment_visibility=settings.jira.comment_visibility,
     labels=None,
+    client=None,
 ):
     """Adds a new comment to a Jira issue.
 
@@ -394,6 +418,8 @@ def add_comment_on_jira(
     :type comment_visibility: str
     :param labels: Add/Remove Jira labels, ex. [{'add':'tests_passed'},{'remove':'tests_failed'}]
     :type labels: list
+    :param client: JIRA client to use instead of a new one
+    :type client: jira.JIRA
     :returns: Comment response from Jira API
     :rtype: dict
     """
@@ -406,7 +432,7 @@ def add_comment_on_jira(
         )
         return None
 
-    jira = _jira_client()
+    jira = client if client is not None else _jira_client()
 
     if labels:
         logger.debug(f"Updating labels for {issue_id} issue. \n labels: \n {labels}")
@@ -426,3 +452,75 @@ def add_comment_on_jira(
     response = jira._session.post(url, json=payload)
     response.raise_for_status()
     return response.json()
+
+
+def _retry_delay(error, attempt, backoff):
+    """Return the seconds to wait before retrying a failed Jira request, None when the
+    request should not be retried
+    """
+    from requests.exceptions import ConnectionError
+
+    if isinstance(error, ConnectionError):
+        return backoff * 2**attempt
+    response = getattr(error, 'response', None)
+    status_code = getattr(error, 'status_code', None) or getattr(response, 'status_code', None)
+    if status_code not in JIRA_RETRY_STATUS_CODES:
+        return None
+    retry_after = response.headers.get('Retry-After') if response is not None else None
+    if retry_after and retry_after.isdigit():
+        return int(retry_after)
+    return backoff * 2**attempt
+
+
+def add_comments_on_jira(comments, workers=8, retries=3, backoff=2, on_added=None):
+    """Adds comments to Jira issues concurrently, retrying the rate limited and failed
+    requests with an exponential backoff.
+
+    :param comments: Dicts with the ``issue``, ``comment`` and ``labels`` of each comment
+    :type comments: list
+    :param workers: Number of comments added at the same time
+    :type workers: int
+    :param retries: Number of retries of a failed comment
+    :type retries: int
+    :param backoff: Seconds to wait before the first retry, doubled for each next one
+    :type backoff: float
+    :param on_added: Called with each comment once Jira added it
+    :type on_added: callable
+    :returns: The comments which could not be added
+    :rtype: list
+    """
+    local = threading.local()
+
+    def add(comment):
+        if not hasattr(local, 'client'):
+            # The client would retry on its own with delays up to a minute, retry here instead
+            local.client = _jira_client(max_retries=0, get_server_info=False)
+        for attempt in range(retries + 1):
+            try:
+                add_comment_on_jira(
+                    comment['issue'],
+                    comment['comment'],
+                    labels=comment['labels'],
+                    client=local.client,
+                )
+                break
+            except Exception as err:
+                delay = _retry_delay(err, attempt, backoff)
+                if delay is None or attempt == retries:
+                    raise
+                logger.warning(
+                    f'Retrying comment on Jira issue {comment["issue"]} in {delay}s: {err}'
+                )
+                time.sleep(delay)
+        if on_added:
+            on_added(comment)
+
+    failed = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(add, comment): comment for comment in comments}
+        for future in as_completed(futures):
+            if (err := future.exception()) is not None:
+                comment = futures[future]
+                logger.warning(f'Failed to add comment to Jira issue {comment["issue"]}: {err}')
+                failed.append(comment)
+    return failed
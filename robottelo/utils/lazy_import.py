@@ -0,0 +1,83 @@
+"""Helpers keeping heavy dependencies (nailgun entities, airgun, manifester, ...) out of the
+robottelo import path until they are actually used, and measuring how long imports take.
+"""
+
+import importlib.abc
+import importlib.util
+import re
+import subprocess
+import sys
+
+
+class ConfigureOnImport(importlib.abc.MetaPathFinder):
+    """Run a configuration function right after a module is imported for the first time"""
+
+    def __init__(self):
+        self.hooks = {}
+
+    def register(self, name, configure):
+        if name in sys.modules:
+            configure()
+        else:
+            self.hooks.setdefault(name, []).append(configure)
+
+    def find_spec(self, fullname, path, target=None):
+        if (hooks := self.hooks.pop(fullname, None)) is None:
+            return None
+        spec = importlib.util.find_spec(fullname)
+        exec_module = spec.loader.exec_module
+
+        def exec_and_configure(module):
+            exec_module(module)
+            for configure in hooks:
+                configure()
+
+        spec.loader.exec_module = exec_and_configure
+        return spec
+
+
+_finder = ConfigureOnImport()
+sys.meta_path.insert(0, _finder)
+
+
+def configure_on_import(name, configure):
+    """Call configure once the module name is imported, right away if it already is"""
+    _finder.register(name, configure)
+
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$')
+
+
+def parse_importtime(output):
+    """Parse the output of ``python -X importtime``
+
+    :return: list of (module, self time, cumulative time, nesting level), times in seconds
+    """
+    return [
+        (match[4], int(match[1]) / 1e6, int(match[2]) / 1e6, len(match[3]) // 2)
+        for line in output.splitlines()
+        if (match := IMPORTTIME_LINE.match(line))
+    ]
+
+
+def measure_import_time(*modules, python=sys.executable, cwd=None):
+    """Import the modules in a fresh interpreter and measure it with ``-X importtime``
+
+    :return: the cold import time of the modules together, without the interpreter startup,
+        and the list of every imported module as returned by parse_importtime
+    """
+    # __import__ as -X importtime does not see importlib.import_module, and plugin module
+    # names are not always valid identifiers
+    code = ''.join(f'__import__({module!r})\n' for module in modules)
+    result = subprocess.run(
+        [python, '-X', 'importtime', '-c', code],
+        capture_output=True,
+        text=True,
+        cwd=cwd,
+        check=True,
+    )
+    imported = parse_importtime(result.stderr)
+    # modules imported by the interpreter startup are done once site is
+    startup = next(i for i, entry in enumerate(imported) if entry[0] == 'site') + 1
+    total = sum(cumulative for _, _, cumulative, level in imported[startup:] if level == 0)
+    return total, imported
@@ -0,0 +1,167 @@
+"""Index the structured operation records of test runs in SQLite and query them.
+
+The records are written by ``robottelo.logging.record_operation`` to the
+``logs/operations*.jsonl`` files, one JSON object per line, see scripts/log_query.py.
+"""
+
+import json
+from pathlib import Path
+import sqlite3
+
+from robottelo.logging import logger
+
+COLUMNS = ('ts', 'worker', 'nodeid', 'fixture', 'type', 'name', 'duration', 'outcome', 'scope')
+SCHEMA = f"""
+CREATE TABLE operations ({', '.join(COLUMNS)});
+CREATE INDEX operations_type_name ON operations (type, name);
+CREATE INDEX operations_nodeid ON operations (nodeid);
+CREATE INDEX operations_duration ON operations (duration);
+"""
+# operations of the tests, as opposed to the test phases and fixtures
+OPERATION_TYPES = ('hammer', 'ssh', 'api')
+# tests are compared by nodeid, the other records by type and name
+COMPARISON_KEY = "CASE type WHEN 'test' THEN nodeid || '::' || name ELSE name END"
+
+
+def read_records(path):
+    """Yield the records of a JSON-lines file as tuples of COLUMNS, skipping broken lines"""
+    with Path(path).open() as log_file:
+        for number, line in enumerate(log_file, start=1):
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # the last line may be incomplete if the run was killed
+                logger.warning(f'Skipping the invalid record {path}:{number}')
+                continue
+            yield tuple(record.get(column) for column in COLUMNS)
+
+
+def index_logs(paths, database):
+    """Load the records of the files in a new SQLite database, replacing an existing one
+
+    :return: number of records loaded
+    """
+    database = Path(database)
+    database.unlink(missing_ok=True)
+    connection = sqlite3.connect(database)
+    with connection:
+        connection.executescript(SCHEMA)
+        for path in paths:
+            connection.executemany(
+                f'INSERT INTO operations VALUES ({", ".join("?" * len(COLUMNS))})',
+                read_records(path),
+            )
+    count = connection.execute('SELECT count(*) FROM operations').fetchone()[0]
+    connection.close()
+    return count
+
+
+def connect(database):
+    """Return a connection to an indexed database, with rows accessible by column name"""
+    if not Path(database).exists():
+        raise FileNotFoundError(f'{database} does not exist, index the logs first')
+    connection = sqlite3.connect(database)
+    connection.row_factory = sqlite3.Row
+    return connection
+
+
+def top_operations(connection, limit=20, op_type=None, grouped=False):
+    """Return the slowest operations, or the operations with the largest total time when
+    grouped by type and name
+    """
+    types = (op_type,) if op_type else OPERATION_TYPES
+    where = f'type IN ({", ".join("?" * len(types))})'
+    if grouped:
+        query = f"""
+            SELECT type, name, count(*) AS count, sum(duration) AS total,
+                avg(duration) AS average, max(duration) AS longest
+            FROM operations WHERE {where}
+            GROUP BY type, name ORDER BY total DESC LIMIT ?
+        """
+    else:
+        query = f"""
+            SELECT type, name, duration, nodeid, fixture, worker, outcome
+            FROM operations WHERE {where}
+            ORDER BY duration DESC LIMIT ?
+        """
+    return connection.execute(query, (*types, limit)).fetchall()
+
+
+def slowest_tests(connection, limit=20):
+    """Return the slowest tests with the duration of their setup, call and teardown"""
+    return connection.execute(
+        """
+        SELECT nodeid,
+            sum(CASE name WHEN 'setup' THEN duration ELSE 0 END) AS setup,
+            sum(CASE name WHEN 'call' THEN duration ELSE 0 END) AS call,
+            sum(CASE name WHEN 'teardown' THEN duration ELSE 0 END) AS teardown,
+            sum(duration) AS total
+        FROM operations WHERE type = 'test'
+        GROUP BY nodeid ORDER BY total DESC LIMIT ?
+        """,
+        (limit,),
+    ).fetchall()
+
+
+def time_breakdown(connection, nodeid):
+    """Return where the time of a test went
+
+    The detail of a row is the phase for the test records, the fixture name for the
+    fixture records and the fixture running them for the operations, empty for the
+    operations of the test itself.
+    """
+    return connection.execute(
+        """
+        SELECT type,
+            CASE WHEN type IN ('test', 'fixture') THEN name ELSE coalesce(fixture, '') END
+                AS detail,
+            count(*) AS count, sum(duration) AS total
+        FROM operations WHERE nodeid = ?
+        GROUP BY type, detail
+        ORDER BY type = 'test' DESC, type = 'fixture' DESC, total DESC
+        """,
+        (nodeid,),
+    ).fetchall()
+
+
+def fixture_times(connection, limit=20):
+    """Return the fixtures with the largest total setup time"""
+    return connection.execute(
+        """
+        SELECT name, scope, count(*) AS count, sum(duration) AS total,
+            avg(duration) AS average, max(duration) AS longest
+        FROM operations WHERE type = 'fixture'
+        GROUP BY name, scope ORDER BY total DESC LIMIT ?
+        """,
+        (limit,),
+    ).fetchall()
+
+
+def compare(connection, previous_database, limit=20, op_type=None):
+    """Compare the average durations with the ones of a previous run
+
+    Rows are ordered by the time the change of the average added to the run, so the
+    largest regressions come first.
+    """
+    connection.execute('ATTACH DATABASE ? AS previous', (str(previous_database),))
+    try:
+        type_filter = 'WHERE type = ?' if op_type else ''
+        query = f"""
+            WITH current_run AS (
+                SELECT type, {COMPARISON_KEY} AS name, count(*) AS count,
+                    avg(duration) AS average
+                FROM main.operations {type_filter} GROUP BY 1, 2
+            ), previous_run AS (
+                SELECT type, {COMPARISON_KEY} AS name, avg(duration) AS average
+                FROM previous.operations {type_filter} GROUP BY 1, 2
+            )
+            SELECT current_run.type, current_run.name, current_run.count,
+                previous_run.average AS previous, current_run.average AS average,
+                (current_run.average - previous_run.average) * current_run.count AS added
+            FROM current_run JOIN previous_run USING (type, name)
+            ORDER BY added DESC LIMIT ?
+        """
+        params = (op_type, op_type, limit) if op_type else (limit,)
+        return connection.execute(query, params).fetchall()
+    finally:
+        connection.execute('DETACH DATABASE previous')
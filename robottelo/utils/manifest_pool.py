@@ -0,0 +1,404 @@
+"""Pool of subscription manifests shared by pytest-xdist workers and test runs.
+
+Generating a manifest with Manifester creates a subscription allocation on the manifest
+service, which is one of the slowest external steps of fixture setup. The pool keeps the
+generated manifests in a local content-addressed cache, keyed by the parameters of their
+manifest category, and leases them to the workers under a file lock. Only a parameter set
+the cache has no free manifest for reaches the manifest service.
+
+Manifests expire after ``manifest.pool.expiry`` seconds: expired ones are not leased anymore,
+their allocation is deleted and a replacement is generated in the background, so that
+``manifest.pool.size`` free manifests are ready for each parameter set that was requested.
+
+A manifest can not be imported in two organizations of the same Satellite, so a manifest is
+never leased twice to the same consumer (the hostname of the Satellite it is uploaded to).
+A freshly deployed Satellite has no manifest imported, the pool forgets its hostname when it
+is checked out. Only manifests never leased to any consumer count towards the pool size.
+
+With ``manifest.pool.offline`` the manifest service is replaced by a local stand-in
+generating placeholder manifests, this allows working on the fixtures offline.
+
+Example:
+
+    with subscription_manifest(settings.manifest.golden_ticket, sat) as manifest:
+        sat.upload_manifest(org.id, manifest.content)
+"""
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import cache
+import hashlib
+import io
+import json
+import os
+from pathlib import Path
+import socket
+import tempfile
+import threading
+import time
+from uuid import uuid4
+import zipfile
+
+from broker.helpers import FileLock
+
+from robottelo.config import settings
+from robottelo.logging import logger, robottelo_root_dir
+
+MANIFEST_POOL_DIR = robottelo_root_dir.joinpath('.manifest_pool')
+# manifest category keys that do not change the generated manifest
+IGNORED_PARAMS = ('offline_token',)
+
+
+@dataclass
+class PooledManifest:
+    """A manifest leased from the pool, with the attributes of a Manifester manifest"""
+
+    content: bytes
+    path: Path
+    name: Path
+    uuid: str
+    sha256: str
+
+
+def _category_dict(category):
+    return category.to_dict() if hasattr(category, 'to_dict') else dict(category)
+
+
+def manifest_params_key(category):
+    """Return the key of a manifest category, a hash of the parameters of its manifests"""
+    params = {
+        key: value
+        for key, value in _category_dict(category).items()
+        if key.lower() not in IGNORED_PARAMS
+    }
+    return hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def generate_manifest(category):
+    """Create a subscription allocation with Manifester and return its manifest and uuid"""
+    from manifester import Manifester
+
+    manifest = Manifester(manifest_category=_category_dict(category)).get_manifest()
+    return manifest.content, manifest.uuid
+
+
+def delete_manifest(category, uuid):
+    """Delete the subscription allocation of a manifest"""
+    from manifester import Manifester
+
+    Manifester(manifest_category=_category_dict(category)).delete_subscription_allocation(uuid)
+
+
+def generate_offline_manifest(category):
+    """Local stand-in for generate_manifest, building a placeholder manifest archive"""
+    uuid = str(uuid4())
+    consumer_export = io.BytesIO()
+    with zipfile.ZipFile(consumer_export, 'w') as archive:
+        archive.writestr('export/meta.json', json.dumps({'created': time.time(), 'offline': True}))
+        archive.writestr(
+            'export/consumer.json',
+            json.dumps({'uuid': uuid, 'params': manifest_params_key(category)}),
+        )
+    content = io.BytesIO()
+    with zipfile.ZipFile(content, 'w') as archive:
+        archive.writestr('consumer_export.zip', consumer_export.getvalue())
+    return content.getvalue(), uuid
+
+
+def delete_offline_manifest(category, uuid):
+    """Local stand-in for delete_manifest"""
+
+
+def _is_alive(owner):
+    if owner['host'] != socket.gethostname():
+        return True
+    try:
+        os.kill(owner['pid'], 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _owner():
+    return {'host': socket.gethostname(), 'pid': os.getpid(), 'since': time.time()}
+
+
+class ManifestPool:
+    """Local cache of manifests leased to the workers under a file lock
+
+    :param directory: where the cache is stored, shared by the workers
+    :param int expiry: seconds after which a manifest is deleted and replaced
+    :param int size: number of free manifests to keep ready per manifest category
+    :param generate: function generating a manifest for a category, returning its
+        content and uuid
+    :param delete: function deleting the manifest of a category by its uuid
+    """
+
+    def __init__(
+        self,
+        directory=MANIFEST_POOL_DIR,
+        expiry=86400,
+        size=2,
+        generate=generate_manifest,
+        delete=delete_manifest,
+    ):
+        self.directory = Path(directory)
+        self.blobs = self.directory.joinpath('blobs')
+        self.blobs.mkdir(parents=True, exist_ok=True)
+        self.index_file = self.directory.joinpath('index.json')
+        self.expiry = expiry
+        self.size = size
+        self.generate = generate
+        self.delete = delete
+        self.threads = []
+
+    @contextmanager
+    def _index(self):
+        """Yield the list of entries of the pool, saved back on exit, under the file lock"""
+        with FileLock(self.index_file, timeout=120):
+            entries = json.loads(self.index_file.read_text()) if self.index_file.exists() else []
+            yield entries
+            with tempfile.NamedTemporaryFile('w', dir=self.directory, delete=False) as f:
+                json.dump(entries, f)
+            os.replace(f.name, self.index_file)
+
+    def _expired(self, entry):
+        return 'sha256' in entry and time.time() - entry['created'] > self.expiry
+
+    def _prune(self, entries, key):
+        """Drop stale leases and generations of dead processes, return the expired entries of
+        the key
+        """
+        expired = []
+        for entry in list(entries):
+            if entry.get('lease') and not _is_alive(entry['lease']):
+                entry['lease'] = None
+            if 'pending' in entry and not _is_alive(entry['pending']):
+                entries.remove(entry)
+            elif entry['key'] == key and self._expired(entry) and not entry['lease']:
+                entries.remove(entry)
+                expired.append(entry)
+        return expired
+
+    def _free(self, entries, key, consumer=None):
+        """Return the entries of the key which can be leased to the consumer, or which were
+        never used by any consumer when it is not set
+        """
+        return [
+            entry
+            for entry in entries
+            if entry['key'] == key
+            and 'sha256' in entry
+            and not entry['lease']
+            and not self._expired(entry)
+            and (consumer not in entry['used_on'] if consumer else not entry['used_on'])
+        ]
+
+    def _read(self, entry):
+        path = self.blobs.joinpath(f'{entry["sha256"]}.zip')
+        content = path.read_bytes() if path.exists() else b''
+        if hashlib.sha256(content).hexdigest() != entry['sha256']:
+            return None
+        return PooledManifest(
+            content=content,
+            path=path,
+            name=Path(entry['name']),
+            uuid=entry['uuid'],
+            sha256=entry['sha256'],
+        )
+
+    def _store(self, category, key):
+        content, uuid = self.generate(category)
+        sha256 = hashlib.sha256(content).hexdigest()
+        self.blobs.joinpath(f'{sha256}.zip').write_bytes(content)
+        logger.info(f'Generated manifest {uuid} for manifest pool entry {key}')
+        return {
+            'key': key,
+            'uuid': uuid,
+            'sha256': sha256,
+            'name': f'{key}-{uuid}_manifest.zip',
+            'created': time.time(),
+            'lease': None,
+            'used_on': [],
+        }
+
+    def _discard(self, category, entries):
+        for entry in entries:
+            self.blobs.joinpath(f'{entry["sha256"]}.zip').unlink(missing_ok=True)
+            try:
+                self.delete(category, entry['uuid'])
+            except Exception as err:  # noqa: BLE001 - the allocation expires on its own
+                logger.warning(f'Failed to delete expired manifest {entry["uuid"]}: {err}')
+
+    def lease(self, category, consumer=None):
+        """Lease a free manifest of the category, generating one if there is none
+
+        :param category: manifest category, like ``settings.manifest.golden_ticket``
+        :param str consumer: a manifest is never leased twice to the same consumer
+        :return: PooledManifest
+        """
+        key = manifest_params_key(category)
+        with self._index() as entries:
+            expired = self._prune(entries, key)
+            # manifests already used elsewhere first, the unused ones are the reserve of the pool
+            free = sorted(
+                self._free(entries, key, consumer), key=lambda entry: not entry['used_on']
+            )
+            for entry in free:
+                if (manifest := self._read(entry)) is not None:
+                    entry['lease'] = _owner()
+                    break
+                entries.remove(entry)
+            else:
+                manifest = None
+        if manifest is None:
+            logger.info(f'No free manifest in the manifest pool for {key}, generating one')
+            entry = self._store(category, key)
+            entry['lease'] = _owner()
+            with self._index() as entries:
+                entries.append(entry)
+            manifest = self._read(entry)
+        self.refill(category, expired=expired)
+        return manifest
+
+    def release(self, manifest, consumer=None):
+        """Give a leased manifest back to the pool"""
+        with self._index() as entries:
+            for entry in entries:
+                if entry.get('uuid') == manifest.uuid:
+                    entry['lease'] = None
+                    if consumer is not None:
+                        entry['used_on'].append(consumer)
+
+    @contextmanager
+    def manifest(self, category, consumer=None):
+        """Lease a manifest for the duration of the context"""
+        manifest = self.lease(category, consumer=consumer)
+        try:
+            yield manifest
+        finally:
+            self.release(manifest, consumer=consumer)
+
+    def refill(self, category, expired=(), background=True):
+        """Delete the expired manifests and generate free ones up to the pool size
+
+        Manifests being generated by other workers count as free, so that the workers do not
+        all refill the pool at the same time. Manifests already used by a consumer do not.
+        """
+        key = manifest_params_key(category)
+        with self._index() as entries:
+            free = self._free(entries, key)
+            pending = [entry for entry in entries if entry['key'] == key and 'pending' in entry]
+            missing = max(self.size - len(free) - len(pending), 0)
+            reservations = [
+                {'key': key, 'pending': _owner(), 'id': str(uuid4()), 'used_on': []}
+                for _ in range(missing)
+            ]
+            entries.extend(reservations)
+        if not (expired or reservations):
+            return
+
+        def refill():
+            self._discard(category, expired)
+            for reservation in reservations:
+                try:
+                    entry = self._store(category, key)
+                except Exception as err:  # noqa: BLE001 - the lease falls back to generating
+                    logger.warning(f'Failed to refill manifest pool entry {key}: {err}')
+                    entry = None
+                with self._index() as entries:
+                    entries[:] = [e for e in entries if e.get('id') != reservation['id']]
+                    if entry is not None:
+                        entries.append(entry)
+
+        if background:
+            # the session waits for it, see wait_for_manifest_refills
+            thread = threading.Thread(target=refill, name=f'manifest-pool-{key}', daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        else:
+            refill()
+
+    def forget(self, consumer):
+        """Forget that manifests were imported on the consumer, like after it was redeployed"""
+        with self._index() as entries:
+            for entry in entries:
+                if consumer in entry['used_on']:
+                    entry['used_on'].remove(consumer)
+
+    def wait(self, timeout=None):
+        """Wait for the background refills to finish
+
+        :param timeout: maximum number of seconds to wait for all of them
+        :return: True if they all finished, the others are kept
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self.threads:
+            thread.join(None if deadline is None else max(deadline - time.monotonic(), 0))
+        self.threads = [thread for thread in self.threads if thread.is_alive()]
+        return not self.threads
+
+    def purge(self, category):
+        """Delete all the unused and expired manifests of the category
+
+        Manifests imported on a consumer are kept until they expire, deleting their allocation
+        would break the organization they were imported in.
+        """
+        key = manifest_params_key(category)
+        with self._index() as entries:
+            expired = self._prune(entries, key)
+            free = self._free(entries, key)
+            entries[:] = [entry for entry in entries if entry not in free]
+        self._discard(category, expired + free)
+
+
+@cache
+def get_manifest_pool():
+    """Return the manifest pool configured by the ``manifest.pool`` settings"""
+    pool = settings.manifest.pool
+    return ManifestPool(
+        directory=pool.directory or MANIFEST_POOL_DIR,
+        expiry=pool.expiry,
+        size=pool.size,
+        generate=generate_offline_manifest if pool.offline else generate_manifest,
+        delete=delete_offline_manifest if pool.offline else delete_manifest,
+    )
+
+
+def wait_for_manifest_refills(timeout=600):
+    """Wait for the manifests this process generates in the background, before it exits
+
+    The refill threads are daemon threads, a refill still running after the timeout is
+    discarded when the process exits, and its manifest is generated again later.
+    """
+    if get_manifest_pool.cache_info().currsize and not get_manifest_pool().wait(timeout):
+        logger.warning(
+            f'Manifest pool refills still running after {timeout}s, they are discarded on exit'
+        )
+
+
+def forget_manifest_consumer(hostname):
+    """Let the pool lease again the manifests used on a freshly deployed Satellite"""
+    if settings.manifest.pool.enabled:
+        get_manifest_pool().forget(hostname)
+
+
+@contextmanager
+def subscription_manifest(category, satellite=None):
+    """Yield a manifest of the category, leased from the pool when ``manifest.pool.enabled``
+
+    :param category: manifest category, like ``settings.manifest.golden_ticket``
+    :param satellite: the Satellite the manifest is uploaded to, ``settings.server.hostname``
+        when not set
+    """
+    if not settings.manifest.pool.enabled:
+        from manifester import Manifester
+
+        with Manifester(manifest_category=category) as manifest:
+            yield manifest
+        return
+    consumer = satellite.hostname if satellite else settings.server.hostname
+    with get_manifest_pool().manifest(category, consumer=consumer) as manifest:
+        yield manifest
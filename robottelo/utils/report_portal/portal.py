@@ -1,8 +1,15 @@
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
+import os
+from pathlib import Path
+import tempfile
+
 import requests
 from tenacity import retry, stop_after_attempt, wait_fixed
 
 from robottelo.config import settings
-from robottelo.logging import logger
+from robottelo.logging import logger, robottelo_root_dir
 
 
 class ReportPortal:
@@ -27,11 +34,29 @@ class ReportPortal:
     statuses = ['FAILED', 'PASSED', 'SKIPPED', 'INTERRUPTED', 'IN_PROGRESS']
     importance_levels = ['Low', 'Medium', 'High', 'Critical', 'Fips']
 
-    def __init__(self, rp_url=None, rp_api_key=None, rp_project=None):
-        """initiate report portal properties"""
+    def __init__(
+        self,
+        rp_url=None,
+        rp_api_key=None,
+        rp_project=None,
+        page_size=None,
+        workers=None,
+        cache_dir=None,
+    ):
+        """initiate report portal properties
+
+        :param int page_size: number of test items fetched per request
+        :param int workers: maximum number of pages fetched at the same time
+        :param cache_dir: directory of the test items of finished launches, relative to the
+            robottelo directory. The cache is disabled when it is empty.
+        """
         self.rp_url = rp_url or settings.report_portal.portal_url
         self.rp_project = rp_project or settings.report_portal.project
         self.rp_api_key = rp_api_key or settings.report_portal.api_key
+        self.page_size = page_size or settings.report_portal.page_size
+        self.workers = workers or settings.report_portal.workers
+        cache_dir = settings.report_portal.cache_dir if cache_dir is None else cache_dir
+        self.cache_dir = robottelo_root_dir.joinpath(cache_dir) if cache_dir else None
         self.rp_project_settings = None
 
         # fetch the project settings
@@ -118,7 +143,6 @@ class ReportPortal:
             ```{'test_name1':test1_properties_dict, 'test_name2':test2_properties_dict}```
         """
         params = {
-            'page.size': 50,
             'page.sort': 'name',
             'filter.eq.launchId': launch["id"],
             'filter.ne.type': "SUITE",
@@ -137,30 +161,65 @@ class ReportPortal:
             params['filter.has.attributeKey'] = 'team'
             params['filter.has.attributeValue'] = test_args['team']
 
-        # send HTTP request to RP API, retrieve the paginated results and join them together
-        page = 1
-        total_pages = 1
-        resp_tests = []
-        while page <= total_pages:
-            logger.debug(page)
-            params['page.page'] = page
-            resp = requests.get(
-                url=f'{self.api_url}/item',
-                headers=self.headers,
-                params=params,
-                verify=False,
-            )
-            resp.raise_for_status()
-            resp_tests.extend(resp.json()['content'])
-            total_pages = resp.json()['page']['totalPages']
-            page += 1
+        # finished launches do not change, their test items are read from the cache
+        cache_file = None
+        if self.cache_dir and launch.get('status') not in ('IN_PROGRESS', None):
+            params_key = hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()
+            cache_file = self.cache_dir.joinpath(f'{launch["uuid"]}-{params_key[:16]}.json')
+        if cache_file and cache_file.exists():
+            logger.debug(f'Reading the test items of launch {launch["id"]} from {cache_file}')
+            resp_tests = json.loads(cache_file.read_text())
+        else:
+            resp_tests = self.get_pages(f'{self.api_url}/item', params)
+            if cache_file:
+                self._write_cache(cache_file, resp_tests)
 
         # Only select tests matching the supplied paths. This is a workaround for RP API limitation
         # - unable to combine multiple filters of a same type
         if test_args.get('paths'):
+            paths = test_args['paths']
             resp_tests = [
-                test
-                for test in resp_tests
-                if any([path for path in test_args['paths'] if path in test['name']])
+                test for test in resp_tests if any(path in test['name'] for path in paths)
             ]
         return resp_tests
+
+    def get_pages(self, url, params):
+        """Returns the content of all pages of a paginated API request.
+
+        The first page gives the number of pages, the others are fetched concurrently by at
+        most ``self.workers`` threads, and joined in page order.
+
+        :param str url: URL of the API endpoint
+        :param dict params: request parameters, without the page number
+        :returns list: The content of all pages
+        """
+        params = {**params, 'page.size': self.page_size}
+
+        def get_page(page):
+            resp = requests.get(
+                url=url,
+                headers=self.headers,
+                params={**params, 'page.page': page},
+                verify=False,
+            )
+            resp.raise_for_status()
+            return resp.json()
+
+        first_page = get_page(1)
+        total_pages = first_page['page']['totalPages']
+        logger.debug(f'Fetching {total_pages} pages of {self.page_size} items from {url}')
+        content = first_page['content']
+        if total_pages > 1:
+            with ThreadPoolExecutor(max_workers=min(self.workers, total_pages - 1)) as executor:
+                for page in executor.map(get_page, range(2, total_pages + 1)):
+                    content.extend(page['content'])
+        return content
+
+    @staticmethod
+    def _write_cache(cache_file, tests):
+        """Write the test items to the cache file, atomically for concurrent sessions"""
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=cache_file.parent, suffix='.tmp')
+        with os.fdopen(fd, 'w') as tmp_file:
+            json.dump(tests, tmp_file)
+        Path(tmp_name).replace(cache_file)
@@ -0,0 +1,77 @@
+"""Local index of the test results of a Report Portal launch, for rerunning tests offline.
+
+The rerun_rp plugin asks Report Portal for the failed or skipped tests of a reference launch
+during the collection of every pytest-xdist worker. A rerun index is a gzipped JSON file
+mapping the name of each test of the launch to its status and defect type, exported once with
+``scripts/rerun_index.py``. With ``--rp-rerun-index`` the plugin selects the tests from it,
+with a set lookup per collected item, without contacting Report Portal.
+
+The names are the Report Portal test names with ``::`` replaced by ``.``, see ``rerun_key``.
+"""
+
+import gzip
+import json
+
+from robottelo.utils.report_portal.portal import ReportPortal
+
+RERUN_INDEX_VERSION = 1
+# the launch fields needed to validate the reference launch
+LAUNCH_FIELDS = ('id', 'uuid', 'name', 'status', 'statistics')
+DEFECT_TYPE_NAMES = {locator: name for name, locator in ReportPortal.defect_types.items()}
+
+
+def rerun_key(name):
+    """Return the index key of a Report Portal test name or a pytest test location"""
+    return name.replace('::', '.')
+
+
+def _defect_type(test):
+    locator = (test.get('issue') or {}).get('issueType')
+    return DEFECT_TYPE_NAMES.get(locator, locator)
+
+
+def build_rerun_index(launch, tests):
+    """Return the rerun index of the test items of a launch
+
+    :param dict launch: the launch, as returned by ReportPortal.get_launches
+    :param list tests: its test items, as returned by ReportPortal.get_tests
+    """
+    return {
+        'version': RERUN_INDEX_VERSION,
+        'launch': {field: launch.get(field) for field in LAUNCH_FIELDS},
+        'tests': {rerun_key(test['name']): [test['status'], _defect_type(test)] for test in tests},
+    }
+
+
+def write_rerun_index(index, path):
+    """Write the rerun index as gzipped JSON"""
+    with gzip.open(path, 'wt') as index_file:
+        json.dump(index, index_file, separators=(',', ':'))
+
+
+def read_rerun_index(path):
+    """Read a rerun index written by write_rerun_index"""
+    with gzip.open(path, 'rt') as index_file:
+        index = json.load(index_file)
+    if index.get('version') != RERUN_INDEX_VERSION:
+        raise ValueError(
+            f'{path} is a rerun index of version {index.get("version")}, '
+            f'version {RERUN_INDEX_VERSION} is required. Export it again.'
+        )
+    return index
+
+
+def select_tests(index, statuses, defect_types=None):
+    """Return the keys of the tests of the index with one of the statuses and defect types
+
+    :param list statuses: test statuses, e.g. ``['FAILED', 'SKIPPED']``, all statuses if empty
+    :param list defect_types: names of ReportPortal.defect_types, all defect types if empty
+    """
+    statuses = {status.upper() for status in statuses}
+    defect_types = set(defect_types or ())
+    return {
+        key
+        for key, (status, defect_type) in index['tests'].items()
+        if (not statuses or status in statuses)
+        and (not defect_types or defect_type in defect_types)
+    }
@@ -0,0 +1,346 @@
+"""Compressed, resumable file transfers between the test runner and hosts.
+
+Files which fit in a single chunk are transferred with one sftp call. Bigger files are split
+into chunks which are gzip compressed, transferred one by one and verified by their sha256
+checksum on the other side. Chunks already present and valid at the destination are not
+transferred again, so a failed or interrupted transfer resumes where it stopped instead of
+restarting from zero.
+
+Example:
+    >>> transfer.upload(satellite, 'export.tar', '/var/lib/pulp/imports/export.tar')
+    >>> transfer.fan_out([capsule1, capsule2], manifest_path, '/root/manifest.zip')
+    >>> transfer.copy_tree(satellite1, '/var/lib/pulp/exports/org', satellite2, '/tmp/org')
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import gzip
+import hashlib
+from pathlib import Path
+import shlex
+import shutil
+import tarfile
+from tempfile import NamedTemporaryFile, TemporaryDirectory
+import uuid
+
+from robottelo.config import robottelo_tmp_dir
+from robottelo.exceptions import FileTransferError
+from robottelo.logging import logger
+
+CHUNK_SIZE = 32 * 1024 * 1024
+REMOTE_TMP_DIR = '/var/tmp'
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _destination(source, destination):
+    """Resolve the destination path the same way broker sftp methods do"""
+    destination = str(destination or source)
+    if destination.endswith('/'):
+        destination += Path(source).name
+    return destination
+
+
+def _remote_tmp_path(host, path, suffix=''):
+    """Return a remote temporary path for the given host and path, unique to the call so that
+    concurrent transfers of the same file don't share it"""
+    path_hash = _sha256(f'{host.hostname}:{path}'.encode())[:16]
+    return f'{REMOTE_TMP_DIR}/robottelo-transfer-{path_hash}-{uuid.uuid4().hex[:12]}{suffix}'
+
+
+def _execute(host, cmd):
+    result = host.execute(cmd)
+    if result.status != 0:
+        raise FileTransferError(f'"{cmd}" failed on {host.hostname}: {result.stderr}')
+    return result.stdout
+
+
+def _remote_checksums(host, directory, pattern):
+    """Return a {file name: sha256} dict of the files matching the pattern in a remote directory"""
+    result = host.execute(f'cd {shlex.quote(directory)} && sha256sum {pattern} 2>/dev/null')
+    checksums = {}
+    for line in result.stdout.splitlines():
+        if line.strip():
+            checksum, name = line.split(maxsplit=1)
+            checksums[name.lstrip('*')] = checksum
+    return checksums
+
+
+def _iter_chunks(source, chunk_size):
+    """Yield the chunks of a local file path or of bytes"""
+    if isinstance(source, bytes):
+        for start in range(0, len(source), chunk_size):
+            yield source[start : start + chunk_size]
+        return
+    with open(source, 'rb') as source_file:
+        while chunk := source_file.read(chunk_size):
+            yield chunk
+
+
+class LocalArtifact:
+    """A local file split into checksummed and optionally compressed chunks.
+
+    The chunks are stored in a temporary directory, so the artifact can be uploaded to any
+    number of hosts while the source is read and compressed only once. Use it as a context
+    manager to remove the chunks afterwards.
+
+    :param source: local file path or bytes
+    :param int chunk_size: size of the uncompressed chunks in bytes
+    :param bool compress: gzip compress the chunks
+    :param int compresslevel: gzip compression level
+    """
+
+    def __init__(self, source, chunk_size=CHUNK_SIZE, compress=True, compresslevel=6):
+        self.source = source
+        self.chunk_size = chunk_size
+        self.compress = compress
+        self._tmp_dir = TemporaryDirectory(dir=robottelo_tmp_dir)
+        self.chunks = []
+        digest = hashlib.sha256()
+        for index, chunk in enumerate(_iter_chunks(source, chunk_size)):
+            digest.update(chunk)
+            path = Path(self._tmp_dir.name, f'{index:06d}{".gz" if compress else ""}')
+            path.write_bytes(gzip.compress(chunk, compresslevel) if compress else chunk)
+            self.chunks.append((f'{index:06d}', _sha256(chunk), path))
+        self.sha256 = digest.hexdigest()
+
+    def cleanup(self):
+        self._tmp_dir.cleanup()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cleanup()
+
+
+def upload_artifact(host, artifact, destination, retries=3):
+    """Upload a prepared :class:`LocalArtifact` to the host, resuming from the chunks which
+    are already present from a previous attempt.
+
+    :raises FileTransferError: if some chunks are still invalid after all the retries or the
+        assembled file does not match the source checksum
+    """
+    destination = str(destination)
+    part_dir = f'{destination}.part-{artifact.sha256[:16]}-{artifact.chunk_size}'
+    _execute(host, f'mkdir -p {shlex.quote(part_dir)}')
+    for attempt in range(retries + 1):
+        present = _remote_checksums(host, part_dir, '[0-9]*[0-9]')
+        missing = [chunk for chunk in artifact.chunks if present.get(chunk[0]) != chunk[1]]
+        if not missing or attempt == retries:
+            break
+        logger.debug(
+            f'Uploading {len(missing)}/{len(artifact.chunks)} chunks to {host.hostname}:{destination}'
+        )
+        for _, _, path in missing:
+            host.session.sftp_write(
+                source=str(path), destination=f'{part_dir}/{path.name}', ensure_dir=False
+            )
+        if artifact.compress:
+            # a partially written archive fails to decompress and is uploaded again
+            host.execute(
+                f'cd {shlex.quote(part_dir)} && for f in *.gz; do gunzip -f "$f" || rm -f "$f"; done'
+            )
+    if missing:
+        raise FileTransferError(
+            f'{len(missing)} chunks of {destination} are invalid on {host.hostname}'
+        )
+    quoted = shlex.quote(destination)
+    checksum = _execute(
+        host,
+        f'cat {shlex.quote(part_dir)}/[0-9]*[0-9] > {quoted} && sha256sum {quoted} '
+        f'&& rm -rf {shlex.quote(part_dir)}',
+    ).split()[0]
+    if checksum != artifact.sha256:
+        raise FileTransferError(f'Checksum mismatch for {host.hostname}:{destination}')
+    return destination
+
+
+def upload(host, source, destination=None, chunk_size=CHUNK_SIZE, compress=True, retries=3):
+    """Upload a local file or bytes to the host.
+
+    :param host: host object with an ssh session
+    :param source: local file path or bytes
+    :param destination: remote file path, resolved like for ``sftp_write`` when not set
+    :param int chunk_size: sources bigger than this are transferred in chunks
+    :param bool compress: compress the chunks during the transfer
+    :param int retries: how many times the invalid chunks are uploaded again
+    """
+    size = len(source) if isinstance(source, bytes) else Path(source).stat().st_size
+    if size <= chunk_size:
+        if isinstance(source, bytes):
+            with NamedTemporaryFile(dir=robottelo_tmp_dir) as content_file:
+                content_file.write(source)
+                content_file.flush()
+                host.session.sftp_write(source=content_file.name, destination=str(destination))
+        else:
+            host.session.sftp_write(source=str(source), destination=str(destination))
+        return destination
+    if isinstance(source, bytes) and not destination:
+        raise FileTransferError('A destination is required to upload bytes')
+    destination = _destination(source, destination)
+    with LocalArtifact(source, chunk_size=chunk_size, compress=compress) as artifact:
+        return upload_artifact(host, artifact, destination, retries=retries)
+
+
+def download(host, source, destination, chunk_size=CHUNK_SIZE, compress=True, retries=3):
+    """Download a remote file from the host.
+
+    Chunks already downloaded to ``<destination>.part`` by an earlier attempt are kept
+    and only the missing or invalid ones are transferred.
+
+    :param host: host object with an ssh session
+    :param source: remote file path
+    :param destination: local file path
+    :param int chunk_size: files bigger than this are transferred in chunks
+    :param bool compress: compress the chunks during the transfer
+    :param int retries: how many times the invalid chunks are downloaded again
+    :raises FileTransferError: if the downloaded file does not match the remote checksum
+    """
+    source, destination = str(source), Path(destination)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    if int(_execute(host, f'stat -c %s {shlex.quote(source)}').strip()) <= chunk_size:
+        host.session.sftp_read(source=source, destination=str(destination))
+        return destination
+    remote_dir = _remote_tmp_path(host, source)
+    checksum = _execute(
+        host,
+        f'rm -rf {remote_dir} && mkdir -p {remote_dir} && '
+        f'split -b {chunk_size} -d -a 6 {shlex.quote(source)} {remote_dir}/ && '
+        f'sha256sum {shlex.quote(source)}',
+    ).split()[0]
+    try:
+        remote = _remote_checksums(host, remote_dir, '[0-9]*[0-9]')
+        part_dir = Path(f'{destination}.part')
+        part_dir.mkdir(exist_ok=True)
+        for attempt in range(retries + 1):
+            missing = [
+                name
+                for name, chunk_sum in remote.items()
+                if not (part_dir / name).exists()
+                or _sha256((part_dir / name).read_bytes()) != chunk_sum
+            ]
+            if not missing or attempt == retries:
+                break
+            logger.debug(f'Downloading {len(missing)}/{len(remote)} chunks of {source}')
+            if compress:
+                _execute(host, f'cd {remote_dir} && gzip -k -f -1 {" ".join(missing)}')
+            for name in missing:
+                data = host.session.sftp_read(
+                    source=f'{remote_dir}/{name}{".gz" if compress else ""}', return_data=True
+                )
+                (part_dir / name).write_bytes(gzip.decompress(data) if compress else data)
+        if missing:
+            raise FileTransferError(f'{len(missing)} chunks of {source} could not be downloaded')
+        digest = hashlib.sha256()
+        with destination.open('wb') as destination_file:
+            for name in sorted(remote):
+                data = (part_dir / name).read_bytes()
+                digest.update(data)
+                destination_file.write(data)
+        if digest.hexdigest() != checksum:
+            destination.unlink()
+            raise FileTransferError(f'Checksum mismatch for {host.hostname}:{source}')
+        shutil.rmtree(part_dir)
+    finally:
+        host.execute(f'rm -rf {remote_dir}')
+    return destination
+
+
+def upload_tree(host, source, destination, **kwargs):
+    """Upload a local directory tree to the host as a single compressed archive.
+
+    :param source: local directory
+    :param destination: remote directory, created if it doesn't exist
+    :param kwargs: passed to :func:`upload`
+    """
+    remote_archive = _remote_tmp_path(host, destination, '.tar.gz')
+    with NamedTemporaryFile(dir=robottelo_tmp_dir, suffix='.tar.gz') as archive:
+        with tarfile.open(archive.name, 'w:gz') as tar:
+            tar.add(str(source), arcname='.')
+        upload(host, Path(archive.name), remote_archive, compress=False, **kwargs)
+    _execute(
+        host,
+        f'mkdir -p {shlex.quote(str(destination))} && '
+        f'tar -xzf {remote_archive} -C {shlex.quote(str(destination))}; '
+        f'status=$?; rm -f {remote_archive}; exit $status',
+    )
+    return destination
+
+
+def download_tree(host, source, destination, **kwargs):
+    """Download a remote directory tree from the host as a single compressed archive.
+
+    :param source: remote directory
+    :param destination: local directory, created if it doesn't exist
+    :param kwargs: passed to :func:`download`
+    """
+    remote_archive = _remote_tmp_path(host, source, '.tar.gz')
+    _execute(host, f'tar -czf {remote_archive} -C {shlex.quote(str(source))} .')
+    try:
+        with TemporaryDirectory(dir=robottelo_tmp_dir) as tmp_dir:
+            archive = download(
+                host, remote_archive, Path(tmp_dir, 'tree.tar.gz'), compress=False, **kwargs
+            )
+            Path(destination).mkdir(parents=True, exist_ok=True)
+            with tarfile.open(archive, 'r:gz') as tar:
+                tar.extractall(destination, filter='tar')
+    finally:
+        host.execute(f'rm -f {remote_archive}')
+    return destination
+
+
+def copy_tree(source_host, source, target_host, destination, **kwargs):
+    """Copy a directory tree from one host to another through the test runner,
+    so that the hosts don't need ssh access to each other.
+
+    :param source: directory on the source host
+    :param destination: directory on the target host, created if it doesn't exist
+    :param kwargs: passed to :func:`download` and :func:`upload`
+    """
+    archive_path = _remote_tmp_path(source_host, source, '.tar.gz')
+    remote_archive = _remote_tmp_path(target_host, destination, '.tar.gz')
+    _execute(source_host, f'tar -czf {archive_path} -C {shlex.quote(str(source))} .')
+    try:
+        with TemporaryDirectory(dir=robottelo_tmp_dir) as tmp_dir:
+            archive = download(
+                source_host, archive_path, Path(tmp_dir, 'tree.tar.gz'), compress=False, **kwargs
+            )
+            upload(target_host, archive, remote_archive, compress=False, **kwargs)
+    finally:
+        source_host.execute(f'rm -f {archive_path}')
+    _execute(
+        target_host,
+        f'mkdir -p {shlex.quote(str(destination))} && '
+        f'tar -xzf {remote_archive} -C {shlex.quote(str(destination))}; '
+        f'status=$?; rm -f {remote_archive}; exit $status',
+    )
+    return destination
+
+
+def fan_out(hosts, source, destination, max_workers=None, chunk_size=CHUNK_SIZE, **kwargs):
+    """Upload one local file or bytes to many hosts concurrently.
+
+    The source is split and compressed once and the same chunks are sent to every host.
+
+    :param hosts: list of host objects
+    :param source: local file path or bytes
+    :param destination: remote file path, the same on all the hosts
+    :param max_workers: maximum number of concurrent uploads, one per host when not set
+    :param kwargs: passed to :func:`upload_artifact`
+    :return: dict of {hostname: destination}
+    :raises FileTransferError: if the upload failed for any of the hosts
+    """
+    with (
+        LocalArtifact(source, chunk_size=chunk_size) as artifact,
+        ThreadPoolExecutor(max_workers=max_workers or len(hosts)) as executor,
+    ):
+        futures = {
+            host.hostname: executor.submit(upload_artifact, host, artifact, destination, **kwargs)
+            for host in hosts
+        }
+        errors = {name: future.exception() for name, future in futures.items()}
+    if failed := {name: error for name, error in errors.items() if error}:
+        raise FileTransferError(f'Upload of {destination} failed for: {failed}')
+    return {name: future.result() for name, future in futures.items()}
@@ -0,0 +1,239 @@
+"""Pool of logged in airgun sessions, reused by the UI tests of a pytest-xdist worker.
+
+Starting a browser and logging in to Satellite is the slowest part of most UI tests. With
+``ui.session_pool.enabled``, ``Satellite.ui_session`` leases an already logged in session
+keyed by (hostname, user, organization, location) from the pool of the process instead of
+starting a new one, and returns it to the pool after the test. A leased session is back on
+the landing page, in the organization and location of its key, or Any organization and Any
+location when the key has none, whatever the previous test selected.
+
+A session is closed instead of being returned to the pool when the test failed, so that a
+broken browser is not handed to the next test, and when the test logged in as another user.
+The failure is passed to airgun when the session is closed, so that it takes its screenshot.
+At most ``ui.session_pool.size`` idle sessions are kept, the least recently used ones are
+closed first.
+
+The session seen by the tests is a :class:`PooledUISession` proxy: entering it again with
+``with session:`` keeps the pooled browser open.
+"""
+
+import atexit
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import cache
+import sys
+import threading
+from typing import NamedTuple
+
+from robottelo.logging import logger
+
+
+class UISessionKey(NamedTuple):
+    hostname: str
+    user: str
+    organization: str | None = None
+    location: str | None = None
+
+
+class PooledUISession:
+    """Proxy of an airgun session leased from a UISessionPool"""
+
+    def __init__(self, pool, key, session):
+        self.pool = pool
+        self.pool_key = key
+        self.pool_session = session
+        # set when the session must not be returned to the pool
+        self.pool_discard = False
+        # the failure the session is closed with, see airgun's Session.__exit__
+        self.pool_exc_info = (None, None, None)
+
+    _own_attributes = frozenset(
+        ('pool', 'pool_key', 'pool_session', 'pool_discard', 'pool_exc_info')
+    )
+
+    def __getattr__(self, name):
+        return getattr(self.pool_session, name)
+
+    def __setattr__(self, name, value):
+        if name in self._own_attributes:
+            super().__setattr__(name, value)
+        else:
+            setattr(self.pool_session, name, value)
+
+    def __call__(self, user=None, password=None, **kwargs):
+        """As airgun's Session.__call__, logging in as another user starts a new session"""
+        if user is not None and user != self.pool_key.user:
+            self.pool.switch_user(self, user, password)
+        elif kwargs:
+            self.pool_session(**kwargs)
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.pool_discard = True
+            self.pool_exc_info = (exc_type, exc_value, traceback)
+
+
+class UISessionPool:
+    """Logged in sessions of this process, by UISessionKey
+
+    :param start: function starting a logged in session, called with the key, the password
+        and the test name
+    :param reset: function bringing a session back to the landing page and the context of
+        its key, called with the session, its key and the test name
+    :param stop: function closing a session, called with the session and the exc_info of
+        the failure it is closed for
+    :param size: maximum number of idle sessions kept
+    """
+
+    def __init__(self, start, reset, stop, size=2):
+        self.start = start
+        self.reset = reset
+        self.stop = stop
+        self.size = size
+        self.idle = OrderedDict()
+        self.created = 0
+        self.reused = 0
+        self._lock = threading.Lock()
+
+    def lease(self, key, password, testname=None):
+        """Return an idle session of the key, or a new one"""
+        while True:
+            with self._lock:
+                session = next(
+                    (session for session, idle_key in self.idle.items() if idle_key == key), None
+                )
+                if session is None:
+                    break
+                del self.idle[session]
+            try:
+                self.reset(session, key, testname)
+            except Exception as err:  # noqa: BLE001 - any error means the browser is unusable
+                logger.warning(f'Closing the pooled UI session of {key.user}: {err}')
+                self._stop(session)
+                continue
+            self.reused += 1
+            logger.debug(f'Reusing the UI session of {key.user} on {key.hostname}')
+            return PooledUISession(self, key, session)
+        self.created += 1
+        return PooledUISession(self, key, self.start(key, password, testname))
+
+    def release(self, pooled):
+        """Return the session to the pool, or close it if it must be discarded"""
+        if pooled.pool_discard:
+            self._stop(pooled.pool_session, pooled.pool_exc_info)
+            return
+        with self._lock:
+            self.idle[pooled.pool_session] = pooled.pool_key
+            evicted = []
+            while len(self.idle) > self.size:
+                evicted.append(self.idle.popitem(last=False)[0])
+        for session in evicted:
+            self._stop(session)
+
+    def switch_user(self, pooled, user, password):
+        """Replace the session of the proxy by a new one for another user, the new session
+        is not returned to the pool
+        """
+        self._stop(pooled.pool_session)
+        pooled.pool_key = pooled.pool_key._replace(user=user)
+        pooled.pool_discard = True
+        pooled.pool_session = self.start(pooled.pool_key, password, None)
+        self.created += 1
+
+    @contextmanager
+    def session(self, key, password, testname=None):
+        """Lease a session for the block, it is discarded if the block raises"""
+        pooled = self.lease(key, password, testname)
+        try:
+            yield pooled
+        except BaseException:
+            pooled.pool_discard = True
+            if pooled.pool_exc_info[0] is None:
+                pooled.pool_exc_info = sys.exc_info()
+            raise
+        finally:
+            self.release(pooled)
+
+    def close(self):
+        """Close the idle sessions"""
+        with self._lock:
+            sessions, self.idle = list(self.idle), OrderedDict()
+        for session in sessions:
+            self._stop(session)
+
+    def _stop(self, session, exc_info=(None, None, None)):
+        try:
+            self.stop(session, exc_info)
+        except Exception as err:  # noqa: BLE001 - the browser may be gone already
+            logger.warning(f'Failed to close a pooled UI session: {err}')
+
+
+def discard_if_failed(session, item):
+    """Close the pooled session at release when the call of the test item did not pass"""
+    report = getattr(item, 'report_call', None)
+    if isinstance(session, PooledUISession) and (report is None or not report.passed):
+        session.pool_discard = True
+
+
+def start_ui_session(key, password, testname):
+    """Start an airgun session logged in as the user of the key"""
+    from airgun.session import Session
+
+    session = Session(
+        session_name=testname, user=key.user, password=password, hostname=key.hostname
+    ).__enter__()
+    select_ui_context(session, key.organization, key.location)
+    return session
+
+
+def select_ui_context(session, organization=None, location=None):
+    """Select the organization and location of the session, when given"""
+    if organization:
+        session.organization.select(organization)
+    if location:
+        session.location.select(location)
+
+
+def reset_ui_session(session, key, testname=None):
+    """Close the windows opened by the test, go back to the landing page and select the
+    context of the key again, the previous test may have selected another one
+    """
+    from robottelo.constants import ANY_CONTEXT
+
+    selenium = session.browser.selenium
+    main_window, *windows = selenium.window_handles
+    for window in windows:
+        selenium.switch_to.window(window)
+        selenium.close()
+    selenium.switch_to.window(main_window)
+    session.browser.url = f'https://{key.hostname}/'
+    select_ui_context(
+        session, key.organization or ANY_CONTEXT['org'], key.location or ANY_CONTEXT['location']
+    )
+    # airgun names the screenshots of the session after the test
+    if testname:
+        session.name = testname
+
+
+def stop_ui_session(session, exc_info=(None, None, None)):
+    """Close the browser of an airgun session, with a screenshot of the failure if any"""
+    session.__exit__(*exc_info)
+
+
+@cache
+def get_ui_session_pool():
+    """Return the session pool of this process, its sessions are closed at exit"""
+    from robottelo.config import settings
+
+    pool = UISessionPool(
+        start_ui_session,
+        reset_ui_session,
+        stop_ui_session,
+        size=settings.ui.session_pool.size,
+    )
+    atexit.register(pool.close)
+    return pool
@@ -1,14 +1,28 @@
-"""Hashicorp Vault Utils where vault CLI is wrapped to perform vault operations"""
+"""Hashicorp Vault Utils where vault CLI is wrapped to perform vault operations
 
+The token of the OIDC login is stored in the .env file. Its expiry is kept in a token cache
+shared by the robottelo processes, so a token known to be valid is used without asking
+Vault, and the browser login only happens when the token is missing or about to expire.
+"""
+
+import hashlib
 import json
 import os
+from pathlib import Path
 import re
+import shlex
 import subprocess
 import sys
+import tempfile
+import time
 
 from robottelo.exceptions import InvalidVaultURLForOIDC
 from robottelo.logging import logger, robottelo_root_dir
 
+VAULT_TOKEN_CACHE = robottelo_root_dir.joinpath('.vault_token_cache.json')
+# a cached token is used while it stays valid for at least that many seconds
+VAULT_TOKEN_MIN_TTL = 300
+
 
 class Vault:
     HELP_TEXT = (
@@ -17,19 +31,25 @@ class Vault:
         "install vault CLI as per your system spec!"
     )
 
-    def __init__(self, env_file='.env'):
+    def __init__(self, env_file='.env', token_cache=VAULT_TOKEN_CACHE):
         self.env_path = robottelo_root_dir.joinpath(env_file)
+        self.token_cache = Path(token_cache)
         self.envdata = None
         self.vault_enabled = None
+        # where the login found a valid token: cache, lookup or login
+        self.token_source = None
 
     def setup(self):
         if self.env_path.exists():
             self.envdata = self.env_path.read_text()
-            is_enabled = re.findall('^(?:.*\n)*VAULT_ENABLED_FOR_DYNACONF=(.*)', self.envdata)
-            if is_enabled:
-                self.vault_enabled = is_enabled[0]
+            self.vault_enabled = self.env_value('VAULT_ENABLED_FOR_DYNACONF')
             self.export_vault_addr()
 
+    def env_value(self, name):
+        """Return the value of the last line setting the variable in the env file, or None"""
+        values = re.findall(f'^{name}=(.*)$', self.envdata or '', re.MULTILINE)
+        return values[-1].strip() if values else None
+
     def teardown(self):
         if os.environ.get('VAULT_ADDR') is not None:
             del os.environ['VAULT_ADDR']
@@ -57,12 +77,13 @@ class Vault:
         :param command str: The vault CLI command
         :param kwargs dict: Arguments to the subprocess run command to customize the run behavior
         """
-        vcommand = subprocess.run(command, shell=True, capture_output=True, **kwargs)
+        try:
+            vcommand = subprocess.run(shlex.split(command), capture_output=True, **kwargs)
+        except FileNotFoundError:
+            logger.error(f"Error! {self.HELP_TEXT}")
+            sys.exit(1)
         if vcommand.returncode != 0:
             verror = str(vcommand.stderr)
-            if vcommand.returncode == 127:
-                logger.error(f"Error! {self.HELP_TEXT}")
-                sys.exit(1)
             if vcommand.stderr:
                 if 'no such host' in verror:
                     logger.error("The Vault host is not reachable, check network availability.")
@@ -76,12 +97,23 @@ class Vault:
         return vcommand
 
     def login(self, **kwargs):
-        if (
+        """Make sure the .env file holds a valid token, logging in with OIDC if it does not
+
+        The token is checked against the token cache first, then with ``vault token lookup``.
+        """
+        if not (
             self.vault_enabled
             and self.vault_enabled in ['True', 'true']
             and 'VAULT_SECRET_ID_FOR_DYNACONF' not in os.environ
-            and self.status(**kwargs).returncode != 0
         ):
+            return
+        if self.cached_token_valid():
+            self.token_source = 'cache'
+            logger.debug(f"Vault token from {self.token_cache} is valid, skipping the lookup")
+            return
+        self.token_source = 'lookup'
+        lookup = self.token_lookup(**kwargs)
+        if lookup is None:
             logger.info(
                 "Warning! The browser is about to open for vault OIDC login, "
                 "close the tab once the sign-in is done!"
@@ -92,17 +124,65 @@ class Vault:
             ):
                 self.exec_vault_command(command="vault token renew -i 10h", **kwargs)
                 logger.info("Success! Vault OIDC Logged-In and extended for 10 hours!")
-            # Fetching tokens
-            token = self.exec_vault_command("vault token lookup --format json").stdout
-            token = json.loads(str(token.decode('UTF-8')))['data']['id']
+            self.token_source = 'login'
+            lookup = self.token_lookup()
+            if lookup is None:
+                return
+        # Fetching tokens
+        token = lookup['data']['id']
+        if token != self.env_value('VAULT_TOKEN_FOR_DYNACONF'):
             # Setting new token in env file
-            _envdata = re.sub(
+            self.envdata = re.sub(
                 '.*VAULT_TOKEN_FOR_DYNACONF=.*',
                 f"VAULT_TOKEN_FOR_DYNACONF={token}",
                 self.envdata,
             )
-            self.env_path.write_text(_envdata)
+            self.env_path.write_text(self.envdata)
             logger.info("Success! New OIDC token added to .env file to access secrets from vault!")
+        self.cache_token(lookup)
+
+    def token_lookup(self, **kwargs):
+        """Return the ``vault token lookup`` data of the vault CLI token, None if not logged in"""
+        vstatus = self.exec_vault_command('vault token lookup --format json', **kwargs)
+        if vstatus.returncode != 0:
+            return None
+        return json.loads(vstatus.stdout.decode('UTF-8'))
+
+    def cached_token_valid(self):
+        """Return whether the token cache holds the .env token of this Vault, valid for long
+        enough, without running the vault CLI
+        """
+        token = self.env_value('VAULT_TOKEN_FOR_DYNACONF')
+        if not token:
+            return False
+        try:
+            cache = json.loads(self.token_cache.read_text())
+        except (OSError, ValueError):
+            return False
+        expires = cache.get('expires')
+        return (
+            cache.get('vault_addr') == os.environ.get('VAULT_ADDR')
+            and cache.get('token_sha256') == hashlib.sha256(token.encode()).hexdigest()
+            and (expires is None or expires - time.time() > VAULT_TOKEN_MIN_TTL)
+        )
+
+    def cache_token(self, lookup):
+        """Store a hash of the looked up token and its expiry in the token cache
+
+        The token itself stays in the .env file only. A token without TTL never expires.
+        """
+        data = lookup['data']
+        cache = {
+            'vault_addr': os.environ.get('VAULT_ADDR'),
+            'token_sha256': hashlib.sha256(data['id'].encode()).hexdigest(),
+            'expires': time.time() + data['ttl'] if data.get('ttl') else None,
+        }
+        # written to a temporary file first, other processes may be reading the cache
+        with tempfile.NamedTemporaryFile(
+            'w', dir=self.token_cache.parent, prefix='.vault_token', delete=False
+        ) as f:
+            f.write(json.dumps(cache))
+        os.replace(f.name, self.token_cache)
 
     def logout(self):
         # Teardown - Setting dymmy token in env file
@@ -110,6 +190,7 @@ class Vault:
             '.*VAULT_TOKEN_FOR_DYNACONF=.*', "# VAULT_TOKEN_FOR_DYNACONF=myroot", self.envdata
         )
         self.env_path.write_text(_envdata)
+        self.token_cache.unlink(missing_ok=True)
         vstatus = self.exec_vault_command('vault token revoke -self')
         if vstatus.returncode == 0:
             logger.info("Success! OIDC token removed from Env file successfully!")
@@ -1,13 +1,17 @@
 """Utility module to handle the virtwho configure UI/CLI/API testing"""
 
 import base64
+from concurrent.futures import ThreadPoolExecutor
 import json
+import random
 import re
+import time
 import uuid
 
 from fauxfactory import gen_integer, gen_string, gen_url
 from nailgun import entities
 import requests
+from ssh2.exceptions import SocketDisconnectError, SocketRecvError, SocketSendError
 from wait_for import wait_for
 
 from robottelo import ssh
@@ -16,6 +20,7 @@ from robottelo.cli.host import Host
 from robottelo.config import settings
 from robottelo.constants import DEFAULT_ORG
 from robottelo.hosts import ContentHost
+from robottelo.logging import logger
 
 ETC_VIRTWHO_CONFIG = "/etc/virt-who.conf"
 
@@ -62,8 +67,9 @@ def get_system(system_type):
 
 def get_guest_info(hypervisor_type):
     """Return the guest_name, guest_uuid"""
-    _, guest_name = runcmd('hostname', system=get_system(hypervisor_type))
-    _, guest_uuid = runcmd('dmidecode -s system-uuid', system=get_system(hypervisor_type))
+    (_, guest_name), (_, guest_uuid) = runcmds(
+        ['hostname', 'dmidecode -s system-uuid'], system=get_system(hypervisor_type)
+    )
     if not guest_uuid or not guest_name:
         raise VirtWhoError(f'Failed to get the guest info for {hypervisor_type}')
     # Different UUID for vcenter by dmidecode and vcenter MOB
@@ -74,9 +80,53 @@ def get_guest_info(hypervisor_type):
     return guest_name, guest_uuid
 
 
+_sessions = {}
+
+
+def _session_key(system):
+    return (system['hostname'], system.get('port') or 22, system['username'])
+
+
+def get_session(system=None):
+    """Return a host object for the system which is reused by all later calls,
+    so that consecutive commands share one ssh connection.
+
+    :param dict system: the system account which ssh will connect to,
+        it will connect to the satellite host if the system is None.
+    """
+    system = system or get_system('satellite')
+    key = _session_key(system)
+    if key not in _sessions:
+        _sessions[key] = ssh.get_client(
+            hostname=system['hostname'],
+            username=system['username'],
+            password=system['password'],
+            port=system.get('port') or 22,
+        )
+    return _sessions[key]
+
+
+def close_session(system=None):
+    """Close the cached connection of the system, the next command will open a new one."""
+    system = system or get_system('satellite')
+    if host := _sessions.pop(_session_key(system), None):
+        host.close()
+
+
+def close_sessions():
+    """Close all the cached connections."""
+    for host in _sessions.values():
+        host.close()
+    _sessions.clear()
+
+
 def runcmd(cmd, system=None, timeout=600000, output_format='base'):
     """Return the retcode and stdout.
 
+    The command is executed through the cached connection of the system, see
+    :func:`get_session`. A broken connection is dropped and the command is retried once
+    on a new one.
+
     :param str cmd: The command line will be executed in the target system.
     :param dict system: the system account which ssh will connect to,
         it will connect to the satellite host if the system is None.
@@ -84,10 +134,93 @@ def runcmd(cmd, system=None, timeout=600000, output_format='base'):
     :param str output_format: base|json|csv|list
     """
     system = system or get_system('satellite')
-    result = ssh.command(cmd, **system, timeout=timeout, output_format=output_format)
+    try:
+        result = ssh.command(
+            cmd, timeout=timeout, output_format=output_format, client=get_session(system)
+        )
+    except (SocketDisconnectError, SocketRecvError, SocketSendError) as err:
+        logger.debug(f'Reconnecting to {system["hostname"]} after: {err}')
+        close_session(system)
+        result = ssh.command(
+            cmd, timeout=timeout, output_format=output_format, client=get_session(system)
+        )
     return result.status, result.stdout.strip()
 
 
+def runcmds(cmds, system=None, timeout=600000):
+    """Execute a list of commands as one remote script and return the retcode and
+    stdout of each of them, in the same order.
+
+    Every command runs in its own subshell, so a failing command does not stop the
+    following ones. Stderr is discarded like in :func:`runcmd`.
+
+    :param list cmds: The command lines will be executed in the target system.
+    :param dict system: the system account which ssh will connect to,
+        it will connect to the satellite host if the system is None.
+    :param int timeout: Time to wait for the whole script to finish.
+    :raises: VirtWhoError: If the output of a command can not be found.
+    """
+    marker = f'VIRTWHO-{uuid.uuid4().hex}'
+    script = ''.join(
+        f"printf '%s\\n' '{marker} BEGIN {index}'\n"
+        f"( {cmd}\n)\n"
+        f"printf '\\n%s %s\\n' '{marker} END {index}' \"$?\"\n"
+        for index, cmd in enumerate(cmds)
+    )
+    script_b64 = base64.b64encode(script.encode('utf-8')).decode('ascii')
+    _, stdout = runcmd(f"echo '{script_b64}' | base64 -d | bash", system=system, timeout=timeout)
+    results = []
+    for index, cmd in enumerate(cmds):
+        match = re.search(
+            rf'^{marker} BEGIN {index}\n(.*?)\n{marker} END {index} (\d+)$',
+            stdout,
+            re.DOTALL | re.MULTILINE,
+        )
+        if not match:
+            raise VirtWhoError(f'No result found for command "{cmd}"')
+        results.append((int(match.group(2)), match.group(1).strip()))
+    return results
+
+
+class LogFollower:
+    """Incrementally read a remote log file, like ``tail -f``.
+
+    Every :meth:`read` only transfers the bytes appended since the previous call. If the
+    file shrinks (it was removed or rotated) the content is read again from the start.
+
+    :param str path: the path of the log file in the target system.
+    :param dict system: the system account which ssh will connect to,
+        it will connect to the satellite host if the system is None.
+    """
+
+    def __init__(self, path='/var/log/rhsm/rhsm.log', system=None):
+        self.path = path
+        self.system = system
+        self.offset = 0
+        self.content = ''
+
+    def read(self):
+        """Fetch the new lines of the file and return the whole content read so far."""
+        cmd = (
+            f'size=$(stat -c %s {self.path} 2>/dev/null || echo 0); echo $size; '
+            f'if [ $size -lt {self.offset} ]; then cat {self.path}; '
+            f'else tail -c +{self.offset + 1} {self.path} 2>/dev/null | head -c $((size-{self.offset})); fi'
+        )
+        result = get_session(self.system).execute(cmd)
+        size, _, data = result.stdout.partition('\n')
+        size = int(size.strip() or 0)
+        if size < self.offset:
+            self.content = ''
+        self.content += data
+        self.offset = size
+        return self.content
+
+    def wait_for(self, message, timeout=20, delay=2):
+        """Wait until the message appears in the file and return the whole content."""
+        wait_for(lambda: message in self.read(), timeout=timeout, delay=delay)
+        return self.content
+
+
 def register_system(
     system, activation_key=None, org='Default_Organization', env='Library', target_sat=None
 ):
@@ -133,21 +266,24 @@ def virtwho_cleanup():
     3. clean rhsm.log message, make sure there is no old message exist.
     4. clean all the configure files in /etc/virt-who.d/
     """
-    runcmd("systemctl stop virt-who")
-    runcmd("pkill -9 virt-who")
-    runcmd("rm -f /var/run/virt-who.pid")
-    runcmd("rm -f /var/log/rhsm/rhsm.log")
-    runcmd("rm -rf /etc/virt-who.d/*")
-    runcmd("rm -rf /tmp/deploy_script.sh")
+    runcmds(
+        [
+            "systemctl stop virt-who",
+            "pkill -9 virt-who",
+            "rm -f /var/run/virt-who.pid",
+            "rm -f /var/log/rhsm/rhsm.log",
+            "rm -rf /etc/virt-who.d/*",
+            "rm -rf /tmp/deploy_script.sh",
+        ]
+    )
 
 
 def get_virtwho_status():
     """Return the status of virt-who service, it will help us to know
     the virt-who configuration file is deployed or not.
     """
-    _, logs = runcmd('cat /var/log/rhsm/rhsm.log')
+    (_, logs), (ret, stdout) = runcmds(['cat /var/log/rhsm/rhsm.log', 'systemctl status virt-who'])
     error = len(re.findall(r'\[.*ERROR.*\]', logs))
-    ret, stdout = runcmd('systemctl status virt-who')
     running_stauts = ['is running', 'Active: active (running)']
     stopped_status = ['is stopped', 'Active: inactive (dead)']
     if ret != 0:
@@ -221,12 +357,7 @@ def get_rhsm_log():
 
 def check_message_in_rhsm_log(message):
     """Check the message exist in /var/log/rhsm/rhsm.log"""
-    wait_for(
-        lambda: 'Host-to-guest mapping being sent to' in get_rhsm_log(),
-        timeout=20,
-        delay=2,
-    )
-    logs = get_rhsm_log()
+    logs = LogFollower().wait_for('Host-to-guest mapping being sent to', timeout=20, delay=2)
     return any(message in line for line in logs.split('\n'))
 
 
@@ -240,12 +371,7 @@ def _get_hypervisor_mapping(hypervisor_type):
     """
     # Increase timeout for hypervisors like Nutanix Prism Central which can be slower
     timeout = 60 if hypervisor_type == 'ahv' else 20
-    wait_for(
-        lambda: 'Host-to-guest mapping being sent to' in get_rhsm_log(),
-        timeout=timeout,
-        delay=2,
-    )
-    logs = get_rhsm_log()
+    logs = LogFollower().wait_for('Host-to-guest mapping being sent to', timeout=timeout, delay=2)
     mapping = list()
     entry = None
     guest_name, guest_uuid = get_guest_info(hypervisor_type)
@@ -281,12 +407,9 @@ def get_hypervisor_ahv_mapping(hypervisor_type):
     :raises: VirtWhoError: If message is not found.
     :return: True or False
     """
-    wait_for(
-        lambda: 'Successfully logged into the AHV REST server' in get_rhsm_log(),
-        timeout=10,
-        delay=2,
+    logs = LogFollower().wait_for(
+        'Successfully logged into the AHV REST server', timeout=10, delay=2
     )
-    logs = get_rhsm_log()
     mapping = list()
     entry = None
     guest_name, guest_uuid = get_guest_info(hypervisor_type)
@@ -476,8 +599,7 @@ def restart_virtwho_service():
     1. remove rhsm.log to ensure there are no old messages.
     2. restart virt-who service via systemctl command
     """
-    runcmd("rm -f /var/log/rhsm/rhsm.log")
-    runcmd("systemctl restart virt-who; sleep 10")
+    runcmds(["rm -f /var/log/rhsm/rhsm.log", "systemctl restart virt-who; sleep 10"])
 
 
 def update_configure_option(option, value, config_file):
@@ -523,7 +645,23 @@ def add_configure_option(option, value, config_file):
         raise VirtWhoError(f"option {option} is already exist in {config_file}")
 
 
-def hypervisor_json_create(hypervisors, guests):
+def _uuid_factory(seed=None):
+    """Return a callable producing uuid4 strings.
+
+    :param seed: when set, the callable yields the same sequence of uuids for the same seed,
+        otherwise ``uuid.uuid4`` is used.
+    """
+    if seed is None:
+        return lambda: str(uuid.uuid4())
+    rng = random.Random(seed)
+    return lambda: str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _guest_entry(guest_id):
+    return {"guestId": guest_id, "state": 1, "attributes": {"active": 1, "virtWhoType": "esx"}}
+
+
+def hypervisor_json_create(hypervisors, guests, seed=None):
     """
     Create a hypervisor guest json data. For example:
     {'hypervisors': [{'hypervisorId': '820b5143-3885-4dba-9358-4ce8c30d934e',
@@ -531,25 +669,19 @@ def hypervisor_json_create(hypervisors, guests):
     'attributes': {'active': 1, 'virtWhoType': 'esx'}}]}]}
     :param hypervisors: how many hypervisors will be created
     :param guests: how many guests will be created
+    :param seed: seed for reproducible uuids, random uuids are used when not set
     """
+    gen_uuid = _uuid_factory(seed)
     hypervisors_list = []
     for _ in range(hypervisors):
-        guest_list = []
-        for _ in range(guests):
-            guest_list.append(
-                {
-                    "guestId": str(uuid.uuid4()),
-                    "state": 1,
-                    "attributes": {"active": 1, "virtWhoType": "esx"},
-                }
-            )
-        name = str(uuid.uuid4())
+        guest_list = [_guest_entry(gen_uuid()) for _ in range(guests)]
+        name = gen_uuid()
         hypervisor = {"guestIds": guest_list, "name": name, "hypervisorId": {"hypervisorId": name}}
         hypervisors_list.append(hypervisor)
     return {"hypervisors": hypervisors_list}
 
 
-def hypervisor_fake_json_create(hypervisors, guests):
+def hypervisor_fake_json_create(hypervisors, guests, seed=None):
     """
     Create a hypervisor guest json data for fake config usages. For example:
     {'hypervisors': [{'uuid': '820b5143-3885-4dba-9358-4ce8c30d934e',
@@ -557,34 +689,67 @@ def hypervisor_fake_json_create(hypervisors, guests):
     'attributes': {'active': 1, 'virtWhoType': 'esx'}}]}]}
     :param hypervisors: how many hypervisors will be created
     :param guests: how many guests will be created
+    :param seed: seed for reproducible uuids, random uuids are used when not set
     """
+    gen_uuid = _uuid_factory(seed)
     hypervisors_list = [
         {
-            'guests': [
-                {
-                    "guestId": str(uuid.uuid4()),
-                    "state": 1,
-                    "attributes": {"active": 1, "virtWhoType": "esx"},
-                }
-                for _ in range(guests)
-            ],
-            'name': str(uuid.uuid4()),
-            'uuid': str(uuid.uuid4()),
+            'guests': [_guest_entry(gen_uuid()) for _ in range(guests)],
+            'name': gen_uuid(),
+            'uuid': gen_uuid(),
         }
         for _ in range(hypervisors)
     ]
     return {"hypervisors": hypervisors_list}
 
 
-def create_fake_hypervisor_content(org_label, hypervisors, guests):
+def hypervisor_json_stream(hypervisors, guests, seed=None, fake=False, chunk_size=65536):
+    """
+    Generate a hypervisor guest json report as a stream of encoded chunks, so that reports
+    with thousands of hypervisors never have to be held in memory as a whole.
+
+    The joined chunks decode to the same data as :func:`hypervisor_json_create`
+    (or :func:`hypervisor_fake_json_create` when ``fake`` is True) for the same ``seed``.
+    The generator can be passed directly as ``data`` to ``requests.post`` to upload
+    the report with chunked transfer encoding.
+
+    :param hypervisors: how many hypervisors will be created
+    :param guests: how many guests will be created
+    :param seed: seed for reproducible uuids, random uuids are used when not set
+    :param fake: generate the format used by the virt-who fake config
+    :param chunk_size: minimal size in bytes of each yielded chunk
+    """
+    gen_uuid = _uuid_factory(seed)
+    buffer = ['{"hypervisors": [']
+    size = len(buffer[0])
+    for index in range(hypervisors):
+        guest_key = 'guests' if fake else 'guestIds'
+        parts = [', ' if index else '', f'{{"{guest_key}": [']
+        parts.append(', '.join(json.dumps(_guest_entry(gen_uuid())) for _ in range(guests)))
+        name = gen_uuid()
+        if fake:
+            parts.append(f'], "name": "{name}", "uuid": "{gen_uuid()}"}}')
+        else:
+            parts.append(f'], "name": "{name}", "hypervisorId": {{"hypervisorId": "{name}"}}}}')
+        buffer.extend(parts)
+        size += sum(len(part) for part in parts)
+        if size >= chunk_size:
+            yield ''.join(buffer).encode()
+            buffer, size = [], 0
+    buffer.append(']}')
+    yield ''.join(buffer).encode()
+
+
+def create_fake_hypervisor_content(org_label, hypervisors, guests, seed=None):
     """
     Post the fake hypervisor content to satellite server
     :param hypervisors: how many hypervisors will be created
     :param guests: how many guests will be created
     :param org_label: the label of the Organization
+    :param seed: seed for reproducible uuids, random uuids are used when not set
     :return data: the hypervisor content
     """
-    data = hypervisor_json_create(hypervisors, guests)
+    data = hypervisor_json_create(hypervisors, guests, seed=seed)
     url = f"https://{settings.server.hostname}/rhsm/hypervisors/{org_label}"
     auth = (settings.server.admin_username, settings.server.admin_password)
     result = requests.post(url, auth=auth, verify=False, json=data)
@@ -592,6 +757,78 @@ def create_fake_hypervisor_content(org_label, hypervisors, guests):
     return data
 
 
+def upload_hypervisor_reports(
+    org_label,
+    hypervisors,
+    guests,
+    batch_size=None,
+    concurrency=1,
+    seed=None,
+    target_sat=None,
+    wait_for_task=True,
+    task_timeout=3600,
+):
+    """
+    Upload streamed fake hypervisor reports in batches and measure how long the server takes
+    to accept each report and to process the task which follows it.
+
+    :param org_label: the label of the Organization
+    :param hypervisors: how many hypervisors will be reported in total
+    :param guests: how many guests each hypervisor has
+    :param batch_size: how many hypervisors are sent per report, all of them when not set
+    :param concurrency: how many reports are uploaded at the same time
+    :param seed: seed for reproducible uuids, each batch derives its own seed from it
+    :param target_sat: Satellite object, the configured server is used when not set
+    :param wait_for_task: poll the task created for each report and measure its duration
+    :param task_timeout: maximum number of seconds to wait for each task
+    :return: list of dicts, one per batch in upload order, with keys ``batch``,
+        ``hypervisors``, ``status_code``, ``accept_time``, ``task_id``, ``task_result``
+        and ``process_time``
+    """
+    hostname = target_sat.hostname if target_sat else settings.server.hostname
+    url = f"https://{hostname}/rhsm/hypervisors/{org_label}"
+    auth = (settings.server.admin_username, settings.server.admin_password)
+    foreman_task = target_sat.api.ForemanTask if target_sat else entities.ForemanTask
+    batch_size = batch_size or hypervisors
+    batches = [
+        (index, min(batch_size, hypervisors - start))
+        for index, start in enumerate(range(0, hypervisors, batch_size))
+    ]
+
+    def _upload(batch):
+        index, count = batch
+        batch_seed = None if seed is None else f'{seed}:{index}'
+        start = time.monotonic()
+        result = requests.post(
+            url,
+            auth=auth,
+            verify=False,
+            data=hypervisor_json_stream(count, guests, seed=batch_seed),
+            headers={'Content-Type': 'application/json'},
+        )
+        accepted = time.monotonic()
+        stats = {
+            'batch': index,
+            'hypervisors': count,
+            'status_code': result.status_code,
+            'accept_time': accepted - start,
+            'task_id': None,
+            'task_result': None,
+            'process_time': None,
+        }
+        body = _parse_entry(result.text) if result.ok else None
+        if isinstance(body, dict):
+            stats['task_id'] = body.get('id')
+        if wait_for_task and stats['task_id']:
+            task = foreman_task(id=stats['task_id']).poll(timeout=task_timeout, must_succeed=False)
+            stats['task_result'] = task['result']
+            stats['process_time'] = time.monotonic() - accepted
+        return stats
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(_upload, batches))
+
+
 def get_hypervisor_info(hypervisor_type):
     """
     Get the hypervisor_name and guest_name from rhsm.log.
@@ -688,9 +925,7 @@ def vw_run_option(option):
     :param option:  -d, --debug  -o, --one-shot  -i INTERVAL, --interval INTERVAL -p, --print -c CONFIGS, --config CONFIGS --version
     :ruturn:
     """
-    runcmd('systemctl stop virt-who')
-    runcmd('pkill -9 virt-who')
-    runcmd(f'virt-who -{option}')
+    runcmds(['systemctl stop virt-who', 'pkill -9 virt-who', f'virt-who -{option}'])
 
 
 def hypervisor_guest_mapping_newcontent_ui(
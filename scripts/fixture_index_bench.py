@@ -0,0 +1,126 @@
+# /// script
+# requires-python = ">=3.11"
+# dependencies = [
+#     "click",
+#     "pytest",
+# ]
+# ///
+"""Benchmark the fixture-based test selection on the collected tests.
+
+The tests are collected with pytest --collect-only, then the selections of the fixture-based
+plugins (--n-minus, the factory_instance and content_host markers, sanity) are timed the way
+they were done before (the fixture names and parameters of each item) and with the fixture
+index, and checked to select the same tests.
+
+Usage: python scripts/fixture_index_bench.py [tests/foreman] [--repeat 5]
+"""
+
+from inspect import getmembers, isfunction
+import time
+
+import click
+import pytest
+
+from pytest_plugins.fixture_index import FixtureIndex
+
+PUPPET_FIXTURES = ('session_puppet_enabled_sat', 'setup_fam')
+
+
+def old_selections(items, factory_fixtures, content_host_fixtures):
+    """Select the tests by scanning the fixtures of each item"""
+    n_minus = [
+        item
+        for item in items
+        if not (
+            'session_puppet_enabled_sat' in item.fixturenames or 'setup_fam' in item.fixturenames
+        )
+        and (
+            'capsule_factory' in item.fixturenames
+            or 'sat_maintain' in item.fixturenames
+            and 'capsule' in item.callspec.params.values()
+        )
+    ]
+    factory = [
+        item
+        for item in items
+        if set(
+            itm for itm in item.fixturenames if itm not in ('satellite_factory', 'capsule_factory')
+        ).intersection(set(factory_fixtures))
+    ]
+    content_hosts = [
+        item for item in items if set(item.fixturenames).intersection(set(content_host_fixtures))
+    ]
+    sanity = [
+        item
+        for item in items
+        if 'session_puppet_enabled_sat' in item.fixturenames or 'sat_maintain' in item.fixturenames
+    ]
+    return [n_minus, factory, content_hosts, sanity]
+
+
+def index_selections(items, factory_fixtures, content_host_fixtures):
+    """Select the tests with the fixture index"""
+    indexed = {'capsule_factory', 'sat_maintain', *PUPPET_FIXTURES}
+    indexed.update(factory_fixtures, content_host_fixtures)
+    index = FixtureIndex(items, indexed)
+    n_minus = index.with_fixture('capsule_factory') | index.with_param(
+        'capsule', among=index.with_fixture('sat_maintain')
+    )
+    n_minus -= index.with_fixture(*PUPPET_FIXTURES)
+    factory = index.with_fixture(*set(factory_fixtures) - {'satellite_factory', 'capsule_factory'})
+    content_hosts = index.with_fixture(*content_host_fixtures)
+    sanity = index.with_fixture('session_puppet_enabled_sat', 'sat_maintain')
+    return [
+        [item for item in items if id(item) in selection]
+        for selection in (n_minus, factory, content_hosts, sanity)
+    ]
+
+
+def best_time(repeat, function, *args):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        timings.append(time.perf_counter() - start)
+    return result, min(timings)
+
+
+class SelectionBench:
+    """Plugin timing the selections once the tests are collected"""
+
+    def __init__(self, repeat):
+        self.repeat = repeat
+        self.start = time.perf_counter()
+
+    def pytest_collection_finish(self, session):
+        from pytest_fixtures.core import contenthosts, sat_cap_factory
+
+        collect_time = time.perf_counter() - self.start
+        items = session.items
+        factory_fixtures = [m[0] for m in getmembers(sat_cap_factory, isfunction)]
+        content_host_fixtures = [m[0] for m in getmembers(contenthosts, isfunction)]
+        args = (items, factory_fixtures, content_host_fixtures)
+        old, old_time = best_time(self.repeat, old_selections, *args)
+        new, new_time = best_time(self.repeat, index_selections, *args)
+        assert old == new, 'the selections disagree'
+        click.echo(f'{len(items)} tests collected in {collect_time:.2f}s')
+        click.echo(
+            f'  n-minus {len(new[0])}, factory_instance {len(new[1])}, '
+            f'content_host {len(new[2])}, sanity fixtures {len(new[3])} tests'
+        )
+        click.echo(f'  fixture scans of each selector: {old_time * 1000:8.1f} ms')
+        click.echo(f'  fixture index and lookups:      {new_time * 1000:8.1f} ms')
+
+
+@click.command()
+@click.argument('path', default='tests/foreman')
+@click.option('--repeat', type=int, default=5, show_default=True, help='Best of repeats.')
+def main(path, repeat):
+    """Report the collection time and the time of the fixture-based selections."""
+    pytest.main(
+        ['--collect-only', '-q', '-p', 'no:terminal', path], plugins=[SelectionBench(repeat)]
+    )
+
+
+if __name__ == '__main__':
+    main()
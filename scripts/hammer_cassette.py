@@ -0,0 +1,102 @@
+# /// script
+# requires-python = ">=3.11"
+# dependencies = [
+#     "click",
+# ]
+# ///
+"""Inspect the hammer cassettes recorded with pytest --cassette-mode record, and benchmark
+the hammer output parsers on the recorded output.
+
+Usage:
+    python scripts/hammer_cassette.py report [--cassette-dir .cassettes]
+    python scripts/hammer_cassette.py bench --repeat 20
+"""
+
+from collections import defaultdict
+import json
+from pathlib import Path
+import time
+
+import click
+
+from robottelo.cli import hammer
+from robottelo.logging import robottelo_root_dir
+
+PARSERS = {
+    'csv': hammer.parse_csv,
+    'json': hammer.parse_json,
+    'info': hammer.parse_info,
+    'ping': hammer.parse_ping,
+}
+
+
+def recorded_commands(cassette_dir):
+    """Yield the cassette path and each command recorded in the cassettes"""
+    for path in sorted(Path(cassette_dir).rglob('*.json')):
+        for entry in json.loads(path.read_text())['entries']:
+            if entry['kind'] == 'hammer':
+                yield path, entry
+
+
+def entry_parser(entry):
+    """Return the name of the parser of the recorded output, as Base.execute and Base.info
+    would choose it, or None
+    """
+    if entry['status'] != 0 or not entry['stdout']:
+        return None
+    if entry['output_format'] in PARSERS:
+        return entry['output_format']
+    return entry['command_sub'] if entry['command_sub'] in PARSERS else None
+
+
+@click.group()
+@click.option(
+    '--cassette-dir',
+    type=click.Path(exists=True, file_okay=False),
+    default=str(robottelo_root_dir.joinpath('.cassettes')),
+    show_default=True,
+)
+@click.pass_context
+def cli(ctx, cassette_dir):
+    ctx.obj = cassette_dir
+
+
+@cli.command()
+@click.pass_obj
+def report(cassette_dir):
+    """Show the number of recorded commands and their recorded time, by cassette."""
+    totals = defaultdict(lambda: [0, 0.0])
+    for path, entry in recorded_commands(cassette_dir):
+        totals[path][0] += 1
+        totals[path][1] += entry['duration']
+    for path, (count, duration) in sorted(totals.items(), key=lambda item: -item[1][1]):
+        click.echo(f'{duration:9.2f}s {count:5} commands  {path.relative_to(cassette_dir)}')
+    count = sum(total[0] for total in totals.values())
+    duration = sum(total[1] for total in totals.values())
+    click.echo(f'{duration:9.2f}s {count:5} commands  in {len(totals)} cassettes')
+
+
+@cli.command()
+@click.option('--repeat', default=10, show_default=True, help='Times each output is parsed.')
+@click.pass_obj
+def bench(cassette_dir, repeat):
+    """Parse the recorded output with the hammer parsers and show their time."""
+    timings = defaultdict(lambda: [0, 0.0, 0])
+    for _, entry in recorded_commands(cassette_dir):
+        if not (parser := entry_parser(entry)):
+            continue
+        start = time.perf_counter()
+        for _ in range(repeat):
+            PARSERS[parser](entry['stdout'])
+        timings[parser][0] += 1
+        timings[parser][1] += (time.perf_counter() - start) / repeat
+        timings[parser][2] += len(entry['stdout'])
+    for parser, (count, duration, size) in sorted(timings.items()):
+        click.echo(
+            f'{parser:5} {count:6} outputs {size / 1024:10.1f} KiB '
+            f'{duration * 1000:9.2f} ms  {duration / count * 1e6:9.1f} us per output'
+        )
+
+
+if __name__ == '__main__':
+    cli()
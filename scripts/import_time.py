@@ -0,0 +1,70 @@
+# /// script
+# requires-python = ">=3.11"
+# dependencies = [
+#     "click",
+# ]
+# ///
+"""Check the cold import time of robottelo against a budget, using ``python -X importtime``.
+
+Every target is imported in a fresh interpreter, the script exits with 1 if any of them
+takes longer than its budget.
+
+Usage: python scripts/import_time.py [--budget robottelo.hosts=2.5] [--top 15]
+"""
+
+import ast
+from pathlib import Path
+import sys
+
+import click
+
+from robottelo.utils.lazy_import import measure_import_time
+
+ROOT = Path(__file__).resolve().parent.parent
+# cold import budgets in seconds
+DEFAULT_BUDGETS = {
+    'robottelo.config': 1.0,
+    'robottelo.hosts': 2.5,
+    'pytest_plugins': 3.5,
+}
+
+
+def plugin_modules():
+    """Return the pytest_plugins.* modules registered in conftest.py"""
+    tree = ast.parse(ROOT.joinpath('conftest.py').read_text())
+    plugins = next(
+        node.value
+        for node in tree.body
+        if isinstance(node, ast.Assign) and node.targets[0].id == 'pytest_plugins'
+    )
+    return [
+        element.value for element in plugins.elts if element.value.startswith('pytest_plugins.')
+    ]
+
+
+@click.command()
+@click.option(
+    '--budget',
+    'budgets',
+    multiple=True,
+    help='Override a budget, as target=seconds. Targets: ' + ', '.join(DEFAULT_BUDGETS),
+)
+@click.option('--top', default=10, help='Number of slowest modules to show per target.')
+def main(budgets, top):
+    budgets = DEFAULT_BUDGETS | {
+        target: float(seconds) for target, seconds in (budget.split('=') for budget in budgets)
+    }
+    failed = False
+    for target, budget in budgets.items():
+        modules = plugin_modules() if target == 'pytest_plugins' else [target]
+        total, imported = measure_import_time(*modules, cwd=ROOT)
+        status = 'OK' if total <= budget else 'OVER BUDGET'
+        failed |= total > budget
+        click.echo(f'{target}: {total:.3f}s (budget {budget:.3f}s) {status}')
+        for name, self_time, cumulative, _ in sorted(imported, key=lambda e: -e[1])[:top]:
+            click.echo(f'    {name:<60} self {self_time:.3f}s cumulative {cumulative:.3f}s')
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+# /// script
+# requires-python = ">=3.11"
+# dependencies = [
+#     "click",
+# ]
+# ///
+"""Index the operation records of a test run and find where its time went.
+
+The tests write one JSON record per hammer command, ssh command, API request, fixture
+setup and test phase to logs/operations*.jsonl, ``index`` loads them in a SQLite database.
+The files are emptied when a test run starts, index them and keep the database of a run to
+compare the next run with it.
+
+Usage:
+    python scripts/log_query.py index
+    python scripts/log_query.py top --limit 20 --type hammer [--grouped]
+    python scripts/log_query.py tests
+    python scripts/log_query.py test tests/foreman/cli/test_host.py::test_positive_create
+    python scripts/log_query.py fixtures
+    python scripts/log_query.py compare previous_run.db
+"""
+
+import click
+
+from robottelo.logging import robottelo_log_dir
+from robottelo.utils import log_store
+
+DEFAULT_DATABASE = robottelo_log_dir.joinpath('operations.db')
+
+
+def echo_rows(rows):
+    """Print the rows as a table, durations with millisecond precision"""
+    if not rows:
+        click.echo('No records')
+        return
+    columns = rows[0].keys()
+    cells = [
+        [f'{value:.3f}' if isinstance(value, float) else str(value) for value in row]
+        for row in rows
+    ]
+    widths = [max(len(column), *(len(row[i]) for row in cells)) for i, column in enumerate(columns)]
+    click.echo(
+        '  '.join(column.ljust(width) for column, width in zip(columns, widths, strict=True))
+    )
+    for row in cells:
+        click.echo('  '.join(cell.ljust(width) for cell, width in zip(row, widths, strict=True)))
+
+
+@click.group()
+@click.option(
+    '--db',
+    'database',
+    type=click.Path(dir_okay=False),
+    default=str(DEFAULT_DATABASE),
+    show_default=True,
+    help='SQLite database of the indexed records.',
+)
+@click.pass_context
+def cli(ctx, database):
+    ctx.obj = database
+
+
+@cli.command()
+@click.argument('paths', nargs=-1, type=click.Path(exists=True, dir_okay=False))
+@click.pass_obj
+def index(database, paths):
+    """Load the records of PATHS, logs/operations*.jsonl by default, in a new database."""
+    paths = paths or sorted(robottelo_log_dir.glob('operations*.jsonl'))
+    count = log_store.index_logs(paths, database)
+    click.echo(f'Indexed {count} records of {len(paths)} files in {database}')
+
+
+@cli.command()
+@click.option('--limit', default=20, show_default=True)
+@click.option('--type', 'op_type', type=click.Choice(log_store.OPERATION_TYPES))
+@click.option('--grouped', is_flag=True, help='Total time by operation instead of each call.')
+@click.pass_obj
+def top(database, limit, op_type, grouped):
+    """Show the slowest hammer, ssh and API operations."""
+    echo_rows(log_store.top_operations(log_store.connect(database), limit, op_type, grouped))
+
+
+@cli.command()
+@click.option('--limit', default=20, show_default=True)
+@click.pass_obj
+def tests(database, limit):
+    """Show the slowest tests with the time of their phases."""
+    echo_rows(log_store.slowest_tests(log_store.connect(database), limit))
+
+
+@cli.command()
+@click.argument('nodeid')
+@click.pass_obj
+def test(database, nodeid):
+    """Show the time of the phases, fixtures and operations of the test NODEID."""
+    echo_rows(log_store.time_breakdown(log_store.connect(database), nodeid))
+
+
+@cli.command()
+@click.option('--limit', default=20, show_default=True)
+@click.pass_obj
+def fixtures(database, limit):
+    """Show the fixtures with the largest total setup time."""
+    echo_rows(log_store.fixture_times(log_store.connect(database), limit))
+
+
+@cli.command()
+@click.argument('previous', type=click.Path(exists=True, dir_okay=False))
+@click.option('--limit', default=20, show_default=True)
+@click.option(
+    '--type', 'op_type', type=click.Choice(('test', 'fixture', *log_store.OPERATION_TYPES))
+)
+@click.pass_obj
+def compare(database, previous, limit, op_type):
+    """Show the largest regressions since the run indexed in the PREVIOUS database."""
+    echo_rows(log_store.compare(log_store.connect(database), previous, limit, op_type))
+
+
+if __name__ == '__main__':
+    cli()
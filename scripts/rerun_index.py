@@ -0,0 +1,48 @@
+# /// script
+# requires-python = ">=3.11"
+# dependencies = [
+#     "click",
+#     "requests",
+# ]
+# ///
+"""Export the rerun index of a Report Portal launch, read by pytest --rp-rerun-index.
+
+Usage:
+    python scripts/rerun_index.py --launch-uuid bd4bc4ba-1d6f-465e-87d8-086c0b6352d5
+    pytest tests/foreman --only-failed --rp-rerun-index rerun_index.json.gz
+"""
+
+from collections import Counter
+
+import click
+
+from robottelo.utils.report_portal.portal import ReportPortal
+from robottelo.utils.report_portal.rerun_index import build_rerun_index, write_rerun_index
+
+
+@click.command()
+@click.option('--launch-uuid', required=True, help='UUID of the reference launch.')
+@click.option(
+    '--output',
+    type=click.Path(dir_okay=False),
+    default='rerun_index.json.gz',
+    show_default=True,
+    help='Path of the rerun index.',
+)
+def main(launch_uuid, output):
+    """Write the status and defect type of every test of the launch to the rerun index."""
+    rp = ReportPortal()
+    launches = rp.get_launches(uuid=launch_uuid)
+    if not launches:
+        raise click.ClickException(f'Launch {launch_uuid} was not found or is not finished')
+    launch = launches[0]
+    index = build_rerun_index(launch, rp.get_tests(launch=launch))
+    write_rerun_index(index, output)
+    statuses = Counter(status for status, _ in index['tests'].values())
+    click.echo(f'Wrote {len(index["tests"])} tests of launch {launch["name"]} to {output}')
+    for status, count in statuses.most_common():
+        click.echo(f'  {status}: {count}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+# /// script
+# requires-python = ">=3.11"
+# dependencies = [
+#     "click",
+#     "requests",
+# ]
+# ///
+"""Benchmark the per-test UI setup time with and without the UI session pool.
+
+The Satellite web UI is replaced by a local server of static pages: the login form, the
+login itself and the landing page. A stand-in browser session fetches them with requests,
+like an airgun session logging in. Browser startup can be modelled with --startup.
+
+Usage: python scripts/ui_session_pool_bench.py --tests 50 --startup 2.0
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import statistics
+import threading
+import time
+
+import click
+import requests
+
+from robottelo.utils.ui_session_pool import UISessionKey, UISessionPool
+
+PAGES = {
+    '/users/login': b'<form method="post"><input name="login[login]"></form>',
+    '/': b'<html><body><div id="dashboard">Overview</div></body></html>',
+}
+
+
+class StaticPages(BaseHTTPRequestHandler):
+    def do_GET(self):
+        logged_in = 'session=ok' in self.headers.get('Cookie', '')
+        path = self.path if logged_in else '/users/login'
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(PAGES[path])))
+        self.end_headers()
+        self.wfile.write(PAGES[path])
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers['Content-Length']))
+        self.send_response(302)
+        self.send_header('Set-Cookie', 'session=ok; Path=/')
+        self.send_header('Location', '/')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class StandInSession:
+    """Browser session logging in to the static pages"""
+
+    def __init__(self, url, startup):
+        time.sleep(startup)
+        self.url = url
+        self.browser = requests.Session()
+        self.browser.get(f'{url}/users/login').raise_for_status()
+        self.browser.post(
+            f'{url}/users/login', data={'login[login]': 'admin', 'login[password]': 'changeme'}
+        ).raise_for_status()
+
+    def landing_page(self):
+        page = self.browser.get(f'{self.url}/')
+        page.raise_for_status()
+        assert b'dashboard' in page.content, 'not logged in'
+
+    def close(self):
+        self.browser.close()
+
+
+def _summary(values):
+    values = sorted(values)
+    p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+    return (
+        f'mean={statistics.mean(values):.3f}s median={statistics.median(values):.3f}s '
+        f'p95={p95:.3f}s total={sum(values):.2f}s'
+    )
+
+
+@click.command()
+@click.option('--tests', type=int, default=50, show_default=True, help='Number of UI tests.')
+@click.option(
+    '--startup',
+    type=float,
+    default=0.0,
+    show_default=True,
+    help='Seconds added to each session start, to model the browser startup.',
+)
+@click.option('--users', type=int, default=1, show_default=True, help='Users the tests log in as.')
+def main(tests, startup, users):
+    """Report the UI setup time of each test, with a new session per test and with the pool."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StaticPages)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_port}'
+
+    def start(key, password, testname):
+        session = StandInSession(url, startup)
+        session.landing_page()
+        return session
+
+    def run(use_pool):
+        pool = UISessionPool(
+            start,
+            lambda session, key: session.landing_page(),
+            lambda session: session.close(),
+            size=users,
+        )
+        setup_times = []
+        for index in range(tests):
+            key = UISessionKey('127.0.0.1', f'user{index % users}')
+            started = time.perf_counter()
+            session = pool.lease(key, 'changeme') if use_pool else start(key, 'changeme', None)
+            setup_times.append(time.perf_counter() - started)
+            # the test itself
+            session.landing_page()
+            if use_pool:
+                pool.release(session)
+            else:
+                session.close()
+        pool.close()
+        return setup_times, pool
+
+    without_pool, _ = run(use_pool=False)
+    with_pool, pool = run(use_pool=True)
+    server.shutdown()
+    click.echo(f'UI setup per test, {tests} tests, {users} users, startup {startup}s:')
+    click.echo(f'  new session per test: {_summary(without_pool)}')
+    click.echo(f'  session pool:         {_summary(with_pool)}')
+    click.echo(f'  pool sessions created: {pool.created}, reused: {pool.reused}')
+    click.echo(f'  speedup: {sum(without_pool) / sum(with_pool):.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+# /// script
+# requires-python = ">=3.11"
+# dependencies = [
+#     "click",
+#     "pytest",
+# ]
+# ///
+"""Benchmark the upstream PR test selection on a synthetic PR, without network.
+
+A synthetic PR modifying --files files is mapped to components by --rules rules, and
+--items collected test items are selected by their component markers. Each step is timed
+the way the plugin did it before (each rule against each file, the markers of each item)
+and with the precompiled rules and the component index. The PR file list is fetched from a
+stand-in GitHub PR, which waits --latency seconds per page of 100 files, without and with
+the head commit cache.
+
+Usage: python scripts/upstream_pr_bench.py --files 3000 --items 20000
+"""
+
+from pathlib import Path
+import random
+import tempfile
+import time
+from types import SimpleNamespace
+
+import click
+import pytest
+
+from pytest_plugins.upstream_pr import (
+    RuleMatcher,
+    build_component_index,
+    component_match,
+    get_pr_filenames,
+    match_file_to_rule,
+)
+
+DIRECTORIES = ('app/controllers', 'app/models', 'app/views', 'lib', 'test', 'db/migrate')
+
+
+class StandInPR:
+    """GitHub PR listing its files one page of 100 files at a time"""
+
+    def __init__(self, filenames, latency):
+        self.number = 1
+        self.head = SimpleNamespace(sha='0123456789abcdef')
+        self.filenames = filenames
+        self.latency = latency
+
+    def get_files(self):
+        for index, filename in enumerate(self.filenames):
+            if index % 100 == 0:
+                time.sleep(self.latency)
+            yield SimpleNamespace(filename=filename)
+
+
+class StandInItem:
+    def __init__(self, index, components, base_marker):
+        self.nodeid = f'tests/foreman/api/test_module{index // 50}.py::test_positive_{index}'
+        self.markers = [pytest.mark.component(random.choice(components)).mark]
+        self.markers.append(pytest.mark.tier2.mark)
+        if base_marker and index % 2:
+            self.markers.append(getattr(pytest.mark, base_marker).mark)
+
+    def iter_markers(self):
+        return iter(self.markers)
+
+
+def old_map_files(rules, filenames):
+    """Map the files to components, each rule in turn against the remaining files"""
+    components = set()
+    unprocessed = set(filenames)
+    for rule in rules:
+        matched = {filename for filename in unprocessed if match_file_to_rule(filename, rule)}
+        if matched:
+            components.add(rule.component.lower())
+            unprocessed.difference_update(matched)
+    return components
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+@click.command()
+@click.option('--files', type=int, default=3000, show_default=True, help='Files of the PR.')
+@click.option('--items', type=int, default=20000, show_default=True, help='Collected tests.')
+@click.option('--rules', type=int, default=60, show_default=True, help='Component rules.')
+@click.option('--latency', type=float, default=0.2, show_default=True, help='Seconds per page.')
+@click.option('--base-marker', default='e2e', show_default=True)
+@click.option('--seed', type=int, default=0, show_default=True)
+def main(files, items, rules, latency, base_marker, seed):
+    """Report the time of each step of the upstream PR test selection."""
+    random.seed(seed)
+    components = [f'component{index}' for index in range(rules)]
+    rule_list = [
+        SimpleNamespace(path=f'{directory}/{component}(_|/)', component=component)
+        for component, directory in zip(
+            components, random.choices(DIRECTORIES, k=rules), strict=True
+        )
+    ]
+    filenames = [
+        f'{random.choice(DIRECTORIES)}/{random.choice(components)}/file{index}.rb'
+        for index in range(files)
+    ]
+    collected = [StandInItem(index, components, base_marker) for index in range(items)]
+
+    pr = StandInPR(filenames, latency)
+    github_repo = SimpleNamespace(full_name='theforeman/foreman')
+    with tempfile.TemporaryDirectory() as cache_dir:
+        _, fetch_time = timed(get_pr_filenames, github_repo, pr, None)
+        get_pr_filenames(github_repo, pr, Path(cache_dir))
+        _, cached_fetch_time = timed(get_pr_filenames, github_repo, pr, Path(cache_dir))
+
+    old_components, old_match_time = timed(old_map_files, rule_list, filenames)
+    matcher, compile_time = timed(RuleMatcher, rule_list)
+    (matched, _), match_time = timed(matcher.map_files, filenames)
+    new_components = {component.lower() for _, component in matched}
+    assert new_components == old_components, 'the rule matchers disagree'
+
+    selected_components = set(random.sample(components, k=max(1, rules // 10)))
+    old_selected, old_select_time = timed(
+        lambda: [i for i in collected if component_match(i, selected_components, base_marker)]
+    )
+    index, index_time = timed(build_component_index, collected, base_marker)
+
+    def select():
+        positions = {p for component in selected_components for p in index.get(component, ())}
+        return [item for position, item in enumerate(collected) if position in positions]
+
+    new_selected, select_time = timed(select)
+    assert new_selected == old_selected, 'the item selections disagree'
+
+    click.echo(f'{files} files, {rules} rules, {items} items, {len(new_selected)} selected:')
+    click.echo(f'  PR files fetch:       {fetch_time:.3f}s, from cache {cached_fetch_time:.3f}s')
+    click.echo(
+        f'  files to components:  {old_match_time:.3f}s, '
+        f'precompiled {compile_time + match_time:.3f}s'
+    )
+    click.echo(
+        f'  item selection:       {old_select_time:.3f}s, '
+        f'index {index_time:.3f}s + lookup {select_time:.3f}s'
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+# /// script
+# requires-python = ">=3.11"
+# dependencies = [
+#     "click",
+# ]
+# ///
+"""Benchmark virt-who hypervisor report uploads to /rhsm/hypervisors.
+
+Usage: python scripts/virtwho_scale_bench.py ORG_LABEL --hypervisors 10000 --guests 50
+"""
+
+import statistics
+
+import click
+
+from robottelo.utils.virtwho import upload_hypervisor_reports
+
+
+def _summary(values):
+    """Return min/median/p95/max of the values as a formatted string."""
+    if not values:
+        return 'n/a'
+    values = sorted(values)
+    p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+    return (
+        f'min={values[0]:.2f}s median={statistics.median(values):.2f}s '
+        f'p95={p95:.2f}s max={values[-1]:.2f}s'
+    )
+
+
+@click.command()
+@click.argument('org_label')
+@click.option('--hypervisors', type=int, default=10000, show_default=True)
+@click.option('--guests', type=int, default=50, show_default=True, help='Guests per hypervisor.')
+@click.option('--batch-size', type=int, default=1000, show_default=True)
+@click.option('--concurrency', type=int, default=1, show_default=True)
+@click.option('--seed', default=None, help='Seed for reproducible hypervisor and guest uuids.')
+@click.option('--no-wait', is_flag=True, help='Do not wait for the processing tasks.')
+def main(org_label, hypervisors, guests, batch_size, concurrency, seed, no_wait):
+    """Upload fake hypervisor reports for ORG_LABEL and report acceptance/processing times."""
+    results = upload_hypervisor_reports(
+        org_label,
+        hypervisors,
+        guests,
+        batch_size=batch_size,
+        concurrency=concurrency,
+        seed=seed,
+        wait_for_task=not no_wait,
+    )
+    for stats in results:
+        click.echo(
+            f"batch {stats['batch']}: hypervisors={stats['hypervisors']} "
+            f"status={stats['status_code']} accept={stats['accept_time']:.2f}s "
+            f"task={stats['task_id']} result={stats['task_result']} "
+            f"process={stats['process_time']}"
+        )
+    failed = [stats for stats in results if stats['status_code'] != 200]
+    click.echo(f'accepted: {len(results) - len(failed)}/{len(results)} reports')
+    click.echo(f"acceptance latency: {_summary([s['accept_time'] for s in results])}")
+    click.echo(
+        'task processing time: '
+        f"{_summary([s['process_time'] for s in results if s['process_time'] is not None])}"
+    )
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
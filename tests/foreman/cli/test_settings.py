@@ -28,7 +28,6 @@ from robottelo.utils.datafactory import (
     valid_data_list,
     valid_emails_list,
     valid_url_list,
-    xdist_adapter,
 )
 
 
@@ -405,7 +404,7 @@ def test_positive_update_rssfeed_url(setting_update, module_target_sat):
     assert updated_url['value'] == test_url
 
 
-@pytest.mark.parametrize('value', **xdist_adapter(invalid_boolean_strings()))
+@pytest.mark.parametrize('value', invalid_boolean_strings())
 def test_negative_update_send_welcome_email(value, module_target_sat):
     """Check email send welcome email is updated
 
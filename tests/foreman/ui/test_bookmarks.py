@@ -25,7 +25,7 @@ from robottelo.constants import BOOKMARK_ENTITIES_SELECTION
     params=BOOKMARK_ENTITIES_SELECTION,
     ids=(i['name'] for i in BOOKMARK_ENTITIES_SELECTION),
 )
-def ui_entity(module_org, module_location, request):
+def ui_entity(module_target_sat, module_org, module_location, request):
     """Collects the list of all applicable UI entities for testing and does all
     required preconditions.
     """
@@ -39,6 +39,7 @@ def ui_entity(module_org, module_location, request):
     # Some pages require at least 1 existing entity for search bar to
     # appear. Creating 1 entity for such pages
     if entity_setup:
+        entity_setup = getattr(module_target_sat.api, entity_setup)
         # entities with 1 organization and location
         if entity_name in ('Host',):
             entity_setup(organization=module_org, location=module_location).create()
@@ -0,0 +1,93 @@
+"""Tests for ``robottelo.host_helpers.bulk`` and the make_many factory methods."""
+
+import itertools
+import re
+import threading
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+
+from robottelo.cli.base import Base
+from robottelo.exceptions import CLIFactoryError, CLIReturnCodeError
+from robottelo.host_helpers.api_factory import APIFactory
+from robottelo.host_helpers.bulk import bulk_overrides, run_bulk
+from robottelo.host_helpers.cli_factory import CLIFactory
+
+
+class HostCollection(Base):
+    command_base = 'host-collection'
+    ids = itertools.count(1)
+    commands = []
+
+    @classmethod
+    def execute(cls, command, **kwargs):
+        cls.commands.append(command)
+        sub = command.split()[1]
+        # give the other threads the time to run their own subcommands
+        time.sleep(0.05)
+        assert cls.command_sub == sub, 'the subcommand was changed by another thread'
+        if 'fail' in command:
+            raise CLIReturnCodeError(1, 'failed', 'failed')
+        if sub == 'create':
+            return [{'id': next(cls.ids)}]
+        assert sub == 'info', command
+        entity_id = re.search(r'--id="(\d+)"', command)[1]
+        return f'Id: {entity_id}'
+
+
+def test_bulk_overrides():
+    assert bulk_overrides(2, {'a': 1}) == [{'a': 1}, {'a': 1}]
+    assert bulk_overrides(overrides=[{'a': 1}, {'a': 2}]) == [{'a': 1}, {'a': 2}]
+    with pytest.raises(ValueError, match='does not match'):
+        bulk_overrides(3, [{'a': 1}])
+    with pytest.raises(ValueError, match='count is required'):
+        bulk_overrides()
+
+
+def test_run_bulk_keeps_order_and_errors():
+    barrier = threading.Barrier(4, timeout=5)
+
+    def call(index):
+        barrier.wait()
+        if index == 2:
+            raise RuntimeError('boom')
+        return index
+
+    result = run_bulk([lambda index=index: call(index) for index in range(4)], max_workers=4)
+    assert result == [0, 1, None, 3]
+    assert result.created == [0, 1, 3]
+    assert list(result.errors) == [2]
+    with pytest.raises(ExceptionGroup, match='1 of 4 items failed') as error:
+        result.raise_errors()
+    assert error.value.exceptions[0].__notes__ == ['item 2']
+
+
+def test_cli_make_many():
+    factory = CLIFactory(SimpleNamespace(cli=SimpleNamespace(HostCollection=HostCollection)))
+    HostCollection.commands.clear()
+    start = time.time()
+    result = factory.make_many(
+        'host_collection', 8, overrides={'organization-id': 1}, max_workers=8
+    )
+    # every create runs its own info while the other creates run concurrently
+    assert time.time() - start < 8 * 2 * 0.05
+    assert not result.errors
+    assert len({host_collection.id for host_collection in result}) == 8
+    creates = [command for command in HostCollection.commands if ' create ' in command]
+    assert len(creates) == 8
+    # the default data is generated for each entity
+    assert len({re.search(r'--name="(\w+)"', command)[1] for command in creates}) == 8
+    result = factory.make_many('host_collection', overrides=[{'name': 'ok'}, {'name': 'fail'}])
+    assert result[0].id
+    assert isinstance(result.errors[1], CLIFactoryError)
+
+
+def test_api_make_many():
+    satellite = mock.MagicMock()
+    satellite.api.HostCollection.side_effect = lambda **fields: mock.MagicMock(fields=fields)
+    result = APIFactory(satellite).make_many('HostCollection', 3, overrides={'organization': 1})
+    assert len(result) == 3
+    assert satellite.api.HostCollection.call_count == 3
+    assert satellite.api.HostCollection.call_args.kwargs == {'organization': 1}
@@ -0,0 +1,231 @@
+"""Tests for the hammer command and API request cassettes of ``robottelo.utils.cassettes``."""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import random
+import threading
+from types import SimpleNamespace
+from unittest import mock
+
+from broker.helpers import Result
+import pytest
+import requests
+
+from pytest_plugins import cassettes as cassettes_plugin
+from robottelo.cli.base import Base
+from robottelo.exceptions import CassetteMismatchError
+from robottelo.utils import cassettes
+
+NODEID = 'tests/foreman/cli/test_organization.py::test_positive_create[name]'
+OUTPUTS = {
+    'list': 'Id,Title,Name\n1,Default Organization,Default Organization\n',
+    'info': 'Id:    1\nName:  Default Organization\nLocations:\n    Default Location\n',
+}
+
+
+class Organization(Base):
+    command_base = 'organization'
+    hostname = 'sat.example.com'
+
+
+@pytest.fixture(autouse=True)
+def stop_cassette():
+    yield
+    cassettes.stop_cassette()
+    cassettes.stop_api_call_stats()
+
+
+class FakeClient:
+    def __init__(self):
+        self.commands = []
+
+    def execute(self, cmd, **kwargs):
+        self.commands.append(cmd)
+        sub = 'list' if ' list ' in cmd else 'info'
+        return Result(stdout=OUTPUTS[sub], stderr='', status=0)
+
+
+def record(cassette_dir):
+    cassettes.start_cassette(cassette_dir, NODEID, 'record')
+    client = FakeClient()
+    with mock.patch('robottelo.ssh.get_client', return_value=client):
+        organizations = Organization.list()
+        Organization.info({'id': 1})
+        Organization.list()
+    cassette = cassettes.stop_cassette()
+    return organizations, client, cassette
+
+
+def test_commands_are_recorded_without_credentials(tmp_path):
+    organizations, client, cassette = record(tmp_path)
+    assert organizations == [
+        {'id': '1', 'title': 'Default Organization', 'name': 'Default Organization'}
+    ]
+    assert (
+        cassette.path
+        == tmp_path / 'tests/foreman/cli/test_organization/test_positive_create_name_.json'
+    )
+    entries = json.loads(cassette.path.read_text())['entries']
+    assert [entry['command_sub'] for entry in entries] == ['list', 'info', 'list']
+    assert entries[0]['output_format'] == 'csv'
+    assert entries[0]['stdout'] == OUTPUTS['list']
+    assert all(entry['duration'] >= 0 for entry in entries)
+    assert ' -p ' in client.commands[0]
+    assert ' -p ' not in cassette.path.read_text()
+
+
+def test_commands_are_replayed_without_ssh(tmp_path):
+    recorded, _, _ = record(tmp_path)
+    cassette = cassettes.start_cassette(tmp_path, NODEID, 'replay')
+    with mock.patch('robottelo.ssh.get_client', side_effect=AssertionError('ssh was used')):
+        assert Organization.list() == recorded
+        # the info output goes through parse_info, like the live one
+        assert Organization.info({'id': 1}) == {
+            'id': '1',
+            'name': 'Default Organization',
+            'locations': ['Default Location'],
+        }
+        assert cassette.unused[0]['command_sub'] == 'list'
+        assert Organization.list() == recorded
+    assert not cassette.unused
+
+
+def run_protocol(tmp_path, nodeid, mode):
+    """Run the cassettes hook of the test nodeid, return the random numbers of the test"""
+    options = {'cassette_mode': mode, 'cassette_dir': tmp_path, 'api_call_report': None}
+    item = SimpleNamespace(
+        nodeid=nodeid, config=SimpleNamespace(getoption=lambda name, default=None: options[name])
+    )
+    hook = cassettes_plugin.pytest_runtest_protocol(item, None)
+    next(hook)
+    numbers = [random.random() for _ in range(3)]
+    with pytest.raises(StopIteration):
+        next(hook)
+    return numbers
+
+
+def test_random_is_seeded_per_test(tmp_path):
+    """The random names of a test are the same in record and replay, in any test order"""
+    state = random.getstate()
+    recorded = run_protocol(tmp_path, NODEID, 'record')
+    assert random.getstate() == state
+    other = run_protocol(tmp_path, f'{NODEID}_other', 'record')
+    random.random()
+    assert run_protocol(tmp_path, NODEID, 'replay') == recorded
+    assert other != recorded
+
+
+def test_unmatched_commands_raise(tmp_path):
+    record(tmp_path)
+    cassette = cassettes.start_cassette(tmp_path, NODEID, 'replay')
+    with pytest.raises(CassetteMismatchError, match='organization info --id="2"'):
+        Organization.info({'id': 2})
+    # the output format is part of the match
+    with pytest.raises(CassetteMismatchError):
+        Organization.info({'id': 1}, output_format='json')
+    assert [request['command'].split()[-1] for request in cassette.unmatched] == [
+        '--id="2"',
+        '--id="1"',
+    ]
+    assert len(cassette.unused) == 3
+    # a test without a cassette can not replay anything
+    cassettes.start_cassette(tmp_path, f'{NODEID}x', 'replay')
+    with pytest.raises(CassetteMismatchError):
+        Organization.list()
+
+
+class SatelliteAPIStandIn(BaseHTTPRequestHandler):
+    requests = 0
+
+    def do_GET(self):
+        SatelliteAPIStandIn.requests += 1
+        body = json.dumps({'id': 5, 'name': 'host.example.com', 'path': self.path}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Set-Cookie', '_session_id=secret')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        SatelliteAPIStandIn.requests += 1
+        self.rfile.read(int(self.headers['Content-Length']))
+        self.send_response(422)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def api_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SatelliteAPIStandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_port}/api'
+    server.shutdown()
+
+
+def send_requests(api_url):
+    """Requests as nailgun.client sends them: create a host, then read it twice"""
+    kwargs = {'auth': ('admin', 'changeme'), 'verify': False}
+    responses = []
+    for method, url, args in (
+        ('post', f'{api_url}/hosts', ({'host': {'name': 'host'}},)),
+        ('get', f'{api_url}/hosts/5', ()),
+        ('get', f'{api_url}/hosts/5', ()),
+    ):
+        responses.append(
+            cassettes.api_request(
+                method,
+                url,
+                args,
+                kwargs,
+                lambda method=method, url=url, args=args: getattr(requests, method)(
+                    url, *args, **kwargs
+                ),
+            )
+        )
+    return responses
+
+
+def test_api_requests_are_recorded_and_replayed(api_url, tmp_path):
+    cassettes.start_cassette(tmp_path, NODEID, 'record')
+    recorded = send_requests(api_url)
+    cassette = cassettes.stop_cassette()
+    content = cassette.path.read_text()
+    assert 'changeme' not in content
+    assert '_session_id' not in content
+    entries = json.loads(content)['entries']
+    assert [entry['command'] for entry in entries] == [
+        'POST /api/hosts',
+        'GET /api/hosts/5',
+        'GET /api/hosts/5',
+    ]
+    assert entries[0]['payload_sha256'] != entries[1]['payload_sha256']
+
+    sent = SatelliteAPIStandIn.requests
+    cassette = cassettes.start_cassette(tmp_path, NODEID, 'replay')
+    replayed = send_requests(api_url)
+    assert SatelliteAPIStandIn.requests == sent
+    assert not cassette.unused
+    for live, replay in zip(recorded, replayed, strict=True):
+        assert replay.status_code == live.status_code
+        assert replay.headers.get('content-type') == live.headers.get('content-type')
+        assert replay.content == live.content
+    assert replayed[1].json()['name'] == 'host.example.com'
+    with pytest.raises(requests.HTTPError, match='422'):
+        replayed[0].raise_for_status()
+    # the payload is part of the match
+    with pytest.raises(CassetteMismatchError, match='POST /api/hosts'):
+        cassettes.api_request('post', f'{api_url}/hosts', ({'host': {'name': 'other'}},), {}, None)
+
+
+def test_api_call_stats(api_url):
+    stats = cassettes.start_api_call_stats()
+    send_requests(api_url)
+    summary = stats.summary()
+    assert summary['count'] == 3
+    assert summary['latency'] > 0
+    # the repeated read of the created host stands out
+    assert summary['repeated'] == [('GET /api/hosts/5', 2)]
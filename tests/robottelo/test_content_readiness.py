@@ -0,0 +1,79 @@
+"""Tests for ``CapsuleInfo.wait_for_content_ready`` against a fake task API."""
+
+import re
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from robottelo.exceptions import ContentNotReadyError
+from robottelo.host_helpers.capsule_mixins import CapsuleInfo
+
+
+class FakeTaskAPI:
+    """Tasks finishing the given number of seconds after the API was created"""
+
+    def __init__(self, durations, failed=()):
+        self.start = time.monotonic()
+        self.durations = durations
+        self.failed = failed
+        self.searches = []
+
+    def ForemanTask(self):
+        return self
+
+    def task(self, task_id):
+        finished = time.monotonic() - self.start >= self.durations[task_id]
+        failed = task_id in self.failed
+        return SimpleNamespace(
+            id=task_id,
+            label='Actions::Katello::Repository::Sync',
+            state=('paused' if failed else 'stopped') if finished else 'running',
+            result=('error' if failed else 'success') if finished else 'pending',
+            humanized={'errors': ['404 Not Found'] if failed else []},
+        )
+
+    def search(self, query):
+        task_ids = re.findall(r'id = (\S+)', query['search'])
+        self.searches.append(task_ids)
+        return [self.task(task_id) for task_id in task_ids]
+
+
+def fake_satellite(durations, failed=()):
+    satellite = SimpleNamespace(api=FakeTaskAPI(durations, failed))
+    satellite.satellite = satellite
+    return satellite
+
+
+def test_wait_lasts_as_long_as_the_slowest_task():
+    satellite = fake_satellite({'sync-1': 0.3, 'sync-2': 0.5, 'publish-1': 0.2})
+    tasks = [{'id': 'sync-1'}, {'id': 'sync-2'}, SimpleNamespace(id='publish-1')]
+    start = time.monotonic()
+    durations = CapsuleInfo.wait_for_content_ready(satellite, tasks, timeout=10, poll_rate=0.05)
+    elapsed = time.monotonic() - start
+    # the tasks are watched together, waiting for each in turn would take 1s
+    assert 0.5 <= elapsed < 0.7
+    assert durations.keys() == {'sync-1', 'sync-2', 'publish-1'}
+    assert durations['publish-1'] < durations['sync-1'] < durations['sync-2']
+    assert durations['sync-2'] == pytest.approx(0.5, abs=0.1)
+    # one search per poll, only for the pending tasks
+    assert satellite.api.searches[0] == ['publish-1', 'sync-1', 'sync-2']
+    assert satellite.api.searches[-1] == ['sync-2']
+
+
+def test_first_failure_is_raised_right_away():
+    satellite = fake_satellite({'sync-1': 0.1, 'sync-2': 5}, failed={'sync-1'})
+    start = time.monotonic()
+    with pytest.raises(ContentNotReadyError, match='sync-1 finished with result error') as error:
+        CapsuleInfo.wait_for_content_ready(satellite, ['sync-1', 'sync-2'], poll_rate=0.05)
+    assert time.monotonic() - start < 1
+    assert 'Actions::Katello::Repository::Sync' in str(error.value)
+    assert '404 Not Found' in str(error.value)
+
+
+def test_timeout():
+    satellite = fake_satellite({'sync-1': 0.05, 'sync-2': 5})
+    with pytest.raises(ContentNotReadyError, match='Tasks sync-2 did not finish in 0.2s'):
+        CapsuleInfo.wait_for_content_ready(
+            satellite, ['sync-1', 'sync-2'], timeout=0.2, poll_rate=0.05
+        )
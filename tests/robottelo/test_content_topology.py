@@ -0,0 +1,212 @@
+"""Tests for ``robottelo.host_helpers.content_topology``."""
+
+import threading
+import time
+from unittest import mock
+
+from box import Box
+import pytest
+
+from robottelo.host_helpers.content_topology import (
+    BACKENDS,
+    ActivationKeySpec,
+    ContentTopologyBuilder,
+    ContentViewSpec,
+    ProductSpec,
+    RepoSpec,
+    TopologySpec,
+    run_dag,
+)
+
+
+def test_run_dag_respects_dependencies_and_runs_branches_concurrently():
+    order, barrier = [], threading.Barrier(2, timeout=5)
+
+    def branch(name):
+        barrier.wait()
+        order.append(name)
+
+    steps = {
+        'root': ((), lambda: order.append('root')),
+        'left': (('root',), lambda: branch('left')),
+        'right': (('root',), lambda: branch('right')),
+        'leaf': (('left', 'right'), lambda: order.append('leaf')),
+    }
+    durations = run_dag(steps, max_workers=4)
+    assert order[0] == 'root'
+    assert order[-1] == 'leaf'
+    assert set(durations) == set(steps)
+
+
+def test_run_dag_fails_fast():
+    started = []
+
+    def fail():
+        raise RuntimeError('boom')
+
+    steps = {
+        'fail': ((), fail),
+        'after': (('fail',), lambda: started.append('after')),
+    }
+    with pytest.raises(RuntimeError, match='boom') as error:
+        run_dag(steps)
+    assert 'content topology step "fail" failed' in error.value.__notes__
+    assert not started
+
+
+@pytest.mark.parametrize(
+    ('steps', 'message'),
+    [
+        ({'a': (('missing',), lambda: None)}, 'unknown steps'),
+        ({'a': (('b',), lambda: None), 'b': (('a',), lambda: None)}, 'cyclic dependencies'),
+    ],
+    ids=['unknown', 'cycle'],
+)
+def test_run_dag_invalid_graph(steps, message):
+    with pytest.raises(ValueError, match=message):
+        run_dag(steps)
+
+
+class FakeBackend:
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def _entity(self, kind, name):
+        with self.lock:
+            self.calls.append((kind, name))
+            return Box(id=len(self.calls), name=name)
+
+    def org(self, org):
+        return self._entity('org', 'org')
+
+    def lce(self, org, name, prior):
+        return self._entity('lce', name)
+
+    def product(self, org, spec):
+        return self._entity('product', spec.name)
+
+    def repo(self, org, product, spec):
+        return self._entity('repo', spec.name)
+
+    def rh_repo(self, org, spec):
+        return self._entity('repo', spec.name)
+
+    def start_sync(self, repo):
+        return self._entity('sync', repo.name).id
+
+    def content_view(self, org, spec, repos):
+        return self._entity('cv', spec.name)
+
+    def publish(self, content_view):
+        return self._entity('publish', content_view.name)
+
+    def promote(self, version, lce):
+        self._entity('promote', lce.name)
+
+    def activation_key(self, org, spec, cvenv_id):
+        return self._entity('ak', spec.name)
+
+    def enable_repo(self, ak, repo):
+        self._entity('override', repo.name)
+
+
+@pytest.fixture
+def builder():
+    satellite = mock.MagicMock()
+    satellite.api.ForemanTask.return_value.poll.side_effect = lambda **kwargs: time.sleep(0.2)
+    builder = ContentTopologyBuilder(satellite)
+    builder.backend = FakeBackend()
+    return builder
+
+
+def test_build_topology(builder):
+    spec = TopologySpec(
+        lifecycle_environments=['dev', 'qa'],
+        products=[ProductSpec(name='p', repos=[RepoSpec(name=f'r{i}') for i in range(4)])],
+        rh_repos=[RepoSpec(name='rh', rh={'product': 'p', 'reposet': 's', 'name': 'n'})],
+        content_views=[ContentViewSpec(name='cv', repos=['r0', 'r1', 'r2', 'r3', 'rh'])],
+        activation_keys=[ActivationKeySpec(name='ak', content_view='cv')],
+    )
+    start = time.monotonic()
+    result = builder.build(spec)
+    # the five syncs are watched concurrently
+    assert time.monotonic() - start < 0.2 * 5
+    assert set(result.repositories) == {'r0', 'r1', 'r2', 'r3', 'rh'}
+    assert list(result.lifecycle_environments) == ['dev', 'qa']
+    assert result.activation_keys['ak'].name == 'ak'
+    calls = builder.backend.calls
+    assert calls.index(('publish', 'cv')) > max(
+        i for i, call in enumerate(calls) if call[0] == 'sync'
+    )
+    assert [call for call in calls if call[0] == 'promote'] == [
+        ('promote', 'dev'),
+        ('promote', 'qa'),
+    ]
+    assert len([call for call in calls if call[0] == 'override']) == 5
+    assert 'sync:r0' in result.durations
+
+
+def test_build_topology_unknown_reference(builder):
+    spec = TopologySpec(content_views=[ContentViewSpec(name='cv', repos=['missing'])])
+    with pytest.raises(ValueError, match='unknown repos'):
+        builder.build(spec)
+
+
+def test_build_topology_activation_key_unpublished_content_view(builder):
+    spec = TopologySpec(
+        content_views=[ContentViewSpec(name='cv', publish=False)],
+        activation_keys=[ActivationKeySpec(name='ak', content_view='cv')],
+    )
+    with pytest.raises(ValueError, match='content view cv which is not published'):
+        builder.build(spec)
+
+
+def test_api_backend():
+    satellite = mock.MagicMock()
+    backend = BACKENDS['api'](satellite)
+    org, dev = Box(id=1), Box(id=2, name='dev')
+    backend.lce(org, 'dev', None)
+    satellite.api.LifecycleEnvironment.assert_called_with(organization=org, name='dev')
+    backend.lce(org, 'qa', dev)
+    satellite.api.LifecycleEnvironment.assert_called_with(organization=org, name='qa', prior=dev)
+    backend.repo(org, Box(id=3), RepoSpec(name='zoo', url='http://repo', options={'a': 'b'}))
+    satellite.api.Repository.assert_called_with(
+        product=Box(id=3), name='zoo', url='http://repo', content_type='yum', a='b'
+    )
+    backend.activation_key(org, ActivationKeySpec(name='ak'), 7)
+    satellite.api.ActivationKey.assert_called_with(
+        organization=org, name='ak', content_view_environment_ids=[7]
+    )
+
+
+def test_cli_backend():
+    satellite = mock.MagicMock()
+    backend = BACKENDS['cli'](satellite)
+    org = Box(id=1)
+    make_lce = satellite.cli_factory.make_lifecycle_environment
+    # the first environment of the path follows Library
+    backend.lce(org, 'dev', None)
+    make_lce.assert_called_with({'organization-id': 1, 'name': 'dev', 'prior': 'Library'})
+    backend.lce(org, 'qa', Box(id=2, name='dev'))
+    make_lce.assert_called_with({'organization-id': 1, 'name': 'qa', 'prior': 'dev'})
+    backend.repo(org, Box(id=3), RepoSpec(name='zoo', url='http://repo'))
+    satellite.cli_factory.make_repository.assert_called_with(
+        {
+            'organization-id': 1,
+            'product-id': 3,
+            'name': 'zoo',
+            'url': 'http://repo',
+            'content-type': 'yum',
+        }
+    )
+    satellite.cli_factory.make_content_view.return_value = Box(id=4)
+    backend.content_view(org, ContentViewSpec(name='cv'), [Box(id=5), Box(id=6)])
+    assert satellite.cli.ContentView.add_repository.call_args_list == [
+        mock.call({'id': 4, 'organization-id': 1, 'repository-id': 5}),
+        mock.call({'id': 4, 'organization-id': 1, 'repository-id': 6}),
+    ]
+    backend.activation_key(org, ActivationKeySpec(name='ak'), 7)
+    satellite.cli_factory.make_activation_key.assert_called_with(
+        {'organization-id': 1, 'name': 'ak', 'content-view-environment-ids': 7}
+    )
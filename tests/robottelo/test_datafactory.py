@@ -153,3 +153,61 @@ class TestInvalidValuesList:
         # Test invalid value
         with pytest.raises(datafactory.InvalidArgumentError):
             datafactory.invalid_values_list('invalid')
+
+
+class TestSeededCorpus:
+    """Tests for :meth:`robottelo.datafactory.start_corpus`"""
+
+    @pytest.fixture
+    def corpus(self):
+        yield datafactory.start_corpus
+        datafactory.stop_corpus()
+
+    def test_same_seed_same_datasets(self, corpus):
+        """Workers sharing the seed generate the same datasets, whatever the call order"""
+        corpus('seed')
+        names = datafactory.valid_names_list()
+        strings = datafactory.generate_strings_list(length=10)
+        credentials = datafactory.valid_http_credentials(url_encoded=True)
+        corpus('seed')
+        assert datafactory.generate_strings_list(length=10) == strings
+        assert datafactory.valid_http_credentials(url_encoded=True) == credentials
+        assert datafactory.valid_names_list() == names
+        corpus('other seed')
+        assert datafactory.valid_names_list() != names
+        datafactory.stop_corpus()
+        assert datafactory.valid_names_list() != names
+
+    def test_datasets_are_memoized(self, corpus):
+        """Datasets are generated once per arguments, callers get their own copy"""
+        calls = []
+
+        @datafactory.filtered_datapoint
+        def dataset(length=5):
+            calls.append(length)
+            return [datafactory.gen_string('alpha', length)]
+
+        corpus('seed')
+        first = dataset()
+        first.append('changed')
+        assert dataset() == first[:1]
+        dataset(length=6)
+        assert calls == [5, 6]
+
+    def test_corpus_does_not_change_random_state(self, corpus):
+        corpus('seed')
+        state = random.getstate()
+        datafactory.valid_data_list()
+        assert random.getstate() == state
+
+
+def test_seeded_random():
+    """The same key and seed give the same values, without a corpus"""
+    state = random.getstate()
+    with datafactory.seeded_random('key', 'seed'):
+        values = [random.random() for _ in range(3)]
+    assert random.getstate() == state
+    with datafactory.seeded_random('key', 'seed'):
+        assert [random.random() for _ in range(3)] == values
+    with datafactory.seeded_random('other key', 'seed'):
+        assert [random.random() for _ in range(3)] != values
@@ -0,0 +1,81 @@
+"""Tests for the fixture index of ``pytest_plugins.fixture_index`` and its selectors."""
+
+import importlib
+from types import SimpleNamespace
+
+import pytest
+
+from pytest_plugins.fixture_index import FixtureIndex, get_fixture_index, index_fixtures
+
+n_minus = importlib.import_module('pytest_plugins.capsule_n-minus')
+
+
+class StandInItem:
+    def __init__(self, name, fixturenames, params=None, markers=()):
+        self.nodeid = f'tests/foreman/maintain/test_module.py::{name}'
+        self.fixturenames = fixturenames
+        if params is not None:
+            self.callspec = SimpleNamespace(params=params)
+        self.markers = markers
+
+    def get_closest_marker(self, name):
+        return name if name in self.markers else None
+
+    def __repr__(self):
+        return self.nodeid
+
+
+ITEMS = [
+    StandInItem('test_capsule_factory', ['capsule_factory', 'request']),
+    StandInItem('test_maintain[capsule]', ['sat_maintain'], {'sat_maintain': 'capsule'}),
+    StandInItem('test_maintain[satellite]', ['sat_maintain'], {'sat_maintain': 'satellite'}),
+    StandInItem('test_destructive', ['capsule_factory'], markers=('destructive',)),
+    StandInItem('test_puppet', ['capsule_factory', 'session_puppet_enabled_sat']),
+    StandInItem('test_host[rhel9]', ['rhel_contenthost'], {'rhel_contenthost': {'rhel': 9}}),
+    StandInItem('test_unrelated', ['target_sat'], {'name': 'capsule'}),
+]
+
+
+def ids(*positions):
+    return {id(ITEMS[position]) for position in positions}
+
+
+def test_fixture_index_queries():
+    index = FixtureIndex(ITEMS)
+    assert index.with_fixture('capsule_factory') == ids(0, 3, 4)
+    assert index.with_fixture('sat_maintain', 'rhel_contenthost') == ids(1, 2, 5)
+    assert index.with_fixture('missing') == set()
+    assert index.with_param('capsule') == ids(1, 6)
+    assert index.with_param('capsule', among=index.with_fixture('sat_maintain')) == ids(1)
+    # the result is a copy, the index is left untouched
+    index.with_fixture('capsule_factory').clear()
+    assert index.with_fixture('capsule_factory')
+
+
+def stand_in_session():
+    return SimpleNamespace(stash=pytest.Stash(), config=SimpleNamespace(stash=pytest.Stash()))
+
+
+def test_index_is_shared_by_the_selectors():
+    session = stand_in_session()
+    index_fixtures(session.config, ['sat_maintain'])
+    index_fixtures(session.config, ['capsule_factory', 'setup_fam'])
+    index = get_fixture_index(session, ITEMS)
+    # the registered fixtures are indexed in the first pass
+    assert set(index.by_fixture) == {'sat_maintain', 'capsule_factory', 'setup_fam'}
+    # a later selector querying the items left by an earlier one reuses the index
+    assert get_fixture_index(session, ITEMS[:3]) is index
+    assert get_fixture_index(session, [*ITEMS, StandInItem('test_new', [])]) is not index
+
+
+def test_n_minus_selection():
+    items = list(ITEMS)
+    deselected = []
+    config = SimpleNamespace(
+        getoption=lambda name, default=None: True,
+        hook=SimpleNamespace(pytest_deselected=lambda items: deselected.extend(items)),
+    )
+    session = stand_in_session()
+    n_minus.pytest_collection_modifyitems(session, items, config)
+    assert items == ITEMS[:2]
+    assert deselected == ITEMS[2:]
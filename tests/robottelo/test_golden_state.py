@@ -0,0 +1,70 @@
+"""Tests for ``robottelo.host_helpers.satellite_mixins.GoldenState``."""
+
+import json
+from unittest import mock
+
+from box import Box
+import pytest
+
+from robottelo.exceptions import SatelliteHostError
+from robottelo.host_helpers.satellite_mixins import GoldenState
+
+
+class FakeSatellite(GoldenState):
+    hostname = 'sat.example.com'
+    version = '6.99'
+
+    def __init__(self):
+        self.files = {}
+        self.cli = mock.MagicMock()
+        self.cli.Backup.run_backup.return_value = Box(status=0, stdout='')
+        self.cli.Restore.run.return_value = Box(status=0, stdout='')
+        self.clean_cached_properties = mock.MagicMock()
+
+    def execute(self, command):
+        if command.startswith('test -f '):
+            return Box(status=0 if command[8:] in self.files else 1, stdout='')
+        if command.startswith('cat '):
+            return Box(status=0, stdout=self.files[command[4:]])
+        if command.startswith('rm -rf '):
+            path = command[7:].split(' &&')[0]
+            self.files = {k: v for k, v in self.files.items() if not k.startswith(path)}
+        return Box(status=0, stdout='')
+
+    def put(self, local_path, remote_path=None, temp_file=False):
+        self.files[remote_path] = local_path
+
+
+def test_golden_state_is_built_once_then_restored():
+    sat = FakeSatellite()
+    build = mock.MagicMock(return_value={'org_id': 5})
+    assert sat.golden_state('rhst', build, params={'repo': 'rhel'}) == {'org_id': 5}
+    assert sat.golden_state('rhst', build, params={'repo': 'rhel'}) == {'org_id': 5}
+    build.assert_called_once()
+    sat.cli.Backup.run_backup.assert_called_once()
+    sat.cli.Restore.run.assert_called_once()
+    sat.clean_cached_properties.assert_called_once()
+    # other params mean another state
+    sat.golden_state('rhst', build, params={'repo': 'rhel9'})
+    assert build.call_count == 2
+
+
+def test_golden_state_key():
+    sat = FakeSatellite()
+    key = sat.golden_state_key('rhst', {'a': 1, 'b': 2})
+    assert key.startswith('rhst-')
+    assert key == sat.golden_state_key('rhst', {'b': 2, 'a': 1})
+    sat.version = '7.0'
+    assert key != sat.golden_state_key('rhst', {'a': 1, 'b': 2})
+
+
+def test_failed_capture_is_not_kept():
+    sat = FakeSatellite()
+    sat.cli.Backup.run_backup.return_value = Box(status=1, stdout='FAIL')
+    with pytest.raises(SatelliteHostError, match='Failed to capture'):
+        sat.golden_state('rhst', lambda: {'org_id': 5})
+    assert not sat.has_golden_state(sat.golden_state_key('rhst'))
+    sat.cli.Backup.run_backup.return_value = Box(status=0, stdout='')
+    sat.golden_state('rhst', lambda: {'org_id': 5})
+    data_file = f'{sat.golden_state_path(sat.golden_state_key("rhst"))}/robottelo-state.json'
+    assert json.loads(sat.files[data_file]) == {'org_id': 5}
@@ -0,0 +1,64 @@
+"""Tests for ``robottelo.host_helpers.contenthost_mixins.HostStateCache``."""
+
+from unittest import mock
+
+from box import Box
+
+from robottelo.host_helpers.contenthost_mixins import HostStateCache, SystemFacts
+
+
+class FakeHost(HostStateCache, SystemFacts):
+    hostname = 'fake.example.com'
+
+    def __init__(self):
+        self.commands = []
+        self.facts = 'lscpu.architecture: x86_64\n'
+
+    def execute(self, command):
+        self.invalidate_state_for(command)
+        self.commands.append(command)
+        return Box(status=0, stdout=self.facts, stderr='')
+
+    def put(self, local_path, remote_path=None):
+        self.facts += 'custom.fact: value\n'
+
+
+def test_get_facts_is_cached():
+    host = FakeHost()
+    assert host.get_facts() == {'lscpu.architecture': 'x86_64'}
+    assert host.get_facts() == {'lscpu.architecture': 'x86_64'}
+    assert host.commands == ['subscription-manager facts']
+    host.get_facts(refresh=True)
+    assert len(host.commands) == 2
+
+
+def test_set_facts_invalidates_facts():
+    host = FakeHost()
+    host.get_facts()
+    host.set_facts({'custom.fact': 'value'})
+    assert host.get_facts()['custom.fact'] == 'value'
+    assert host.commands == ['subscription-manager facts', 'subscription-manager facts']
+
+
+def test_state_changing_command_invalidates():
+    host = FakeHost()
+    host.get_facts()
+    host.execute('ls /tmp')
+    host.get_facts()
+    assert host.commands.count('subscription-manager facts') == 1
+    host.execute('subscription-manager register --org org --activationkey ak')
+    host.get_facts()
+    assert host.commands.count('subscription-manager facts') == 2
+
+
+def test_state_ttl():
+    host = FakeHost()
+    host.host_state_ttl = {'facts': 10}
+    with mock.patch('time.monotonic', return_value=100):
+        host.get_facts()
+    with mock.patch('time.monotonic', return_value=105):
+        host.get_facts()
+    assert host.commands.count('subscription-manager facts') == 1
+    with mock.patch('time.monotonic', return_value=111):
+        host.get_facts()
+    assert host.commands.count('subscription-manager facts') == 2
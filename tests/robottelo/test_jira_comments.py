@@ -0,0 +1,155 @@
+"""Tests for the batched Jira commenting of ``pytest_plugins.jira_comments``."""
+
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import re
+import threading
+import time
+from types import SimpleNamespace
+from unittest import mock
+from urllib.parse import unquote_plus
+
+import pytest
+
+from pytest_plugins import jira_comments
+from robottelo.constants import JIRA_TESTS_FAILED_LABEL, JIRA_TESTS_PASSED_LABEL
+
+ISSUE_KEY = re.compile(r'(?:id|key) = ([\w-]+)')
+
+
+class FakeJira(BaseHTTPRequestHandler):
+    """Jira REST API answering the search, label and comment requests of the plugin"""
+
+    issues = {}
+    comments = Counter()
+    searches = 0
+    # comment requests answered with a status code, by issue, before the issue accepts them
+    failures = {}
+    active = 0
+    max_active = 0
+    lock = threading.Lock()
+
+    def reply(self, status, body=None, headers=None):
+        content = json.dumps(body).encode() if body is not None else b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_GET(self):
+        if '/search' not in self.path:
+            # serverInfo and the field list of the client
+            self.reply(200, {'versionNumbers': [9, 12, 0]} if 'serverInfo' in self.path else [])
+            return
+        FakeJira.searches += 1
+        keys = ISSUE_KEY.findall(unquote_plus(self.path))
+        issues = [
+            {
+                'id': key.split('-')[1],
+                'key': key,
+                'self': f'http://jira/rest/api/2/issue/{key}',
+                'fields': {'status': {'name': status}, 'labels': labels},
+            }
+            for key in keys
+            if key in FakeJira.issues
+            for status, labels in [FakeJira.issues[key]]
+        ]
+        self.reply(200, {'startAt': 0, 'maxResults': 100, 'total': len(issues), 'issues': issues})
+
+    def do_PUT(self):
+        self.rfile.read(int(self.headers['Content-Length']))
+        self.reply(204)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers['Content-Length']))
+        issue = self.path.split('/')[-2]
+        with FakeJira.lock:
+            FakeJira.active += 1
+            FakeJira.max_active = max(FakeJira.max_active, FakeJira.active)
+            failures = FakeJira.failures.get(issue)
+            status = failures.pop(0) if failures else None
+            if status is None:
+                FakeJira.comments[issue] += 1
+        time.sleep(0.02)
+        with FakeJira.lock:
+            FakeJira.active -= 1
+        if status is None:
+            self.reply(201, {'id': str(FakeJira.comments.total())})
+        else:
+            self.reply(status, {'errorMessages': ['try again']}, {'Retry-After': '0'})
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_jira(tmp_path, monkeypatch):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeJira)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    FakeJira.issues = {f'SAT-{number}': ('Testing', []) for number in range(1, 41)}
+    FakeJira.comments = Counter()
+    FakeJira.searches = 0
+    FakeJira.failures = {}
+    FakeJira.max_active = 0
+    monkeypatch.setattr(pytest, 'jira_comments', True, raising=False)
+    jira_settings = {
+        'url': f'http://127.0.0.1:{server.server_port}',
+        'email': 'user@example.com',
+        'api_key': 'key',
+        'enable_comment': True,
+        'comment_journal': str(tmp_path / 'journal.jsonl'),
+        'comment_backoff': 0,
+    }
+    with mock.patch.multiple('robottelo.config.settings.jira', **jira_settings):
+        yield tmp_path / 'journal.jsonl'
+    server.shutdown()
+
+
+def session(outcomes):
+    issue_to_tests_map = {
+        issue: [{'nodeid': f'tests/foreman/api/test_host.py::test_{issue}[a]', 'outcome': outcome}]
+        for issue, outcome in outcomes.items()
+    }
+    config = SimpleNamespace(getoption=lambda name: True, issue_to_tests_map=issue_to_tests_map)
+    return SimpleNamespace(config=config)
+
+
+def test_comments_are_posted_in_batch(fake_jira):
+    FakeJira.issues['SAT-2'] = ('Testing', [JIRA_TESTS_PASSED_LABEL])
+    FakeJira.issues['SAT-3'] = ('New', [])
+    # rate limited twice, then accepted
+    FakeJira.failures['SAT-4'] = [429, 503]
+    outcomes = {f'SAT-{number}': 'passed' for number in range(1, 41)}
+    outcomes['SAT-5'] = 'failed'
+    jira_comments.pytest_sessionfinish(session(outcomes), 0)
+    # a single bulk query for the status and labels of all the issues
+    assert FakeJira.searches == 1
+    assert FakeJira.max_active > 1
+    # already passing, and not in a status to comment on
+    assert set(FakeJira.comments) == set(outcomes) - {'SAT-2', 'SAT-3'}
+    assert set(FakeJira.comments.values()) == {1}
+    assert not fake_jira.exists()
+
+
+def test_interrupted_session_is_resumed_without_duplicates(fake_jira):
+    FakeJira.failures['SAT-7'] = [400]
+    outcomes = {f'SAT-{number}': 'failed' for number in range(1, 11)}
+    jira_comments.pytest_sessionfinish(session(outcomes), 0)
+    assert set(FakeJira.comments) == set(outcomes) - {'SAT-7'}
+    journal = jira_comments.CommentJournal(fake_jira)
+    assert [record['issue'] for record in journal.pending] == ['SAT-7']
+    assert journal.pending[0]['labels'][0] == {'add': JIRA_TESTS_FAILED_LABEL}
+
+    # the session was cut while writing the journal
+    with fake_jira.open('a') as journal_file:
+        journal_file.write('{"id": "12')
+    # the next session posts the pending comment, and its own results once
+    jira_comments.pytest_sessionfinish(session({'SAT-20': 'failed'}), 0)
+    jira_comments.pytest_sessionfinish(session({}), 0)
+    assert set(FakeJira.comments) == set(outcomes) | {'SAT-20'}
+    assert set(FakeJira.comments.values()) == {1}
+    assert not fake_jira.exists()
@@ -0,0 +1,66 @@
+"""Tests for ``robottelo.utils.lazy_import``."""
+
+import subprocess
+import sys
+
+import pytest
+
+from robottelo.utils.lazy_import import (
+    ConfigureOnImport,
+    measure_import_time,
+    parse_importtime,
+)
+
+HEAVY_MODULES = ('nailgun.entities', 'airgun', 'apypie', 'wrapanapi', 'manifester', 'jira')
+
+IMPORTTIME_OUTPUT = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:      2568 |      58890 | site
+import time:       300 |        300 |     robottelo.enums
+import time:      1000 |       1300 |   robottelo.constants
+import time:      5000 |       6300 | robottelo.config
+Traceback (most recent call last):
+"""
+
+
+def test_parse_importtime():
+    assert parse_importtime(IMPORTTIME_OUTPUT) == [
+        ('_io', 0.00012, 0.00012, 1),
+        ('site', 0.002568, 0.05889, 0),
+        ('robottelo.enums', 0.0003, 0.0003, 2),
+        ('robottelo.constants', 0.001, 0.0013, 1),
+        ('robottelo.config', 0.005, 0.0063, 0),
+    ]
+
+
+def test_measure_import_time():
+    total, imported = measure_import_time('wave', 'colorsys')
+    assert {'wave', 'colorsys'} <= {name for name, *_ in imported}
+    assert 0 < total < 5
+
+
+def test_configure_on_import(monkeypatch, tmp_path):
+    tmp_path.joinpath('deferred_module.py').write_text('VALUE = 1\n')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    configured = []
+    finder = ConfigureOnImport()
+    monkeypatch.setattr(sys, 'meta_path', [finder, *sys.meta_path])
+    finder.register('deferred_module', lambda: configured.append(sys.modules['deferred_module']))
+    assert not configured
+    import deferred_module
+
+    assert configured == [deferred_module]
+    # already imported modules are configured right away
+    finder.register('deferred_module', lambda: configured.append('again'))
+    assert configured[-1] == 'again'
+    monkeypatch.delitem(sys.modules, 'deferred_module')
+
+
+@pytest.mark.parametrize('module', ['robottelo.config', 'robottelo.hosts'])
+def test_heavy_modules_are_not_imported(module):
+    code = f'import sys, {module}; print(*[m for m in {HEAVY_MODULES} if m in sys.modules])'
+    result = subprocess.run(
+        [sys.executable, '-c', code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.split() == []
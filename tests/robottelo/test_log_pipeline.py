@@ -0,0 +1,140 @@
+"""Tests for the queue based log pipeline of ``robottelo.logging``."""
+
+import gzip
+import logging
+import time
+from unittest import mock
+
+import pytest
+
+from robottelo.logging import LogPipeline, defaultFormatter
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    pipelines = []
+
+    def make_pipeline(**kwargs):
+        pipeline = LogPipeline(
+            tmp_path / 'robottelo.log', logging.Formatter('%(message)s'), **kwargs
+        )
+        pipelines.append(pipeline)
+        return pipeline
+
+    yield make_pipeline
+    for pipeline in pipelines:
+        pipeline.stop()
+
+
+def make_logger(pipeline, name='pipeline.test'):
+    logger = logging.getLogger(name)
+    logger.handlers = [pipeline.handler('DEBUG')]
+    logger.propagate = False
+    logger.setLevel('DEBUG')
+    return logger
+
+
+def test_records_are_written_in_order(pipeline, tmp_path):
+    pipeline = pipeline()
+    pipeline.start()
+    logger = make_logger(pipeline)
+    for index in range(2000):
+        logger.debug('record %s', index)
+    try:
+        raise ValueError('boom')
+    except ValueError:
+        logger.exception('failed')
+    assert pipeline.flush(timeout=10)
+    lines = (tmp_path / 'robottelo.log').read_text().splitlines()
+    assert lines[:2000] == [f'record {index}' for index in range(2000)]
+    assert lines[2000] == 'failed'
+    assert 'ValueError: boom' in lines
+
+
+def test_listener_waits_for_records(pipeline, tmp_path):
+    pipeline = pipeline()
+    pipeline.start()
+    logger = make_logger(pipeline)
+    logger.info('first')
+    log_file = tmp_path / 'robottelo.log'
+    # let the listener empty the queue on its own
+    for _ in range(50):
+        if log_file.read_text():
+            break
+        time.sleep(0.1)
+    logger.info('second')
+    assert pipeline.flush(timeout=10)
+    assert log_file.read_text() == 'first\nsecond\n'
+
+
+def test_records_are_flushed_in_batches(pipeline):
+    pipeline = pipeline(batch_size=100)
+    logger = make_logger(pipeline)
+    # queue the records before the listener starts, as if they came faster than written
+    pipeline.running = True
+    for index in range(1000):
+        logger.info('record %s', index)
+    with mock.patch.object(
+        pipeline.file_handler, 'flush_batch', wraps=pipeline.file_handler.flush_batch
+    ) as flush_batch:
+        pipeline.listener.start()
+        assert pipeline.flush(timeout=10)
+    assert flush_batch.call_count == 10
+
+
+def test_stop_writes_queued_records(pipeline, tmp_path):
+    pipeline = pipeline()
+    pipeline.start()
+    logger = make_logger(pipeline)
+    for index in range(5000):
+        logger.info('record %s', index)
+    pipeline.stop()
+    logger.info('after stop')
+    lines = (tmp_path / 'robottelo.log').read_text().splitlines()
+    assert len(lines) == 5001
+    assert lines[-1] == 'after stop'
+
+
+def test_rate_limits(pipeline, tmp_path):
+    pipeline = pipeline(rate_limits={'chatty': 10, 'quiet': 0})
+    pipeline.start()
+    chatty, child, other = (
+        make_logger(pipeline, name) for name in ('chatty', 'chatty.child', 'quiet')
+    )
+    with mock.patch('robottelo.logging.time.monotonic', return_value=100):
+        for index in range(15):
+            chatty.info('chatty %s', index)
+            child.info('child %s', index)
+            other.info('quiet %s', index)
+    with mock.patch('robottelo.logging.time.monotonic', return_value=101):
+        chatty.info('next second')
+    assert pipeline.flush(timeout=10)
+    lines = (tmp_path / 'robottelo.log').read_text().splitlines()
+    assert len([line for line in lines if line.startswith(('chatty', 'child'))]) == 10
+    assert len([line for line in lines if line.startswith('quiet')]) == 15
+    assert '20 records dropped by the rate limit of 10 records per second' in lines
+    assert lines[-1] == 'next second'
+
+
+def test_compressed_rotation(pipeline, tmp_path):
+    pipeline = pipeline(compress=True)
+    pipeline.file_handler.maxBytes = 500
+    pipeline.start()
+    logger = make_logger(pipeline)
+    for index in range(100):
+        logger.info('record %s', index)
+    assert pipeline.flush(timeout=10)
+    rotated = tmp_path / 'robottelo.log.1.gz'
+    assert gzip.decompress(rotated.read_bytes()).decode().startswith('record ')
+
+
+def test_set_file(pipeline, tmp_path):
+    pipeline = pipeline()
+    pipeline.start()
+    logger = make_logger(pipeline)
+    logger.info('main')
+    pipeline.set_file(tmp_path / 'robottelo_gw0.log', defaultFormatter)
+    logger.info('worker')
+    assert pipeline.flush(timeout=10)
+    assert (tmp_path / 'robottelo.log').read_text() == 'main\n'
+    assert (tmp_path / 'robottelo_gw0.log').read_text().endswith('worker\n')
@@ -0,0 +1,190 @@
+"""Tests for the operation records of ``robottelo.logging`` and ``robottelo.utils.log_store``."""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from pytest_plugins import logging_hooks
+from robottelo import logging as robottelo_logging
+from robottelo.logging import (
+    _api_operation_name,
+    log_operation,
+    operation_context,
+    operations_pipeline,
+    record_operation,
+    ssh_operation_name,
+)
+from robottelo.utils import log_store
+
+TEST = 'tests/foreman/cli/test_host.py::test_positive_create'
+
+
+@pytest.fixture
+def operations_file(tmp_path, monkeypatch):
+    # the logging_hooks plugin would record the fixtures and phases of these tests in the file
+    monkeypatch.setattr(logging_hooks, 'record_operation', lambda *args, **kwargs: None)
+    previous = operations_pipeline.file_handler.baseFilename
+    path = tmp_path / 'operations_gw0.jsonl'
+    operations_pipeline.set_file(path, operations_pipeline.file_handler.formatter)
+    monkeypatch.setenv('PYTEST_XDIST_WORKER', 'gw0')
+    monkeypatch.setitem(operation_context, 'nodeid', TEST)
+    yield path
+    operations_pipeline.set_file(previous, operations_pipeline.file_handler.formatter)
+
+
+def read(path):
+    assert operations_pipeline.flush(timeout=10)
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def write_run(path, scale=1.0):
+    """Write the records of a small run: one test with a fixture running hammer commands"""
+    records = [
+        ('fixture', 'module_org', 2.0, None, TEST, 'module'),
+        ('hammer', 'organization create', 1.5, 'module_org', TEST, None),
+        ('hammer', 'host create', 3.0 * scale, None, TEST, None),
+        ('hammer', 'host create', 1.0 * scale, None, 'test_other', None),
+        ('api', 'GET /api/hosts/:id', 0.2, None, TEST, None),
+        ('ssh', 'dnf', 5.0, None, 'test_other', None),
+        ('test', 'setup', 2.0, None, TEST, None),
+        ('test', 'call', 4.2 * scale, None, TEST, None),
+        ('test', 'call', 6.0, None, 'test_other', None),
+    ]
+    path.write_text(
+        ''.join(
+            json.dumps(
+                dict(
+                    zip(
+                        ('type', 'name', 'duration', 'fixture', 'nodeid', 'scope'),
+                        record,
+                        strict=True,
+                    )
+                )
+                | {'worker': 'gw0'}
+            )
+            + '\n'
+            for record in records
+        )
+        + '{"truncated'
+    )
+    return path
+
+
+def test_operations_are_recorded(operations_file, monkeypatch):
+    monkeypatch.setitem(operation_context, 'fixture', 'module_org')
+    with log_operation('hammer', 'organization create'), log_operation('ssh', 'hammer -v'):
+        pass
+    with pytest.raises(RuntimeError), log_operation('ssh', 'false'):
+        raise RuntimeError
+    record_operation('fixture', 'module_org', 1.25, scope='module')
+    records = read(operations_file)
+    # the ssh command of the hammer command is not recorded on its own
+    assert [(r['type'], r['name'], r['outcome']) for r in records] == [
+        ('hammer', 'organization create', 'passed'),
+        ('ssh', 'false', 'failed'),
+        ('fixture', 'module_org', 'passed'),
+    ]
+    assert records[0]['worker'] == 'gw0'
+    assert records[0]['nodeid'] == TEST
+    assert records[0]['fixture'] == 'module_org'
+    assert records[2]['duration'] == 1.25
+    assert records[2]['scope'] == 'module'
+
+
+def test_operations_can_be_disabled(operations_file, monkeypatch):
+    monkeypatch.setattr(robottelo_logging.operations_logger, 'disabled', True)
+    with log_operation('hammer', 'host list'):
+        pass
+    assert read(operations_file) == []
+
+
+def test_operations_files_are_emptied_at_session_start(operations_file, monkeypatch):
+    """Only the records of the current run are indexed"""
+    log_dir = operations_file.parent
+    monkeypatch.setattr(logging_hooks, 'robottelo_log_dir', log_dir)
+    for name in ('operations.jsonl', 'operations_gw3.jsonl', 'operations.jsonl.1'):
+        write_run(log_dir / name)
+    worker = SimpleNamespace(config=SimpleNamespace(workerinput={}))
+    logging_hooks.pytest_sessionstart(worker)
+    assert (log_dir / 'operations_gw3.jsonl').exists()
+    logging_hooks.pytest_sessionstart(SimpleNamespace(config=SimpleNamespace()))
+    with log_operation('hammer', 'host list'):
+        pass
+    assert [record['name'] for record in read(log_dir / 'operations.jsonl')] == ['host list']
+    assert sorted(path.name for path in log_dir.iterdir()) == ['operations.jsonl']
+
+
+def test_api_operation_name():
+    assert (
+        _api_operation_name('get', 'https://sat.example.com/api/hosts/12/facts?per_page=1')
+        == 'GET /api/hosts/:id/facts'
+    )
+    assert _api_operation_name('PUT', '/katello/api/v2/repositories/3') == (
+        'PUT /katello/api/v2/repositories/:id'
+    )
+
+
+def test_ssh_operation_name():
+    """Only the program is recorded, never its arguments or environment"""
+    assert ssh_operation_name('dnf install -y katello-agent') == 'dnf'
+    assert ssh_operation_name('echo secret | passwd --stdin root') == 'echo'
+    assert ssh_operation_name('VAULT_TOKEN=secret HOME=/root vault login') == 'vault'
+    assert ssh_operation_name('export VAULT_TOKEN=secret') == 'export'
+    assert ssh_operation_name('  ') == ''
+
+
+def test_index_and_queries(tmp_path):
+    database = tmp_path / 'run.db'
+    assert log_store.index_logs([write_run(tmp_path / 'operations_gw0.jsonl')], database) == 9
+    connection = log_store.connect(database)
+    top = log_store.top_operations(connection, limit=2)
+    assert [(row['name'], row['duration']) for row in top] == [
+        ('dnf', 5.0),
+        ('host create', 3.0),
+    ]
+    grouped = log_store.top_operations(connection, op_type='hammer', grouped=True)
+    assert [(row['name'], row['count'], row['total']) for row in grouped] == [
+        ('host create', 2, 4.0),
+        ('organization create', 1, 1.5),
+    ]
+    tests = log_store.slowest_tests(connection)
+    assert [tuple(row) for row in tests] == [
+        (TEST, 2.0, 4.2, 0, 6.2),
+        ('test_other', 0, 6.0, 0, 6.0),
+    ]
+    breakdown = log_store.time_breakdown(connection, TEST)
+    assert [(row['type'], row['detail'], row['total']) for row in breakdown] == [
+        ('test', 'call', 4.2),
+        ('test', 'setup', 2.0),
+        ('fixture', 'module_org', 2.0),
+        ('hammer', '', 3.0),
+        ('hammer', 'module_org', 1.5),
+        ('api', '', 0.2),
+    ]
+    fixtures = log_store.fixture_times(connection)
+    assert [(row['name'], row['scope'], row['total']) for row in fixtures] == [
+        ('module_org', 'module', 2.0)
+    ]
+    # reindexing replaces the database
+    assert log_store.index_logs([tmp_path / 'operations_gw0.jsonl'], database) == 9
+
+
+def test_compare(tmp_path):
+    previous = tmp_path / 'previous.db'
+    log_store.index_logs([write_run(tmp_path / 'previous.jsonl')], previous)
+    current = tmp_path / 'current.db'
+    log_store.index_logs([write_run(tmp_path / 'current.jsonl', scale=2.0)], current)
+    connection = log_store.connect(current)
+    rows = log_store.compare(connection, previous, limit=2)
+    assert [(row['type'], row['name'], row['previous'], row['average']) for row in rows] == [
+        ('test', f'{TEST}::call', 4.2, 8.4),
+        ('hammer', 'host create', 2.0, 4.0),
+    ]
+    rows = log_store.compare(connection, previous, op_type='ssh')
+    assert [(row['name'], row['added']) for row in rows] == [('dnf', 0.0)]
+
+
+def test_connect_requires_index(tmp_path):
+    with pytest.raises(FileNotFoundError, match='index the logs first'):
+        log_store.connect(tmp_path / 'missing.db')
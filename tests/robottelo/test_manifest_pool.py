@@ -0,0 +1,162 @@
+"""Tests for ``robottelo.utils.manifest_pool``."""
+
+from concurrent.futures import ThreadPoolExecutor
+import io
+import json
+import threading
+from unittest import mock
+import zipfile
+
+from robottelo.utils.manifest_pool import (
+    ManifestPool,
+    delete_offline_manifest,
+    generate_offline_manifest,
+    manifest_params_key,
+)
+
+CATEGORY = {'sat_version': 'sat-6.99', 'offline_token': 'secret', 'subscription_data': []}
+
+
+def make_pool(tmp_path, **kwargs):
+    generate = mock.MagicMock(side_effect=generate_offline_manifest)
+    delete = mock.MagicMock(side_effect=delete_offline_manifest)
+    return ManifestPool(directory=tmp_path, generate=generate, delete=delete, **kwargs)
+
+
+def test_params_key_ignores_token():
+    assert manifest_params_key(CATEGORY) == manifest_params_key(CATEGORY | {'offline_token': 'x'})
+    assert manifest_params_key(CATEGORY) != manifest_params_key(CATEGORY | {'sat_version': '7'})
+
+
+def test_offline_manifest():
+    content, _ = generate_offline_manifest(CATEGORY)
+    with zipfile.ZipFile(io.BytesIO(content)) as archive:
+        assert archive.namelist() == ['consumer_export.zip']
+
+
+def test_manifests_are_reused_across_consumers(tmp_path):
+    pool = make_pool(tmp_path, size=1)
+    # leased manifests are not given to anyone else
+    with (
+        pool.manifest(CATEGORY, consumer='sat1') as first,
+        pool.manifest(CATEGORY, consumer='sat2') as second,
+    ):
+        assert second.uuid != first.uuid
+    pool.wait()
+    # a manifest is never leased twice to the same consumer
+    third = pool.lease(CATEGORY, consumer='sat1')
+    assert third.uuid != first.uuid
+    pool.wait()
+    # another pool on the same directory, like another run, shares the manifests
+    other = make_pool(tmp_path, size=1)
+    manifest = other.lease(CATEGORY, consumer='sat3')
+    assert manifest.uuid in {first.uuid, second.uuid}
+    assert manifest.content == manifest.path.read_bytes()
+    other.wait()
+
+
+def test_pool_is_refilled_in_background(tmp_path):
+    pool = make_pool(tmp_path, size=3)
+    pool.lease(CATEGORY)
+    pool.wait()
+    assert pool.generate.call_count == 4
+    entries = json.loads(pool.index_file.read_text())
+    assert len(entries) == 4
+    assert len([entry for entry in entries if entry['lease']]) == 1
+
+
+def test_expired_manifests_are_replaced(tmp_path):
+    pool = make_pool(tmp_path, size=1)
+    manifest = pool.lease(CATEGORY)
+    pool.release(manifest)
+    pool.wait()
+    pool.expiry = -1
+    pool.lease(CATEGORY)
+    pool.wait()
+    deleted = {call.args[1] for call in pool.delete.call_args_list}
+    assert manifest.uuid in deleted
+    assert not manifest.path.exists()
+
+
+def test_corrupted_manifest_is_not_leased(tmp_path):
+    pool = make_pool(tmp_path, size=1)
+    pool.refill(CATEGORY, background=False)
+    entry = json.loads(pool.index_file.read_text())[0]
+    pool.blobs.joinpath(f'{entry["sha256"]}.zip').write_bytes(b'corrupted')
+    assert pool.lease(CATEGORY).uuid != entry['uuid']
+    pool.wait()
+
+
+def test_concurrent_leases_are_exclusive(tmp_path):
+    pool = make_pool(tmp_path, size=4)
+    pool.refill(CATEGORY, background=False)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        manifests = list(executor.map(lambda _: pool.lease(CATEGORY), range(4)))
+    pool.wait()
+    assert len({manifest.uuid for manifest in manifests}) == 4
+
+
+def test_pool_is_refilled_for_a_single_consumer(tmp_path):
+    """Manifests used on the only Satellite don't count as free, the next lease for it is
+    served from the pool instead of generating a manifest
+    """
+    pool = make_pool(tmp_path, size=1)
+    with pool.manifest(CATEGORY, consumer='sat1'):
+        pass
+    pool.wait()
+    assert pool.generate.call_count == 2
+    with pool.manifest(CATEGORY, consumer='sat1'):
+        pass
+    pool.wait()
+    assert pool.generate.call_count == 3
+    entries = json.loads(pool.index_file.read_text())
+    assert sorted(len(entry['used_on']) for entry in entries) == [0, 1, 1]
+
+
+def test_used_manifests_are_leased_first(tmp_path):
+    pool = make_pool(tmp_path, size=1)
+    with pool.manifest(CATEGORY, consumer='sat1') as used:
+        pass
+    pool.wait()
+    assert pool.lease(CATEGORY, consumer='sat2').uuid == used.uuid
+    pool.wait()
+
+
+def test_forget_consumer(tmp_path):
+    """A redeployed Satellite can get the manifests its hostname was used for again"""
+    pool = make_pool(tmp_path, size=0)
+    with pool.manifest(CATEGORY, consumer='sat1') as first:
+        pass
+    pool.forget('sat1')
+    assert pool.lease(CATEGORY, consumer='sat1').uuid == first.uuid
+    assert pool.generate.call_count == 1
+
+
+def test_purge_keeps_used_manifests(tmp_path):
+    pool = make_pool(tmp_path, size=2)
+    with pool.manifest(CATEGORY, consumer='sat1') as used:
+        pass
+    pool.wait()
+    pool.purge(CATEGORY)
+    entries = json.loads(pool.index_file.read_text())
+    assert [entry['uuid'] for entry in entries] == [used.uuid]
+    assert pool.delete.call_count == 2
+
+
+def test_wait_for_refills_with_timeout(tmp_path):
+    """A refill still running at the end of the session does not keep the process alive"""
+    generated = threading.Event()
+
+    def generate(category):
+        generated.wait(5)
+        return generate_offline_manifest(category)
+
+    pool = make_pool(tmp_path, size=1)
+    pool.generate.side_effect = generate
+    pool.refill(CATEGORY)
+    assert all(thread.daemon for thread in pool.threads)
+    assert not pool.wait(timeout=0.1)
+    assert len(pool.threads) == 1
+    generated.set()
+    assert pool.wait(timeout=5)
+    assert not pool.threads
@@ -0,0 +1,117 @@
+"""Tests for the batched and streamed queries of ``robottelo.hosts.Capsule``."""
+
+import base64
+import json
+import re
+import subprocess
+
+from box import Box
+import pytest
+
+from robottelo.exceptions import CLIReturnCodeError
+from robottelo.hosts import Capsule
+
+ROWS = [{'id': index, 'name': f'host{index}'} for index in range(7)]
+
+
+class FakeCapsule(Capsule):
+    """Run the commands locally, with psql answering the queries from ``tables``"""
+
+    def __init__(self, tables):
+        self.tables = tables
+        self.commands = []
+
+    def _psql(self, script):
+        output = []
+        for line in script.splitlines():
+            if line.startswith('\\echo '):
+                output.append(line.removeprefix('\\echo '))
+            elif line.startswith('\\set'):
+                continue
+            elif match := re.fullmatch(
+                r'SELECT json_agg\(row_to_json\(t\)\) FROM \((.*)\) t;', line
+            ):
+                rows = self.tables.get(match.group(1))
+                if rows is None:
+                    return 1, output
+                output.append(json.dumps(rows) if rows else '')
+            elif match := re.fullmatch(
+                r'SELECT row_to_json\(t\) FROM \((.*)\) t(?: LIMIT (\d+))?;', line
+            ):
+                rows = self.tables.get(match.group(1))
+                if rows is None:
+                    return 1, output
+                limit = int(match.group(2)) if match.group(2) else None
+                output.extend(json.dumps(row, ensure_ascii=False) for row in rows[:limit])
+            else:
+                output.append(self.tables[line.rstrip(';')])
+        return 0, output
+
+    def execute(self, command, timeout=None):
+        self.commands.append(command)
+        if script := re.match(r"echo '([^']+)' \| base64 -d \| ", command):
+            status, output = self._psql(base64.b64decode(script.group(1)).decode('utf-8'))
+            stdout = ''.join(f'{line}\n' for line in output)
+            if redirect := re.search(r' > (\S+)$', command):
+                with open(redirect.group(1), 'w', encoding='utf-8') as remote_file:
+                    remote_file.write(stdout)
+                stdout = ''
+            return Box(status=status, stdout=stdout, stderr='ERROR' if status else '')
+        result = subprocess.run(command, shell=True, capture_output=True, encoding='utf-8')
+        return Box(status=result.returncode, stdout=result.stdout, stderr=result.stderr)
+
+
+def test_query_db_batch_json():
+    capsule = FakeCapsule(
+        {
+            'SELECT * FROM hosts': ROWS[:2],
+            'SELECT * FROM empty': [],
+            # a value looking like the separator of the outputs
+            'SELECT name FROM notes': [{'name': 'ROBOTTELO-QUERY-0000000000000000 1\n'}],
+        }
+    )
+    results = capsule.query_db_batch(
+        ['SELECT * FROM hosts;', 'SELECT * FROM empty', 'SELECT name FROM notes']
+    )
+    assert results == [ROWS[:2], [], [{'name': 'ROBOTTELO-QUERY-0000000000000000 1\n'}]]
+    assert len(capsule.commands) == 1
+
+
+def test_query_db_batch_raw():
+    capsule = FakeCapsule({'SELECT 1': ' ?column? \n----------\n        1\n', 'SELECT 2': ''})
+    assert capsule.query_db_batch(['SELECT 1', 'SELECT 2'], output_format='raw') == [
+        ' ?column? \n----------\n        1\n\n',
+        '\n',
+    ]
+    assert capsule.query_db_batch([]) == []
+    assert len(capsule.commands) == 1
+
+
+def test_query_db_batch_failure():
+    capsule = FakeCapsule({'SELECT * FROM hosts': ROWS})
+    with pytest.raises(CLIReturnCodeError):
+        capsule.query_db_batch(['SELECT * FROM hosts', 'SELECT * FROM missing'])
+
+
+@pytest.mark.parametrize('chunk_rows', [1, 3, 7, 100])
+def test_query_db_stream(chunk_rows):
+    """The rows are read in chunks, including a last partial chunk and an exactly full one"""
+    rows = [*ROWS, {'id': 7, 'name': 'höst\u2028separator'}]
+    capsule = FakeCapsule({'SELECT * FROM hosts': rows})
+    assert list(capsule.query_db_stream('SELECT * FROM hosts', chunk_rows=chunk_rows)) == rows
+    reads = [command for command in capsule.commands if command.startswith('tail')]
+    assert len(reads) == len(rows) // chunk_rows + 1
+    assert capsule.commands[-1].startswith('rm -f /tmp/robottelo_query_')
+
+
+def test_query_db_stream_limit_and_empty():
+    capsule = FakeCapsule({'SELECT * FROM hosts': ROWS, 'SELECT * FROM empty': []})
+    assert list(capsule.query_db_stream('SELECT * FROM hosts', limit=2, fetch_size=5)) == ROWS[:2]
+    assert list(capsule.query_db_stream('SELECT * FROM empty')) == []
+
+
+def test_query_db_stream_failure():
+    capsule = FakeCapsule({})
+    with pytest.raises(CLIReturnCodeError):
+        list(capsule.query_db_stream('SELECT * FROM missing'))
+    assert capsule.commands[-1].startswith('rm -f ')
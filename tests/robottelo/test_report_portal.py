@@ -0,0 +1,213 @@
+"""Tests for ``robottelo.utils.report_portal`` against a local Report Portal stand-in."""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import math
+import threading
+import time
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from pytest_plugins.rerun_rp import rerun_rp
+from robottelo.utils.report_portal.portal import ReportPortal
+from robottelo.utils.report_portal.rerun_index import (
+    build_rerun_index,
+    read_rerun_index,
+    write_rerun_index,
+)
+
+PROJECT = 'Satellite6'
+ITEMS = [
+    {
+        'id': index,
+        'name': f'tests/foreman/api/test_module{index // 100}.py::test_positive_{index}',
+        'status': 'FAILED' if index % 10 == 0 else 'PASSED',
+        'issue': {'issueType': 'pb001' if index % 20 == 0 else 'ti001'}
+        if index % 10 == 0
+        else None,
+    }
+    for index in range(20000)
+]
+LAUNCH = {
+    'id': 1,
+    'uuid': 'launch-uuid',
+    'name': 'launch-name',
+    'status': 'FAILED',
+    'statistics': {'executions': {'total': 20000, 'failed': 2000}},
+}
+
+
+class ReportPortalStandIn(BaseHTTPRequestHandler):
+    item_requests = []
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        endpoint = url.path.removeprefix(f'/api/v1/{PROJECT}/')
+        if endpoint == 'settings':
+            body = {}
+        elif endpoint == 'launch':
+            body = {'content': [LAUNCH]}
+        else:
+            self.item_requests.append(params)
+            items = ITEMS
+            if 'filter.in.status' in params:
+                items = [item for item in items if item['status'] in params['filter.in.status']]
+            size, page = int(params['page.size']), int(params['page.page'])
+            body = {
+                'content': items[(page - 1) * size : page * size],
+                'page': {'totalPages': math.ceil(len(items) / size)},
+            }
+        content = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def rp_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ReportPortalStandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_port}'
+    server.shutdown()
+
+
+@pytest.fixture
+def item_requests():
+    ReportPortalStandIn.item_requests.clear()
+    return ReportPortalStandIn.item_requests
+
+
+def make_rp(rp_url, cache_dir, **kwargs):
+    return ReportPortal(
+        rp_url=rp_url,
+        rp_api_key='key',
+        rp_project=PROJECT,
+        cache_dir=cache_dir,
+        **{'page_size': 300, 'workers': 8} | kwargs,
+    )
+
+
+def test_pages_are_fetched_concurrently_and_cached(rp_url, item_requests, tmp_path):
+    tests = make_rp(rp_url, tmp_path).get_tests(launch=LAUNCH)
+    assert tests == ITEMS
+    assert len(item_requests) == math.ceil(len(ITEMS) / 300)
+    assert {int(params['page.page']) for params in item_requests} == set(
+        range(1, len(item_requests) + 1)
+    )
+    # finished launches are read from the cache, with the path filter still applied
+    item_requests.clear()
+    paths = ['tests/foreman/api/test_module3.py']
+    tests = make_rp(rp_url, tmp_path).get_tests(launch=LAUNCH, paths=paths)
+    assert not item_requests
+    assert [test['id'] for test in tests] == list(range(300, 400))
+    # other filters have their own cache file
+    tests = make_rp(rp_url, tmp_path).get_tests(launch=LAUNCH, status=['failed'])
+    assert len(tests) == 2000
+    assert len(list(tmp_path.glob('launch-uuid-*.json'))) == 2
+
+
+def test_unfinished_launches_are_not_cached(rp_url, item_requests, tmp_path):
+    launch = LAUNCH | {'status': 'IN_PROGRESS'}
+    make_rp(rp_url, tmp_path, page_size=5000).get_tests(launch=launch)
+    make_rp(rp_url, tmp_path, page_size=5000).get_tests(launch=launch)
+    assert len(item_requests) == 8
+    assert not list(tmp_path.iterdir())
+
+
+def make_config(**options):
+    return SimpleNamespace(
+        getini=lambda name: '',
+        getoption=lambda name, default=None: options.get(name, default),
+        args=['tests/foreman'],
+        hook=SimpleNamespace(pytest_deselected=lambda items: None),
+    )
+
+
+def make_items(tests):
+    return [
+        SimpleNamespace(location=(test['name'].split('::')[0], 0, test['name'].split('::')[1]))
+        for test in tests
+    ]
+
+
+def test_only_failed_collection_overhead(rp_url, item_requests, tmp_path, monkeypatch):
+    monkeypatch.setattr(rerun_rp, 'ReportPortal', lambda **kwargs: make_rp(rp_url, tmp_path))
+    monkeypatch.setattr(rerun_rp.settings.report_portal, 'fail_threshold', 20)
+    config = make_config(only_failed='all', rp_reference_launch_uuid='launch-uuid')
+    items = make_items(ITEMS)
+    start = time.perf_counter()
+    rerun_rp.pytest_collection_modifyitems(items, config)
+    overhead = time.perf_counter() - start
+    print(f'--only-failed collection overhead for {len(ITEMS)} items: {overhead:.2f}s')
+    assert len(items) == 2000
+    assert len(item_requests) == math.ceil(2000 / 300)
+    # fetching 50 items at a time and matching each item against a list took minutes
+    assert overhead < 10
+
+
+def test_rerun_index(rp_url, item_requests, tmp_path, monkeypatch):
+    index_path = tmp_path / 'rerun_index.json.gz'
+    write_rerun_index(build_rerun_index(LAUNCH, make_rp(rp_url, '').get_tests(LAUNCH)), index_path)
+    assert index_path.stat().st_size < 200_000
+    index = read_rerun_index(index_path)
+    assert index['launch']['uuid'] == 'launch-uuid'
+    assert index['tests']['tests/foreman/api/test_module0.py.test_positive_20'] == [
+        'FAILED',
+        'product_bug',
+    ]
+    # the tests are selected from the index, Report Portal is not contacted
+    item_requests.clear()
+    monkeypatch.setattr(ReportPortal, '__init__', None)
+    monkeypatch.setattr(rerun_rp.settings.report_portal, 'fail_threshold', 20)
+    items = make_items(ITEMS)
+    config = make_config(only_failed='to_investigate', rp_rerun_index=str(index_path))
+    rerun_rp.pytest_collection_modifyitems(items, config)
+    assert not item_requests
+    assert len(items) == 1000
+    assert all(item.location[0].endswith('.py') for item in items)
+    items = make_items(ITEMS)
+    rerun_rp.pytest_collection_modifyitems(
+        items, make_config(only_skipped=True, rp_rerun_index=str(index_path))
+    )
+    assert not items
+
+
+def test_rerun_index_rejects_user(tmp_path):
+    index_path = tmp_path / 'rerun_index.json.gz'
+    write_rerun_index(build_rerun_index(LAUNCH, []), index_path)
+    config = make_config(user='jdoe', rp_rerun_index=str(index_path))
+    with pytest.raises(pytest.UsageError, match='--user can not be used with --rp-rerun-index'):
+        rerun_rp.pytest_collection_modifyitems(make_items(ITEMS), config)
+
+
+def test_rerun_index_selection_time_is_flat(tmp_path, monkeypatch):
+    monkeypatch.setattr(rerun_rp.settings.report_portal, 'fail_threshold', 100)
+
+    def selection_time(count):
+        tests = [
+            {'name': f'tests/foreman/test_module{i // 100}.py::test_{i}', 'status': 'FAILED'}
+            for i in range(count)
+        ]
+        index_path = tmp_path / f'rerun_index_{count}.json.gz'
+        write_rerun_index(build_rerun_index(LAUNCH, tests), index_path)
+        config = make_config(only_failed='all', rp_rerun_index=str(index_path))
+        times = []
+        for _ in range(3):
+            items = make_items(tests)
+            start = time.perf_counter()
+            rerun_rp.pytest_collection_modifyitems(items, config)
+            times.append(time.perf_counter() - start)
+            assert len(items) == count
+        return min(times) / count
+
+    small, large = selection_time(10_000), selection_time(100_000)
+    print(f'selection time per item: {small * 1e6:.2f}us for 10k, {large * 1e6:.2f}us for 100k')
+    # matching each item by scanning the selected tests would take 10 times longer per item
+    assert large < small * 5
@@ -0,0 +1,71 @@
+"""Tests for ``robottelo.host_helpers.repository_mixins.RepositoryCollection``."""
+
+import time
+from unittest import mock
+
+from box import Box
+import pytest
+
+from robottelo.exceptions import ReposContentSetupWasNotPerformed
+from robottelo.host_helpers import repository_mixins
+
+SYNC_TIMES = {'fast': 0.1, 'medium': 0.2, 'slow': 0.4}
+
+
+def fake_satellite(fail=()):
+    sat = mock.MagicMock()
+    sat.cli_factory.make_product_wait.return_value = Box(id=1, organization='org')
+    sat.cli_factory.make_repository.side_effect = lambda options: {
+        'id': options['url'],
+        'name': options['url'],
+    }
+    sat.cli.Repository.synchronize.side_effect = lambda options, **_: [{'id': options['id']}]
+
+    def foreman_task(id):
+        task = mock.MagicMock()
+
+        def poll(**_):
+            time.sleep(SYNC_TIMES[id])
+            if id in fail:
+                raise AssertionError(f'task {id} failed')
+
+        task.poll.side_effect = poll
+        return task
+
+    sat.api.ForemanTask.side_effect = foreman_task
+    return sat
+
+
+def make_collection(sat):
+    helpers = dict(repository_mixins.initiate_repo_helpers(sat))
+    return helpers['RepositoryCollection'](
+        repositories=[helpers['YumRepository'](url=name) for name in SYNC_TIMES]
+    )
+
+
+def test_setup_syncs_repositories_together():
+    sat = fake_satellite()
+    collection = make_collection(sat)
+    start = time.time()
+    collection.setup(org_id=1)
+    elapsed = time.time() - start
+    assert sat.cli_factory.make_repository.call_count == len(SYNC_TIMES)
+    for call in sat.cli.Repository.synchronize.call_args_list:
+        assert call.args[0]['async'] is True
+    assert set(collection.sync_durations) == set(SYNC_TIMES)
+    assert collection.sync_durations['slow'] >= SYNC_TIMES['slow']
+    assert elapsed < sum(SYNC_TIMES.values())
+
+
+def test_failed_sync_is_raised_after_all_finished():
+    sat = fake_satellite(fail=('fast',))
+    collection = make_collection(sat)
+    with pytest.raises(AssertionError, match='task fast failed') as error:
+        collection.setup(org_id=1)
+    assert 'sync of repository "fast" failed' in error.value.__notes__
+    assert set(collection.sync_durations) == {'medium', 'slow'}
+
+
+def test_synchronize_needs_created_repositories():
+    with pytest.raises(ReposContentSetupWasNotPerformed):
+        make_collection(fake_satellite()).synchronize()
@@ -0,0 +1,69 @@
+"""Tests for the settings snapshot of ``robottelo.config``."""
+
+import pickle
+import time
+from unittest import mock
+
+import pytest
+
+from robottelo import config
+
+
+def test_snapshot_key_depends_on_envvars(monkeypatch):
+    # the variable may already be set, CI exports it empty
+    monkeypatch.delenv('ROBOTTELO_SERVER__HOSTNAME', raising=False)
+    key = config.settings_snapshot_key()
+    assert key == config.settings_snapshot_key()
+    monkeypatch.setenv('ROBOTTELO_SERVER__HOSTNAME', 'sat.example.com')
+    assert key != config.settings_snapshot_key()
+    monkeypatch.setenv('UNRELATED_VARIABLE', 'value')
+    monkeypatch.delenv('ROBOTTELO_SERVER__HOSTNAME')
+    assert key == config.settings_snapshot_key()
+
+
+def test_snapshot_key_depends_on_settings_cache(monkeypatch, tmp_path):
+    """A refreshed ohsnap cache is not hidden by the snapshot"""
+    monkeypatch.setattr(config, 'robottelo_root_dir', tmp_path)
+    cache = tmp_path / 'settings_cache-6.16.0-1.0.json'
+    cache.write_text('{"repos": {}}')
+    key = config.settings_snapshot_key()
+    cache.write_text('{"repos": {"capsule_repo": "http://repo"}}')
+    assert key != config.settings_snapshot_key()
+
+
+@pytest.fixture
+def cached_settings():
+    """Validated settings which allow a snapshot"""
+    settings = config._snapshot_settings(config.settings.as_dict())
+    settings.set('robottelo.settings.get_fresh', False)
+    settings.set('robottelo.settings.snapshot_ttl', 3600)
+    return settings
+
+
+def test_snapshot_roundtrip(monkeypatch, tmp_path, cached_settings):
+    monkeypatch.setattr(config, 'SETTINGS_SNAPSHOT_DIR', tmp_path / 'snapshots')
+    assert config.load_settings_snapshot('key') is None
+    config.write_settings_snapshot('key', cached_settings)
+    snapshot = config.load_settings_snapshot('key')
+    assert snapshot.as_dict() == cached_settings.as_dict()
+    assert snapshot.server.version.release == config.settings.server.version.release
+    assert (tmp_path / 'snapshots').stat().st_mode & 0o077 == 0
+    # a new snapshot replaces the previous one
+    config.write_settings_snapshot('other', cached_settings)
+    assert config.load_settings_snapshot('key') is None
+    with mock.patch('robottelo.config.time.time', return_value=float('inf')):
+        assert config.load_settings_snapshot('other') is None
+
+
+def test_snapshot_not_used_with_get_fresh(monkeypatch, tmp_path, cached_settings):
+    """The dynaconf hooks fetch the repos config on every start with get_fresh"""
+    monkeypatch.setattr(config, 'SETTINGS_SNAPSHOT_DIR', tmp_path / 'snapshots')
+    cached_settings.set('robottelo.settings.get_fresh', True)
+    config.write_settings_snapshot('key', cached_settings)
+    assert not (tmp_path / 'snapshots').exists()
+    # a snapshot written before get_fresh was enabled
+    config.SETTINGS_SNAPSHOT_DIR.mkdir()
+    config.SETTINGS_SNAPSHOT_DIR.joinpath('key.pickle').write_bytes(
+        pickle.dumps({'created': time.time(), 'ttl': 3600, 'data': cached_settings.as_dict()})
+    )
+    assert config.load_settings_snapshot('key') is None
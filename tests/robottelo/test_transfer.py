@@ -0,0 +1,163 @@
+"""Tests for module ``robottelo.utils.transfer``."""
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+from pathlib import Path
+import shutil
+import subprocess
+
+from box import Box
+import pytest
+
+from robottelo.utils import transfer
+
+
+class LocalSession:
+    """A broker session stand-in copying files locally and counting the transfers.
+
+    Relative remote paths are resolved in the root directory of the host.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.writes = []
+        self.reads = []
+
+    def sftp_write(self, source, destination=None, ensure_dir=True):
+        self.writes.append(destination)
+        destination = Path(self.root, destination)
+        if ensure_dir:
+            destination.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy(source, destination)
+
+    def sftp_read(self, source, destination=None, return_data=False):
+        self.reads.append(source)
+        if return_data:
+            return Path(self.root, source).read_bytes()
+        shutil.copy(Path(self.root, source), destination)
+        return None
+
+
+class LocalHost:
+    """A host stand-in running the commands with the local shell."""
+
+    def __init__(self, hostname='localhost', root='/'):
+        self.hostname = hostname
+        self.root = root
+        self.session = LocalSession(root)
+
+    def execute(self, cmd):
+        result = subprocess.run(cmd, shell=True, capture_output=True, text=True, cwd=self.root)
+        return Box(status=result.returncode, stdout=result.stdout, stderr=result.stderr)
+
+
+@pytest.fixture
+def remote_tmp(tmp_path, monkeypatch):
+    remote = tmp_path / 'remote'
+    remote.mkdir()
+    monkeypatch.setattr(transfer, 'REMOTE_TMP_DIR', str(remote))
+    return remote
+
+
+@pytest.fixture
+def payload(tmp_path):
+    source = tmp_path / 'payload.bin'
+    source.write_bytes(os.urandom(5000) + b'a' * 5000)
+    return source
+
+
+def test_upload_small_file_single_sftp_call(remote_tmp, payload):
+    host = LocalHost()
+    transfer.upload(host, payload, remote_tmp / 'small.bin', chunk_size=len(payload.read_bytes()))
+    assert host.session.writes == [str(remote_tmp / 'small.bin')]
+    assert (remote_tmp / 'small.bin').read_bytes() == payload.read_bytes()
+
+
+@pytest.mark.parametrize('compress', [True, False])
+def test_upload_chunked(remote_tmp, payload, compress):
+    host = LocalHost()
+    destination = remote_tmp / 'dir' / 'big.bin'
+    transfer.upload(host, payload, destination, chunk_size=1024, compress=compress)
+    assert destination.read_bytes() == payload.read_bytes()
+    assert len(host.session.writes) == 10
+    assert os.listdir(destination.parent) == ['big.bin']
+
+
+def test_upload_resumes(remote_tmp, payload):
+    """Only the chunks missing or corrupted at the destination are uploaded again"""
+    host = LocalHost()
+    destination = remote_tmp / 'big.bin'
+    with transfer.LocalArtifact(payload, chunk_size=1024) as artifact:
+        part_dir = Path(f'{destination}.part-{artifact.sha256[:16]}-1024')
+        part_dir.mkdir()
+        data = payload.read_bytes()
+        for index in range(8):
+            (part_dir / f'{index:06d}').write_bytes(data[index * 1024 : (index + 1) * 1024])
+        (part_dir / '000003').write_bytes(b'corrupted')
+        transfer.upload_artifact(host, artifact, destination)
+    assert sorted(Path(path).name for path in host.session.writes) == [
+        '000003.gz',
+        '000008.gz',
+        '000009.gz',
+    ]
+    assert destination.read_bytes() == payload.read_bytes()
+
+
+def test_upload_bytes(remote_tmp):
+    host = LocalHost()
+    transfer.upload(host, b'x' * 3000, remote_tmp / 'bytes.bin', chunk_size=1024)
+    assert (remote_tmp / 'bytes.bin').read_bytes() == b'x' * 3000
+
+
+def test_download_chunked_resumes(tmp_path, remote_tmp, payload):
+    host = LocalHost()
+    destination = tmp_path / 'local' / 'big.bin'
+    part_dir = Path(f'{destination}.part')
+    part_dir.mkdir(parents=True)
+    (part_dir / '000000').write_bytes(payload.read_bytes()[:1024])
+    transfer.download(host, payload, destination, chunk_size=1024)
+    assert destination.read_bytes() == payload.read_bytes()
+    assert len(host.session.reads) == 9
+    assert not part_dir.exists()
+    assert not os.listdir(remote_tmp)
+
+
+def test_concurrent_downloads_of_same_file(tmp_path, remote_tmp, payload):
+    """Each transfer splits the file in its own remote temporary directory"""
+    host = LocalHost()
+    destinations = [tmp_path / f'copy{index}.bin' for index in range(4)]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(
+            executor.map(
+                lambda destination: transfer.download(host, payload, destination, chunk_size=1024),
+                destinations,
+            )
+        )
+    for destination in destinations:
+        assert destination.read_bytes() == payload.read_bytes()
+    assert not os.listdir(remote_tmp)
+
+
+def test_tree_transfer(tmp_path, remote_tmp):
+    source = tmp_path / 'tree'
+    (source / 'sub').mkdir(parents=True)
+    (source / 'a.txt').write_text('a')
+    (source / 'sub' / 'b.txt').write_text('b' * 4000)
+    source_host, target_host = LocalHost('source'), LocalHost('target')
+    transfer.upload_tree(source_host, source, remote_tmp / 'uploaded', chunk_size=512)
+    transfer.copy_tree(source_host, remote_tmp / 'uploaded', target_host, remote_tmp / 'copied')
+    transfer.download_tree(target_host, remote_tmp / 'copied', tmp_path / 'downloaded')
+    assert (tmp_path / 'downloaded' / 'a.txt').read_text() == 'a'
+    assert (tmp_path / 'downloaded' / 'sub' / 'b.txt').read_text() == 'b' * 4000
+
+
+def test_fan_out(remote_tmp, payload):
+    roots = [remote_tmp / f'host{index}' for index in range(3)]
+    hosts = []
+    for index, root in enumerate(roots):
+        root.mkdir()
+        hosts.append(LocalHost(f'host{index}', root=root))
+    destinations = transfer.fan_out(hosts, payload, 'fan.bin', chunk_size=1024)
+    assert set(destinations) == {'host0', 'host1', 'host2'}
+    for root in roots:
+        assert (root / 'fan.bin').read_bytes() == payload.read_bytes()
@@ -0,0 +1,168 @@
+"""Tests for ``robottelo.utils.ui_session_pool``."""
+
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+
+from robottelo.constants import ANY_CONTEXT
+from robottelo.utils.ui_session_pool import (
+    PooledUISession,
+    UISessionKey,
+    UISessionPool,
+    discard_if_failed,
+    reset_ui_session,
+    stop_ui_session,
+)
+
+ADMIN = UISessionKey('sat.example.com', 'admin')
+
+
+class FakeSession:
+    def __init__(self, key):
+        self.user = key.user
+        self.context = (key.organization, key.location)
+        self.closed = False
+        self.exc_info = None
+        self.resets = 0
+        self.broken = False
+
+    def page(self):
+        return f'{self.user} landing page'
+
+
+def make_pool(size=2):
+    sessions = []
+
+    def start(key, password, testname):
+        sessions.append(FakeSession(key))
+        return sessions[-1]
+
+    def reset(session, key, testname):
+        if session.broken:
+            raise RuntimeError('browser is gone')
+        session.resets += 1
+        session.name = testname
+
+    def stop(session, exc_info):
+        session.closed = True
+        session.exc_info = exc_info
+
+    pool = UISessionPool(start, reset, stop, size=size)
+    pool.sessions = sessions
+    return pool
+
+
+def test_sessions_are_reused_by_key():
+    pool = make_pool()
+    # the tests enter the session again, it keeps the pooled browser
+    with pool.session(ADMIN, 'changeme') as first, first as entered:
+        assert entered.page() == 'admin landing page'
+    with pool.session(ADMIN, 'changeme') as second:
+        assert second.pool_session is first.pool_session
+        assert second.resets == 1
+    org_key = ADMIN._replace(organization='Default Organization')
+    with pool.session(org_key, 'changeme') as third:
+        assert third.pool_session is not first.pool_session
+        assert third.context == ('Default Organization', None)
+    assert (pool.created, pool.reused) == (2, 1)
+    assert not any(session.closed for session in pool.sessions)
+
+
+def test_failed_sessions_are_discarded():
+    pool = make_pool()
+    with pytest.raises(AssertionError), pool.session(ADMIN, 'changeme') as session, session:
+        raise AssertionError('failed')
+    assert session.pool_session.closed
+    # airgun gets the failure to take its screenshot
+    exc_type, exc_value, _ = session.pool_session.exc_info
+    assert exc_type is AssertionError
+    assert str(exc_value) == 'failed'
+    with pytest.raises(RuntimeError), pool.session(ADMIN, 'changeme') as session:
+        raise RuntimeError
+    assert session.pool_session.exc_info[0] is RuntimeError
+    pooled = pool.lease(ADMIN, 'changeme')
+    pooled.pool_discard = True
+    pool.release(pooled)
+    assert pooled.pool_session.closed
+    assert pooled.pool_session.exc_info == (None, None, None)
+    assert pool.created == 3
+    assert not pool.idle
+
+
+def test_broken_idle_session_is_replaced():
+    pool = make_pool()
+    with pool.session(ADMIN, 'changeme') as session:
+        session.broken = True
+    with pool.session(ADMIN, 'changeme') as replacement:
+        assert replacement.pool_session is not session.pool_session
+    assert session.pool_session.closed
+    assert pool.created == 2
+
+
+def test_changing_user_discards_the_session():
+    pool = make_pool()
+    with pool.session(ADMIN, 'changeme') as session:
+        admin_session = session.pool_session
+        assert session(user='viewer', password='secret') is session
+        assert session.page() == 'viewer landing page'
+    assert admin_session.closed
+    assert session.pool_session.closed
+    assert not pool.idle
+
+
+def test_least_recently_used_sessions_are_closed():
+    pool = make_pool(size=2)
+    leased = [pool.lease(ADMIN._replace(user=f'user{index}'), 'changeme') for index in range(3)]
+    for session in leased:
+        pool.release(session)
+    assert [session.closed for session in pool.sessions] == [True, False, False]
+    pool.close()
+    assert all(session.closed for session in pool.sessions)
+
+
+@pytest.mark.parametrize(
+    ('report_call', 'discarded'),
+    [(SimpleNamespace(passed=True), False), (SimpleNamespace(passed=False), True), (None, True)],
+)
+def test_discard_if_failed(report_call, discarded):
+    session = PooledUISession(make_pool(), ADMIN, FakeSession(ADMIN))
+    discard_if_failed(session, SimpleNamespace(report_call=report_call))
+    assert session.pool_discard is discarded
+
+
+def test_reused_session_is_named_after_the_test():
+    pool = make_pool()
+    with pool.session(ADMIN, 'changeme', 'test_first'):
+        pass
+    with pool.session(ADMIN, 'changeme', 'test_second') as session:
+        assert session.name == 'test_second'
+
+
+@pytest.mark.parametrize(
+    ('key', 'context'),
+    [
+        (ADMIN, (ANY_CONTEXT['org'], ANY_CONTEXT['location'])),
+        (ADMIN._replace(organization='org', location='loc'), ('org', 'loc')),
+    ],
+)
+def test_reset_ui_session(key, context):
+    """The windows of the test are closed and the context of the key is selected again"""
+    session = mock.MagicMock()
+    session.browser.selenium.window_handles = ['main', 'popup']
+    reset_ui_session(session, key, 'test_second')
+    session.browser.selenium.close.assert_called_once()
+    session.browser.selenium.switch_to.window.assert_called_with('main')
+    assert session.browser.url == 'https://sat.example.com/'
+    session.organization.select.assert_called_once_with(context[0])
+    session.location.select.assert_called_once_with(context[1])
+    assert session.name == 'test_second'
+
+
+def test_stop_ui_session_passes_the_failure():
+    session = mock.MagicMock()
+    error = AssertionError('failed')
+    stop_ui_session(session, (AssertionError, error, None))
+    session.__exit__.assert_called_once_with(AssertionError, error, None)
+    stop_ui_session(session)
+    session.__exit__.assert_called_with(None, None, None)
@@ -0,0 +1,110 @@
+"""Tests for the upstream PR plugin, with a stand-in GitHub client."""
+
+from types import SimpleNamespace
+
+from dynaconf.utils.boxing import DynaBox
+import github
+import pytest
+
+from pytest_plugins import upstream_pr
+from pytest_plugins.upstream_pr import RuleMatcher, get_pr_filenames, match_file_to_rule
+
+RULES = [
+    SimpleNamespace(path='app/models/host', component='Hosts'),
+    SimpleNamespace(path='app/(controllers|models)/', component='Foreman'),
+    SimpleNamespace(path='^lib/', component='Lib'),
+    SimpleNamespace(path='katello/.*_sync', component='Repositories'),
+]
+FILENAMES = [
+    'app/models/host/managed.rb',
+    'app/controllers/api/v2/hosts_controller.rb',
+    'App/Models/Host.rb',
+    'app/lib/tasks.rb',
+    'lib/tasks.rb',
+    'app/lib/katello/repository_sync.rb',
+    'README.md',
+]
+
+
+class StandInPR:
+    def __init__(self, filenames, sha='abc123'):
+        self.number = 1
+        self.state = 'open'
+        self.head = SimpleNamespace(sha=sha)
+        self.filenames = filenames
+        self.listed = 0
+
+    def get_files(self):
+        self.listed += 1
+        return [SimpleNamespace(filename=filename) for filename in self.filenames]
+
+
+@pytest.mark.parametrize(
+    'rules',
+    [RULES, [*RULES, SimpleNamespace(path=r'(\w+)/\1', component='Repeated')]],
+    ids=['combined', 'one_at_a_time'],
+)
+def test_files_are_mapped_to_the_first_matching_rule(rules):
+    matcher = RuleMatcher(rules)
+    assert (matcher.pattern is None) == (len(rules) > len(RULES))
+    for filename in FILENAMES:
+        expected = next((rule for rule in rules if match_file_to_rule(filename, rule)), None)
+        assert matcher.match(filename) is expected
+    matched, unmatched = matcher.map_files(FILENAMES)
+    assert matched['app/models/host', 'Hosts'] == {
+        'app/models/host/managed.rb',
+        'App/Models/Host.rb',
+    }
+    assert unmatched == {'app/lib/tasks.rb', 'README.md'}
+
+
+def test_invalid_rules_are_skipped():
+    matcher = RuleMatcher([SimpleNamespace(path='app/(models', component='Broken'), *RULES[:1]])
+    assert matcher.rules == RULES[:1]
+    assert matcher.match('app/models/host.rb') is RULES[0]
+
+
+def test_pr_files_are_cached_by_head_commit(tmp_path):
+    github_repo = SimpleNamespace(full_name='theforeman/foreman')
+    pr = StandInPR(FILENAMES)
+    assert get_pr_filenames(github_repo, pr, tmp_path) == set(FILENAMES)
+    assert get_pr_filenames(github_repo, pr, tmp_path) == set(FILENAMES)
+    assert pr.listed == 1
+    # a new commit pushed to the PR changes its files
+    pushed = StandInPR(FILENAMES[:2], sha='def456')
+    assert get_pr_filenames(github_repo, pushed, tmp_path) == set(FILENAMES[:2])
+    assert pushed.listed == 1
+    assert get_pr_filenames(github_repo, pr, None) == set(FILENAMES)
+    assert pr.listed == 2
+
+
+def test_items_are_selected_by_component(tmp_path, monkeypatch):
+    pr = StandInPR(['app/models/host/managed.rb', 'lib/tasks.rb'])
+    stand_in_repo = SimpleNamespace(full_name='theforeman/foreman', get_pull=lambda pr_id: pr)
+    monkeypatch.setattr(
+        github, 'Github', lambda auth: SimpleNamespace(get_repo=lambda name: stand_in_repo)
+    )
+    repos = {'foreman': {'org': 'theforeman', 'repo': 'foreman', 'rules': RULES}}
+    github_repos = DynaBox(token='', base_marker='e2e', cache_dir=str(tmp_path), repos=repos)
+    monkeypatch.setattr(upstream_pr, 'settings', SimpleNamespace(github_repos=github_repos))
+
+    def item(name, *markers):
+        marks = [marker.mark for marker in markers]
+        return SimpleNamespace(nodeid=name, iter_markers=lambda: iter(marks))
+
+    items = [
+        item('test_host', pytest.mark.component('hosts'), pytest.mark.e2e),
+        item('test_lib', pytest.mark.component('lib')),
+        item('test_lib_upstream', pytest.mark.e2e, pytest.mark.component('lib')),
+        item('test_repository', pytest.mark.component('repositories'), pytest.mark.e2e),
+    ]
+    deselected = []
+    config = SimpleNamespace(
+        getoption=lambda name: 'foreman/1',
+        hook=SimpleNamespace(pytest_deselected=lambda items: deselected.extend(items)),
+    )
+    session = SimpleNamespace(stash=pytest.Stash())
+    upstream_pr.pytest_collection_modifyitems(session, items, config)
+    assert [i.nodeid for i in items] == ['test_host', 'test_lib_upstream']
+    assert [i.nodeid for i in deselected] == ['test_lib', 'test_repository']
+    assert list(tmp_path.glob('theforeman/foreman/*.json'))
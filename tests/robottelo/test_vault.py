@@ -0,0 +1,76 @@
+"""Tests for the Vault login and token cache of ``robottelo.utils.vault``."""
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from robottelo.utils import vault
+
+ENV = (
+    'VAULT_ENABLED_FOR_DYNACONF=true\n'
+    'VAULT_URL_FOR_DYNACONF=https://vault.example.com\n'
+    '# VAULT_TOKEN_FOR_DYNACONF=myroot\n'
+)
+
+
+@pytest.fixture
+def fake_vault(tmp_path, monkeypatch):
+    """Put the fake vault CLI first in PATH, return its state file"""
+    state = tmp_path / 'vault_state.json'
+    monkeypatch.setenv('PATH', f'{Path(__file__).parent / "data"}{os.pathsep}{os.environ["PATH"]}')
+    monkeypatch.setenv('FAKE_VAULT_STATE', str(state))
+    monkeypatch.delenv('VAULT_SECRET_ID_FOR_DYNACONF', raising=False)
+    tmp_path.joinpath('.env').write_text(ENV)
+    yield state
+    monkeypatch.delenv('VAULT_ADDR', raising=False)
+
+
+def login(tmp_path):
+    with vault.Vault(tmp_path / '.env', token_cache=tmp_path / 'token.json') as vclient:
+        vclient.login()
+    return vclient
+
+
+def commands(state):
+    return json.loads(state.read_text())['commands']
+
+
+def test_login_reuses_the_cached_token(fake_vault, tmp_path):
+    vclient = login(tmp_path)
+    assert vclient.token_source == 'login'
+    assert commands(fake_vault) == [
+        'token lookup --format json',
+        'login -method=oidc',
+        'token renew -i 10h',
+        'token lookup --format json',
+    ]
+    assert 'VAULT_TOKEN_FOR_DYNACONF=hvs.fake1\n' in tmp_path.joinpath('.env').read_text()
+    # the cache holds the expiry, not the token
+    assert 'hvs.fake1' not in tmp_path.joinpath('token.json').read_text()
+
+    # the next processes do not run the vault CLI at all
+    for _ in range(3):
+        assert login(tmp_path).token_source == 'cache'
+    assert len(commands(fake_vault)) == 4
+
+
+def test_login_falls_back_to_lookup_and_login(fake_vault, tmp_path, monkeypatch):
+    login(tmp_path)
+    # about to expire: looked up again, still valid for Vault
+    monkeypatch.setattr(vault, 'VAULT_TOKEN_MIN_TTL', 40000)
+    assert login(tmp_path).token_source == 'lookup'
+    assert commands(fake_vault)[-1] == 'token lookup --format json'
+    monkeypatch.setattr(vault, 'VAULT_TOKEN_MIN_TTL', 300)
+
+    # logged out: the token is revoked and removed from the cache
+    login(tmp_path).logout()
+    assert not tmp_path.joinpath('token.json').exists()
+    assert login(tmp_path).token_source == 'login'
+    assert 'VAULT_TOKEN_FOR_DYNACONF=hvs.fake2\n' in tmp_path.joinpath('.env').read_text()
+
+    # another Vault does not use the cached token
+    env = tmp_path.joinpath('.env')
+    env.write_text(env.read_text().replace('vault.example.com', 'vault2.example.com'))
+    assert login(tmp_path).token_source == 'lookup'
@@ -0,0 +1,124 @@
+"""Tests for module ``robottelo.utils.virtwho``."""
+
+import json
+import subprocess
+from unittest import mock
+
+import pytest
+
+from robottelo.utils import virtwho
+
+
+@pytest.mark.parametrize('fake', [False, True])
+@pytest.mark.parametrize('chunk_size', [1, 512, 65536])
+def test_hypervisor_json_stream_matches_create(fake, chunk_size):
+    """The streamed report decodes to the same data as the in-memory report"""
+    create = virtwho.hypervisor_fake_json_create if fake else virtwho.hypervisor_json_create
+    chunks = list(
+        virtwho.hypervisor_json_stream(6, 4, seed='scale', fake=fake, chunk_size=chunk_size)
+    )
+    assert all(isinstance(chunk, bytes) for chunk in chunks)
+    assert json.loads(b''.join(chunks)) == create(6, 4, seed='scale')
+
+
+def test_hypervisor_json_seed():
+    """Same seed gives the same uuids, no seed gives random uuids"""
+    assert virtwho.hypervisor_json_create(2, 3, seed=1) == virtwho.hypervisor_json_create(
+        2, 3, seed=1
+    )
+    assert virtwho.hypervisor_json_create(2, 3, seed=1) != virtwho.hypervisor_json_create(
+        2, 3, seed=2
+    )
+    assert virtwho.hypervisor_json_create(2, 3) != virtwho.hypervisor_json_create(2, 3)
+    data = json.loads(b''.join(virtwho.hypervisor_json_stream(3, 2)))
+    guest_ids = {g['guestId'] for h in data['hypervisors'] for g in h['guestIds']}
+    assert len(guest_ids) == 6
+
+
+def test_hypervisor_json_stream_empty():
+    assert json.loads(b''.join(virtwho.hypervisor_json_stream(0, 5))) == {'hypervisors': []}
+
+
+def _local_runcmd(cmd, system=None, timeout=None):
+    result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+    return result.returncode, result.stdout.strip()
+
+
+@mock.patch('robottelo.utils.virtwho.runcmd', side_effect=_local_runcmd)
+def test_runcmds(runcmd):
+    """All the commands run in a single remote script with their own status and output"""
+    results = virtwho.runcmds(['echo foo', 'false', 'printf "a\\nb\\n"; exit 3', 'true'])
+    assert runcmd.call_count == 1
+    assert results == [(0, 'foo'), (1, ''), (3, 'a\nb'), (0, '')]
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    """Replace the ssh clients of the cached sessions with mocks"""
+    monkeypatch.setattr(virtwho, '_sessions', {})
+    monkeypatch.setattr(virtwho.ssh, 'get_client', mock.Mock(side_effect=lambda **_: mock.Mock()))
+    return virtwho._sessions
+
+
+SYSTEM = {'hostname': 'guest.example.com', 'username': 'root', 'password': 'secret'}
+
+
+def test_runcmd_reuses_session(sessions):
+    with mock.patch.object(
+        virtwho.ssh, 'command', return_value=mock.Mock(status=0, stdout='out\n')
+    ) as command:
+        assert virtwho.runcmd('true', system=SYSTEM) == (0, 'out')
+        assert virtwho.runcmd('true', system=SYSTEM) == (0, 'out')
+    assert virtwho.ssh.get_client.call_count == 1
+    assert command.call_args.kwargs['client'] is sessions['guest.example.com', 22, 'root']
+
+
+def test_runcmd_reconnects(sessions):
+    """A broken connection is closed and the command is retried once on a new one"""
+    with mock.patch.object(
+        virtwho.ssh,
+        'command',
+        side_effect=[virtwho.SocketDisconnectError(), mock.Mock(status=0, stdout='out')],
+    ) as command:
+        assert virtwho.runcmd('true', system=SYSTEM) == (0, 'out')
+    first, second = (call.kwargs['client'] for call in command.call_args_list)
+    assert first is not second
+    first.close.assert_called_once()
+    assert sessions == {('guest.example.com', 22, 'root'): second}
+    virtwho.close_sessions()
+    second.close.assert_called_once()
+    assert sessions == {}
+
+
+def test_runcmd_reconnects_once(sessions):
+    with (
+        mock.patch.object(virtwho.ssh, 'command', side_effect=virtwho.SocketRecvError()),
+        pytest.raises(virtwho.SocketRecvError),
+    ):
+        virtwho.runcmd('true', system=SYSTEM)
+    assert virtwho.ssh.get_client.call_count == 2
+
+
+def _local_execute(cmd):
+    result = subprocess.run(cmd, shell=True, capture_output=True, text=True, executable='/bin/bash')
+    return mock.Mock(status=result.returncode, stdout=result.stdout)
+
+
+def test_log_follower(tmp_path, monkeypatch):
+    """Only the appended bytes are read, a truncated file is read again from the start"""
+    log = tmp_path / 'rhsm.log'
+    host = mock.Mock(execute=mock.Mock(side_effect=_local_execute))
+    monkeypatch.setattr(virtwho, 'get_session', lambda system: host)
+    follower = virtwho.LogFollower(path=str(log), system=SYSTEM)
+    assert follower.read() == ''
+    log.write_text('first\n')
+    assert follower.read() == 'first\n'
+    with log.open('a') as f:
+        f.write('second\n')
+    assert follower.read() == 'first\nsecond\n'
+    assert follower.offset == len('first\nsecond\n')
+    log.write_text('new\n')
+    assert follower.read() == 'new\n'
+    with log.open('a') as f:
+        f.write('found it\n')
+    assert follower.wait_for('found it', timeout=5, delay=0.1) == 'new\nfound it\n'